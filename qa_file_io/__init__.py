@@ -2,11 +2,15 @@ from . import qa_file_std
 from . import qa_theme_file as ThemeFile
 
 
-# Create a global IO history manager. Assign it to a new file IO manager.
+# Create a global IO history manager and a global secure write backup store. Assign them to a new file IO manager.
 #   This FileIOManager will be passed onto each "standard" file format.
-#   This ensures that the same IOHistory is shared between all file types.
+#   This ensures that the same IOHistory (and backup store) is shared between all file types.
 global_io_history_manager = qa_file_std.IOHistory()
-file_io_manager = qa_file_std.FileIO(global_io_history_manager)
+global_backup_store = qa_file_std.SecureWriteBackupStore()
+file_io_manager = qa_file_std.FileIO(global_io_history_manager, backup_store=global_backup_store)
+
+# Background sweeper for the global backup store (started by the app initializer).
+backup_sweeper = qa_file_std.BackupSweeper(global_backup_store)
 
 # Set the same instance of FileIOManager as each individual script's FIOM.
 ThemeFile.file_io_manager = file_io_manager
@@ -13,170 +13,1911 @@ DEFINES
     ---------------------------------------------------------------------------------------------------------
     Enum            FileType
     Enum            OperationType                                                                   op
+    (class)         SlidingWindow           int                         None
+    (class)         IOStats                 None                        None
     (class)         IOHistory                                                                       IOH
+    (method)        IOH.add_event           OperationType, str, str     None
+    (method)        IOH.record              OperationType, int, float   None
+    (method)        IOH.rate                None                        int
+    (method)        IOH.metrics             None                        Dict[str, Any]
     UNINIT IOH      IOHistoryManager        None                        None
+    (class)         EncodedStream           Any, CFA, bytes             None
+    (dataclass)     WriteRequest
+    (class)         FileWriter              File, Callable              None
+    (class)         BackupDelta
+    (method)        BackupDelta.compute     bytes, bytes, int           Optional[bytes]
+    (method)        BackupDelta.apply       bytes, bytes                bytes
+    (class)         BackupContainer
+    (method)        BackupContainer.encode  BinaryIO, BinaryIO, int     str, int, int
+    (method)        BackupContainer.decode  BinaryIO, BinaryIO          str, int, int
+    (class)         SecureWriteBackupStore  Optional[str]               None                        SWBS
+    (method)        SWBS.put                File, bytes                 File, str
+    (method)        SWBS.get                str                         bytes
+    (method)        SWBS.sweep              None                        int, int
+    (method)        SWBS.compact            None                        int
+    (class)         BackupSweeper           SWBS                        None
+    (class)         FileView                File, memoryview, mmap      None
+    (class)         WriteAheadJournal       Optional[str]               None                        WAL
+    (method)        WAL.recover             Optional[List[str]]         int
+    (class)         Transaction             FIO, str                    None                        TX
+    (method)        TX.write                File, Any, bool, str        None
+    (method)        TX.commit               None                        None
     (class)         FileIO                  *, **                       None                        FIO
+    (method)        FIO.read                File, str, Optional[int]    bytes
+    (method)        FIO.open_view           File, str, Optional[int]    FileView
+    (method)        FIO.transaction         str                         Transaction
     (method)        FIO.write               File, Any, bool, bool       bool                        SW
+    (method)        FIO.flush               Optional[File]              None
+    (method)        FIO.close               None                        None
 
 UNINIT: Uninitiated object.
 
 DEPENDENCIES
 
-    os, sys
-    qa_std.qa_nvf_manager
+    os
     qa_std.qa_def
     qa_std.qa_dtc
     qa_std.locale
     qa_std.qa_app_info
     qa_std.qa_app_pol
-    threading.Timer
     threading.Thread
+    threading.Lock
+    threading.RLock
+    threading.Event
+    queue.Queue
+    collections.OrderedDict
+    collections.deque
+    array.array
     enum.Enum
     cryptography.fernet.Fernet
+    cryptography.hazmat.primitives.ciphers.aead.AESGCM
+    base64
+    io
+    mmap
     gzip
-    shutil
+    hashlib
+    json
+    tempfile
+    time
     zlib
 
 Relevant App Policies
     * POLICY_MAX_IO_EVENTS_PER_MINUTE
+    * POLICY_IO_TAG_QUOTAS_PER_MINUTE
+    * POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE
+    * POLICY_IO_MAX_THROTTLE_SECONDS
+    * POLICY_IO_LATENCY_SAMPLES
     * POLICY_FIO_SW_COMPRESS_SRC_FILE
+    * POLICY_FIO_SW_APPEND_TAIL_SNAPSHOT_SIZE
+    * POLICY_FIO_WB_MAX_QUEUED_WRITES
+    * POLICY_FIO_SW_ATOMIC_REPLACE
+    * POLICY_FIO_SW_KEEP_BACKUP
+    * POLICY_FIO_SWB_KEEP_LAST_N
+    * POLICY_FIO_SWB_MAX_TOTAL_BYTES
+    * POLICY_FIO_SWB_MAX_AGE_DAYS
+    * POLICY_FIO_SWB_COMPACT_AFTER_DAYS
+    * POLICY_FIO_SWB_SWEEP_INTERVAL
+    * POLICY_FIO_SWB_DELTA_ENABLED
+    * POLICY_FIO_SWB_DELTA_MIN_SIZE
+    * POLICY_FIO_SWB_DELTA_BLOCK_SIZE
+    * POLICY_FIO_SWB_DELTA_MAX_CHAIN
+    * POLICY_FIO_SWB_DELTA_CACHE_BYTES
+    * POLICY_FIO_SWB_CHUNK_SIZE
+    * POLICY_FIO_MMAP_MIN_SIZE
+    * POLICY_FIO_WAL_ENABLED
+    * POLICY_FIO_WAL_FSYNC
+    * POLICY_FIO_WAL_MAX_SIZE
 
 """
 
-import os, sys, random, gzip, hashlib, zlib, shutil
+import os, gzip, hashlib, zlib, tempfile, json, time, base64, io, mmap
+
+from array import array
 
 from enum import Enum
-from threading import Timer, Thread
+from queue import Queue, Empty
+from collections import OrderedDict, deque
+from threading import Thread, Lock, RLock, Event
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.exceptions import InvalidTag
 from dataclasses import dataclass
-from typing import Any, List, Tuple, Dict, Literal, Optional
+from typing import Any, List, Tuple, Dict, Deque, Literal, Optional, Callable, Iterator, BinaryIO, Union, cast
+
+from qa_std import (
+    qa_def,
+    qa_dtc,
+    qa_app_info,
+    qa_app_pol,
+    locale,
+    qa_console_write
+)
+
+
+class FileType(Enum):
+    SecureWriteBackup = 0
+    QuizFile = 1
+    AdminFile = 2
+    Theme = 3
+
+
+class BadFileFormat(Exception):
+    def __init__(self, file_format: str, error: str) -> None:
+        assert file_format in FileType._member_names_, 'Invalid file_format.'
+        self.ff = file_format
+        self.e = error
+
+    def __str__(self) -> str:
+        return f'Improper file format for "{self.ff}". {self.e}'
+
+
+@dataclass
+class HeaderSection:
+    SectionName: str
+
+    # SectionStart and SectionLength are both both indices.
+    SectionStart: int
+    SectionLength: int
+
+    # What version of the header is this applicable to?
+    HeaderVersion: Tuple[int]
+
+
+class Header:
+    MAGIC_BYTES = HeaderSection('MAGIC_BYTES', 0, 4, (1,))
+    VERSION = HeaderSection('VERSION', 4, 2, (1,))
+
+    HEADER_VERSION = HeaderSection('HEADER_VERSION', 6, 2, (1,))
+
+    # Used by external functions
+    byteorder: Literal['big', 'little'] = 'big'
+    items = [MAGIC_BYTES, VERSION, HEADER_VERSION]
+
+
+@dataclass
+class HeaderData:
+    MAGIC_BYTES: bytes
+
+    # Version information
+    VERSION_BYTES: bytes
+    VERSION_INT: int
+
+    # Header version information
+    HEADER_VERSION_BYTES: bytes
+    HEADER_VERSION_INT: int
+
+    # File Type information
+    DETECTED_FILE_TYPE: FileType
+
+
+@dataclass
+class HeaderVersionOne(HeaderData):
+    pass
+
+
+# Each file type must have one of the following bytes in their header, which is used to identify the file type.
+#   Note: legacy (Fernet) SecureWriteBackup files do not have a header.
+
+MagicBytes = {
+    b'\x01\xff\x17\x10': FileType.QuizFile,
+    b'\x01\xff\x17\x11': FileType.AdminFile,
+    b'\x01\xff\x17\x12': FileType.Theme,
+    b'\x01\xff\x17\x13': FileType.SecureWriteBackup
+}
+
+MPV_FIO_923983nfu_MBR: Dict[FileType, bytes] = {v: k for k, v in MagicBytes.items()}
+
+
+def GetMagicBytes(file_type: FileType) -> bytes:
+    global MPV_FIO_923983nfu_MBR
+    return MPV_FIO_923983nfu_MBR[file_type]
+
+
+class OperationType(Enum):
+    READ = 0
+    WRITE = 1
+
+
+class SlidingWindow:
+    def __init__(self, capacity: int) -> None:
+        """
+        SlidingWindow
+
+        Ring buffer holding the times (and operation types) of the last `capacity` events, in order. A new event is
+        allowed if the buffer is not full, or if the oldest event has left the window. No memory is allocated per event.
+
+        :param capacity:    Maximum number of events per window
+        """
+
+        self._times = array('d', [0.0]) * capacity
+        self._ops = array('b', [0]) * capacity
+        self._head = 0          # Index of the oldest event in the ring buffer
+        self._size = 0          # Number of events in the ring buffer
+
+    @property
+    def capacity(self) -> int:
+        return len(self._times)
+
+    def resize(self, capacity: int) -> None:
+        # (Re-)allocates the ring buffer, keeping the most recent events (the relevant policy may change).
+        keep = min(self._size, capacity)
+        order = [(self._head + self._size - keep + i) % self.capacity for i in range(keep)]
+
+        times, ops = array('d', [0.0]) * capacity, array('b', [0]) * capacity
+        for i, j in enumerate(order):
+            times[i], ops[i] = self._times[j], self._ops[j]
+
+        self._times, self._ops, self._head, self._size = times, ops, 0, keep
+
+    def wait(self, now: float, window: float) -> float:
+        # Time (seconds) until a new event would be allowed; 0 if it is allowed now.
+        if self._size < self.capacity:
+            return 0.0
+
+        return max(0.0, self._times[self._head] + window - now)
+
+    def add(self, now: float, op_type: OperationType) -> None:
+        if self._size == self.capacity:
+            # Overwrite the oldest event.
+            self._times[self._head], self._ops[self._head] = now, op_type.value
+            self._head = (self._head + 1) % self.capacity
+
+        else:
+            tail = (self._head + self._size) % self.capacity
+            self._times[tail], self._ops[tail] = now, op_type.value
+            self._size += 1
+
+    def count(self, cutoff: float) -> Dict[OperationType, int]:
+        # Number of events (per operation type) that occurred after cutoff. Events are stored in order, so a binary
+        #   search is used to find the first one.
+        lo, hi = 0, self._size
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._times[(self._head + mid) % self.capacity] > cutoff:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        output = {op: 0 for op in OperationType}
+        for i in range(lo, self._size):
+            output[OperationType(self._ops[(self._head + i) % self.capacity])] += 1
+
+        return output
+
+
+class IOStats:
+    def __init__(self) -> None:
+        """
+        IOStats
+
+        IO accounting for one subsystem (tag) or file: operations and bytes (per operation type), the latency of the
+        most recent POLICY_IO_LATENCY_SAMPLES operations, and the number of bytes transferred in each of the last
+        60 seconds. Failed operations are only counted (they never add to the number of bytes).
+        """
+
+        self.ops: Dict[OperationType, int] = {op: 0 for op in OperationType}
+        self.bytes: Dict[OperationType, int] = {op: 0 for op in OperationType}
+        self.failed: Dict[OperationType, int] = {op: 0 for op in OperationType}
+        self.throttled = 0
+
+        self._latencies: Dict[OperationType, Deque[float]] = {
+            op: deque(maxlen=qa_app_pol.POLICY_IO_LATENCY_SAMPLES) for op in OperationType
+        }
+
+        # Bytes per second (ring of one-second buckets, stamped with the second they belong to).
+        self._buckets = array('q', [0]) * int(IOHistory.WINDOW)
+        self._stamps = array('q', [-1]) * int(IOHistory.WINDOW)
+
+    def record(self, op_type: OperationType, n_bytes: int, latency: float, now: float, failed: bool = False) -> None:
+        if failed:
+            self.failed[op_type] += 1
+            return
+
+        self.ops[op_type] += 1
+        self.bytes[op_type] += n_bytes
+        self._latencies[op_type].append(latency)
+
+        second = int(now)
+        bucket = second % len(self._buckets)
+        if self._stamps[bucket] != second:
+            self._buckets[bucket], self._stamps[bucket] = 0, second
+
+        self._buckets[bucket] += n_bytes
+
+    @staticmethod
+    def _percentile_(samples: List[float], p: float) -> float:
+        return samples[min(len(samples) - 1, int(p * len(samples)))] if len(samples) else 0.0
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        second = int(now)
+        recent = sum(b for b, s in zip(self._buckets, self._stamps) if second - len(self._buckets) < s <= second)
+
+        output: Dict[str, Any] = {
+            'bytes_per_second': recent / len(self._buckets),
+            'throttled': self.throttled
+        }
+
+        for op in OperationType:
+            samples = sorted(self._latencies[op])
+            output[op.name] = {
+                'ops': self.ops[op],
+                'bytes': self.bytes[op],
+                'failed': self.failed[op],
+                'p50_latency': IOStats._percentile_(samples, 0.5),
+                'p99_latency': IOStats._percentile_(samples, 0.99)
+            }
+
+        return output
+
+
+class IOHistory:
+    # Sliding window (seconds) over which the IO quotas are enforced.
+    WINDOW = 60.0
+
+    # Tag used for IO events that are not attributed to a subsystem.
+    DEFAULT_TAG = 'general'
+
+    def __init__(self) -> None:
+        """
+        IOHistory
+
+        Sliding-window rate limiter and IO accounting. Each IO event is counted against:
+            * the global quota (POLICY_MAX_IO_EVENTS_PER_MINUTE),
+            * the quota of its caller (subsystem) tag, if any (POLICY_IO_TAG_QUOTAS_PER_MINUTE), and
+            * the quota of its target file (POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE).
+
+        If any quota is exhausted, the event is rejected (IOError). Events that are applied by a writer thread (see
+        FileWriter) are throttled instead: the writer thread is blocked until the event is allowed (an IOError is only
+        raised if that would take longer than POLICY_IO_MAX_THROTTLE_SECONDS). The caller's thread (e.g., the UI thread)
+        is never blocked. No timer thread is needed and no memory is allocated per event (see SlidingWindow).
+        """
+
+        self._lock = Lock()
+        self._global = SlidingWindow(qa_app_pol.POLICY_MAX_IO_EVENTS_PER_MINUTE)
+        self._tag_windows: Dict[str, SlidingWindow] = {}
+        self._path_windows: Dict[str, SlidingWindow] = {}
+
+        self._tag_stats: Dict[str, IOStats] = {}
+        self._path_stats: Dict[str, IOStats] = {}
+
+    def _windows_(self, tag: str, path: Optional[str]) -> List[Tuple[SlidingWindow, int, str]]:
+        # Windows (with their current quota and a description) that an event with the given tag and path counts against.
+        output = [(self._global, qa_app_pol.POLICY_MAX_IO_EVENTS_PER_MINUTE, 'global')]
+
+        if tag in qa_app_pol.POLICY_IO_TAG_QUOTAS_PER_MINUTE:
+            window = self._tag_windows.setdefault(tag, SlidingWindow(qa_app_pol.POLICY_IO_TAG_QUOTAS_PER_MINUTE[tag]))
+            output.append((window, qa_app_pol.POLICY_IO_TAG_QUOTAS_PER_MINUTE[tag], f'tag "{tag}"'))
+
+        if isinstance(path, str):
+            window = self._path_windows.setdefault(path, SlidingWindow(qa_app_pol.POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE))
+            output.append((window, qa_app_pol.POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE, f'file "{path}"'))
+
+        return output
+
+    def add_event(
+            self,
+            op_type: OperationType,
+            tag: str = DEFAULT_TAG,
+            path: Optional[str] = None,
+            throttle: bool = False
+    ) -> None:
+        """
+        IOHistory.add_event
+
+        :param op_type:     Operation type
+        :param tag:         Caller (subsystem) tag
+        :param path:        Target file path
+        :param throttle:    Should the calling thread be blocked until the event is allowed? (only set by writer
+                            threads; never set on the UI thread)
+        :raises IOError:    If a quota is exhausted (or, if throttle is set, would remain exhausted for longer than
+                            POLICY_IO_MAX_THROTTLE_SECONDS).
+        :return:            None
+        """
+
+        deadline = time.monotonic() + (qa_app_pol.POLICY_IO_MAX_THROTTLE_SECONDS if throttle else 0)
+
+        while True:
+            with self._lock:
+                now, wait, reason = time.monotonic(), 0.0, ''
+                windows = self._windows_(tag, path)
+
+                for window, quota, description in windows:
+                    if window.capacity != quota:
+                        window.resize(quota)
+
+                    if window.wait(now, IOHistory.WINDOW) > wait:
+                        wait, reason = window.wait(now, IOHistory.WINDOW), f'{description}; {quota} per minute'
+
+                if wait <= 0:
+                    for window, _, _ in windows:
+                        window.add(now, op_type)
+
+                    return
+
+                if now + wait > deadline:
+                    raise IOError(f'Too many IO events in {IOHistory.WINDOW:.0f} sec. ({reason})')
+
+                self._tag_stats.setdefault(tag, IOStats()).throttled += 1
+
+            # Throttle the (writer) thread (outside the lock).
+            time.sleep(wait)
+
+    def record(
+            self,
+            op_type: OperationType,
+            n_bytes: int,
+            latency: float,
+            tag: str = DEFAULT_TAG,
+            path: Optional[str] = None,
+            failed: bool = False
+    ) -> None:
+        """
+        IOHistory.record
+
+        Accounts for a completed (or failed) IO operation.
+
+        :param op_type:     Operation type
+        :param n_bytes:     Number of bytes read or written (ignored if the operation failed)
+        :param latency:     Duration of the operation (seconds)
+        :param tag:         Caller (subsystem) tag
+        :param path:        Target file path
+        :param failed:      Did the operation fail? (failures are counted separately; see IOStats)
+        :return:            None
+        """
+
+        with self._lock:
+            now = time.time()
+            self._tag_stats.setdefault(tag, IOStats()).record(op_type, n_bytes, latency, now, failed)
+
+            if isinstance(path, str):
+                self._path_stats.setdefault(path, IOStats()).record(op_type, n_bytes, latency, now, failed)
+
+    def rate(self) -> int:
+        """
+        IOHistory.rate
+
+        :return: Number of IO events in the last minute (sliding window)
+        """
+
+        with self._lock:
+            return sum(self._global.count(time.monotonic() - IOHistory.WINDOW).values())
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        IOHistory.metrics
+
+        :return: IO events in the last minute (per operation type), the global limit, and per tag and per file
+                 accounting (see IOStats)
+        """
+
+        with self._lock:
+            now, cutoff = time.time(), time.monotonic() - IOHistory.WINDOW
+            window = self._global.count(cutoff)
+
+            return {
+                'events_per_minute': sum(window.values()),
+                'window': {op.name: count for op, count in window.items()},
+                'limit': qa_app_pol.POLICY_MAX_IO_EVENTS_PER_MINUTE,
+                'tags': {tag: stats.summary(now) for tag, stats in self._tag_stats.items()},
+                'paths': {path: stats.summary(now) for path, stats in self._path_stats.items()}
+            }
+
+
+class EncodedStream:
+    def __init__(self, data: Any, cfa: qa_dtc.CFA, record_delim: bytes) -> None:
+        """
+        EncodedStream
+
+        Data that is encoded (see qa_dtc.encode_to) straight into the output file when it is written, rather than being
+        converted to bytes first. The data is either an aggregate (list, tuple, set, dict) or an iterator of records
+        (e.g., a generator); records are encoded one at a time and are separated by the record delimiter. Other
+        iterables (e.g., bytearray, range, or dict views) are not record streams.
+
+        NOTE: iterators (generators) of records can only be written once.
+
+        :param data:            Aggregate or iterator of records
+        :param cfa:             CFA struct
+        :param record_delim:    Record delimiter (bytes)
+        """
+
+        self.data, self.cfa, self.record_delim = data, cfa, record_delim
+        self.size = 0  # Number of bytes written
+
+    @staticmethod
+    def is_record_stream(data: Any) -> bool:
+        return isinstance(data, Iterator)
+
+    def write_to(self, output_file: BinaryIO) -> int:
+        if not EncodedStream.is_record_stream(self.data):
+            self.size = qa_dtc.encode_to(output_file, self.data, self.cfa)
+            return self.size
+
+        self.size = 0
+
+        for i, record in enumerate(self.data):
+            if i:
+                output_file.write(self.record_delim)
+                self.size += len(self.record_delim)
+
+            self.size += qa_dtc.encode_to(output_file, record, self.cfa)
+
+        return self.size
+
+    def to_bytes(self) -> bytes:
+        output = io.BytesIO()
+        self.write_to(cast(BinaryIO, output))
+
+        return output.getvalue()
+
+
+@dataclass
+class WriteRequest:
+    data: bytes
+    secure_mode: bool
+    append_mode: bool
+    delim: bytes
+    tag: str = IOHistory.DEFAULT_TAG
+
+
+class FileWriter(Thread):
+    def __init__(
+            self,
+            file: qa_def.File,
+            write_fn: Callable[[qa_def.File, bytes, bool, bool, bytes, str], bool]
+    ) -> None:
+        """
+        FileWriter
+
+        Long-lived writer thread for a single target file. Write requests are queued (bounded queue; callers block
+        when the queue is full) and applied in order. Consecutive requests are coalesced into a single write.
+
+        :param file:        Target file
+        :param write_fn:    Function used to apply a (coalesced) write request
+        """
+
+        Thread.__init__(self, name=f'FileWriter:{file.file_name}', daemon=True)
+
+        self.file, self._write_fn = file, write_fn
+        self.queue: Queue[Optional[WriteRequest]] = Queue(maxsize=qa_app_pol.POLICY_FIO_WB_MAX_QUEUED_WRITES)
+        self.error: Optional[BaseException] = None
+
+        self.start()
+
+    def put(self, request: WriteRequest) -> None:
+        self.queue.put(request)
+
+    def flush(self) -> None:
+        # Barrier: wait for every queued request to be applied.
+        self.queue.join()
+
+        if isinstance(self.error, BaseException):
+            error, self.error = self.error, None
+            raise IOError(f'Queued write to "{self.file.file_path}" failed: {error}')
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.join()
+
+        self.flush()
+
+    @staticmethod
+    def _coalesce_(requests: List[WriteRequest]) -> List[WriteRequest]:
+        # Merge consecutive requests (with the same secure_mode and tag) into one request.
+        #   * append after X:       X's data + delimiter + data
+        #   * overwrite after X:    X is discarded (it would have been overwritten anyway)
+        output: List[Tuple[WriteRequest, List[bytes]]] = []
+
+        for request in requests:
+            if len(output) and (output[-1][0].secure_mode, output[-1][0].tag) == (request.secure_mode, request.tag):
+                if request.append_mode:
+                    output[-1][1].extend((request.delim, request.data))
+                    continue
+
+                output.pop()
+
+            output.append((request, [request.delim, request.data] if request.append_mode else [request.data]))
+
+        return [WriteRequest(b''.join(parts), r.secure_mode, r.append_mode, b'', r.tag) for r, parts in output]
+
+    def run(self) -> None:
+        running = True
+
+        while running:
+            batch: List[Optional[WriteRequest]] = [self.queue.get()]
+
+            # Drain the queue (without blocking) so that consecutive writes can be coalesced.
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+
+                except Empty:
+                    break
+
+            running = None not in batch
+
+            try:
+                for request in FileWriter._coalesce_([r for r in batch if isinstance(r, WriteRequest)]):
+                    self._write_fn(
+                        self.file, request.data, request.secure_mode, request.append_mode, request.delim, request.tag
+                    )
+
+            except Exception as E:
+                qa_console_write.Write.error(f'[FileWriter] Failed to apply queued write to {self.file.file_name}: ', str(E))
+                self.error = E
+
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+class BackupDelta:
+    MAGIC = b'QSWD'
+
+    # Give up on the delta (and store a full snapshot instead) if the target has a run of more than
+    #   MAX_LITERAL_RUN_BLOCKS blocks that do not match the base, or if more than half of the target is literal data.
+    MAX_LITERAL_RUN_BLOCKS = 32
+
+    @staticmethod
+    def compute(base: bytes, target: bytes, block_size: int) -> Optional[bytes]:
+        """
+        BackupDelta.compute
+
+        Computes a binary delta (rsync-style) that rebuilds target from base. The base is split into blocks, indexed by
+        their (Adler-32) weak checksum; the target is then scanned with a rolling checksum. Matching blocks become COPY
+        operations, everything else becomes INSERT operations.
+
+        Format: MAGIC, target length (8 bytes), then operations:
+            * b'C' + offset (8 bytes) + length (8 bytes)       copy bytes from the base
+            * b'I' + length (8 bytes) + data                  insert literal bytes
+
+        :param base:        Base (previous) data
+        :param target:      Target (new) data
+        :param block_size:  Block size
+        :return:            Delta, or None if a delta would not be worth storing.
+        """
+
+        B, n = block_size, len(target)
+        if len(base) < B or n < B:
+            return None
+
+        blocks: Dict[int, List[int]] = {}
+        for offset in range(0, len(base) - B + 1, B):
+            blocks.setdefault(zlib.adler32(base[offset:offset + B]), []).append(offset)
+
+        max_run, max_literal = BackupDelta.MAX_LITERAL_RUN_BLOCKS * B, n // 2
+        ops: List[Tuple[int, int, int]] = []  # (offset in base or -1 for literal, start in target, length)
+        literal, p, lit_start = 0, 0, 0
+        weak: Optional[int] = None
+        a = b = 0
+
+        while p + B <= n:
+            if weak is None:
+                weak = zlib.adler32(target[p:p + B])
+                a, b = weak & 0xffff, weak >> 16
+
+            match = -1
+            for offset in blocks.get(weak, ()):
+                if base[offset:offset + B] == target[p:p + B]:
+                    match = offset
+                    break
+
+            if match >= 0:
+                if lit_start < p:
+                    ops.append((-1, lit_start, p - lit_start))
+                    literal += p - lit_start
+
+                if len(ops) and (ops[-1][0] >= 0) and (ops[-1][0] + ops[-1][2] == match):
+                    ops[-1] = (ops[-1][0], ops[-1][1], ops[-1][2] + B)  # Extend the previous COPY.
+                else:
+                    ops.append((match, p, B))
+
+                p += B
+                lit_start, weak = p, None
+                continue
+
+            if p + B >= n:
+                break
+
+            # Roll the checksum by one byte.
+            out_b, in_b = target[p], target[p + B]
+            a = (a - out_b + in_b) % 65521
+            b = (b - B * out_b + a - 1) % 65521
+            weak = (b << 16) | a
+            p += 1
+
+            if (p - lit_start > max_run) or (literal + p - lit_start > max_literal):
+                return None
+
+        if lit_start < n:
+            ops.append((-1, lit_start, n - lit_start))
+
+        output = [BackupDelta.MAGIC, n.to_bytes(8, 'big')]
+        for offset, start, length in ops:
+            if offset >= 0:
+                output.append(b'C' + offset.to_bytes(8, 'big') + length.to_bytes(8, 'big'))
+            else:
+                output.append(b'I' + length.to_bytes(8, 'big') + target[start:start + length])
+
+        delta = b''.join(output)
+        return delta if len(delta) < n // 2 else None
+
+    @staticmethod
+    def apply(base: bytes, delta: bytes) -> bytes:
+        assert delta[:4] == BackupDelta.MAGIC, 'Invalid backup delta.'
+
+        n = int.from_bytes(delta[4:12], 'big')
+        output, p = bytearray(), 12
+
+        while p < len(delta):
+            op, p = delta[p:p + 1], p + 1
+
+            if op == b'C':
+                offset, length = int.from_bytes(delta[p:p + 8], 'big'), int.from_bytes(delta[p + 8:p + 16], 'big')
+                output += base[offset:offset + length]
+                p += 16
+
+            elif op == b'I':
+                length = int.from_bytes(delta[p:p + 8], 'big')
+                output += delta[p + 8:p + 8 + length]
+                p += 8 + length
+
+            else:
+                raise ValueError('Invalid backup delta operation.')
+
+        assert len(output) == n, 'Invalid backup delta (length).'
+        return bytes(output)
+
+
+class BackupContainer:
+    # Chunked, authenticated (AES-256-GCM) container for secure write backups.
+    #
+    # Format:
+    #   Header          MAGIC_BYTES (4), VERSION (2), HEADER_VERSION (2) (see Header), chunk size (4 bytes)
+    #   Records         length of the sealed chunk (4 bytes), flags (1 byte), nonce (12 bytes), sealed chunk
+    #
+    # Each chunk (at most `chunk size` bytes of the plain text) is (optionally) compressed and then sealed (encrypted
+    #   and authenticated) on its own, with a fresh nonce. The header, the index of the chunk, and its flags are
+    #   authenticated too, so chunks cannot be reordered, dropped, or truncated without detection.
+
+    VERSION = 1
+    HEADER_LENGTH = 12
+    NONCE_LENGTH = 12
+
+    FLAG_COMPRESSED = 0x01
+    FLAG_FINAL = 0x02
+
+    @staticmethod
+    def _key_() -> bytes:
+        # AES-256 key derived from the SecureWriteBackup (Fernet) key.
+        return hashlib.sha256(
+            b'qSWBackup/AES-GCM' + base64.urlsafe_b64decode(FileIO.MPV_FIO_710Nd_enK[FileType.SecureWriteBackup])
+        ).digest()
+
+    @staticmethod
+    def is_container(prefix: bytes) -> bool:
+        return prefix[:Header.MAGIC_BYTES.SectionLength] == GetMagicBytes(FileType.SecureWriteBackup)
+
+    @staticmethod
+    def encode(f_in: BinaryIO, f_out: BinaryIO, chunk_size: int) -> Tuple[str, int, int]:
+        """
+        BackupContainer.encode
+
+        Compresses and encrypts f_in into f_out, one chunk at a time (peak memory is bounded by the chunk size).
+
+        :param f_in:        Source (plain text) stream
+        :param f_out:       Output stream
+        :param chunk_size:  Chunk size (bytes)
+        :return:            SHA-256 (hex) of the plain text, CRC32 of the plain text, number of bytes written
+        """
+
+        header = GetMagicBytes(FileType.SecureWriteBackup) + \
+            BackupContainer.VERSION.to_bytes(Header.VERSION.SectionLength, Header.byteorder) + \
+            (1).to_bytes(Header.HEADER_VERSION.SectionLength, Header.byteorder) + \
+            chunk_size.to_bytes(4, Header.byteorder)
+
+        aes, sha, crc = AESGCM(BackupContainer._key_()), hashlib.sha256(), 0
+        f_out.write(header)
+        written = len(header)
+
+        index, chunk = 0, f_in.read(chunk_size)
+
+        while True:
+            # Read ahead by one chunk to find out whether this chunk is the final one.
+            next_chunk = f_in.read(chunk_size) if len(chunk) == chunk_size else b''
+
+            sha.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+
+            flags = 0 if len(next_chunk) else BackupContainer.FLAG_FINAL
+            if qa_app_pol.POLICY_FIO_SW_COMPRESS_SRC_FILE:
+                compressed = zlib.compress(chunk, qa_app_pol.POLICY_SW_GZIP_COMPRESSION_LEVEL)
+
+                # Incompressible chunks are stored as is.
+                if len(compressed) < len(chunk):
+                    chunk, flags = compressed, flags | BackupContainer.FLAG_COMPRESSED
+
+            nonce = os.urandom(BackupContainer.NONCE_LENGTH)
+            sealed = aes.encrypt(nonce, chunk, header + index.to_bytes(8, 'big') + bytes([flags]))
+
+            f_out.write(len(sealed).to_bytes(4, 'big') + bytes([flags]) + nonce)
+            f_out.write(sealed)
+            written += 5 + len(nonce) + len(sealed)
+
+            if flags & BackupContainer.FLAG_FINAL:
+                break
+
+            index, chunk = index + 1, next_chunk
+
+        return sha.hexdigest(), crc, written
+
+    @staticmethod
+    def decode(f_in: BinaryIO, f_out: BinaryIO) -> Tuple[str, int, int]:
+        """
+        BackupContainer.decode
+
+        Decrypts, authenticates, and decompresses f_in into f_out, one chunk at a time.
+
+        :param f_in:            Container stream (positioned at the start of the container)
+        :param f_out:           Output (plain text) stream
+        :raises BadFileFormat:  If the container is malformed, truncated, or was tampered with.
+        :return:                SHA-256 (hex) of the plain text, CRC32 of the plain text, number of bytes written
+        """
+
+        header = f_in.read(BackupContainer.HEADER_LENGTH)
+        if (len(header) != BackupContainer.HEADER_LENGTH) or not BackupContainer.is_container(header):
+            raise BadFileFormat('SecureWriteBackup', 'Bad container header.')
+
+        aes, sha, crc, written = AESGCM(BackupContainer._key_()), hashlib.sha256(), 0, 0
+        index = 0
+
+        while True:
+            record = f_in.read(5 + BackupContainer.NONCE_LENGTH)
+            if len(record) != 5 + BackupContainer.NONCE_LENGTH:
+                raise BadFileFormat('SecureWriteBackup', 'Container is truncated.')
+
+            length, flags, nonce = int.from_bytes(record[:4], 'big'), record[4], record[5:]
+            sealed = f_in.read(length)
+
+            try:
+                chunk = aes.decrypt(nonce, sealed, header + index.to_bytes(8, 'big') + bytes([flags]))
+
+            except InvalidTag:
+                raise BadFileFormat('SecureWriteBackup', f'Chunk {index} failed authentication.')
+
+            if flags & BackupContainer.FLAG_COMPRESSED:
+                chunk = zlib.decompress(chunk)
+
+            sha.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+
+            f_out.write(chunk)
+            written += len(chunk)
+
+            if flags & BackupContainer.FLAG_FINAL:
+                break
+
+            index += 1
+
+        return sha.hexdigest(), crc, written
+
+
+class SecureWriteBackupStore:
+    extension = 'qSWBackup'
+    index_extension = 'qSWIndex'
+
+    def __init__(self, root: str = qa_app_info.Storage.SecureWriteBackupDir) -> None:
+        """
+        SecureWriteBackupStore
+
+        Content-addressed store for secure write backups. Each backup is stored once (keyed by the SHA-256 of its
+        contents), no matter how many times (or by how many files) the same contents are backed up. The index keeps
+        track of the snapshots taken for each source file and of the reference counts (per source file) of each object.
+
+        Index structure:
+            objects:    {digest: {"refs": {source path: count}, "size": int, "stored": int, "crc32": int,
+                                  "depth": int, "base": digest (delta objects only),
+                                  "pack": [offset, length] (only if the object was compacted into the pack)}}
+            files:      {source path: [{"hash": digest, "time": float}, ...]}   (oldest snapshot first)
+            pack:       File name of the current pack (archive of compacted objects) or null
+
+        Delta objects (see BackupDelta):
+            Snapshots of large files (POLICY_FIO_SWB_DELTA_MIN_SIZE) may be stored as a delta against the previous
+            snapshot of the same file. A delta object holds a reference ("@<digest>") to its base. A full snapshot is
+            stored every POLICY_FIO_SWB_DELTA_MAX_CHAIN deltas.
+
+        Lifecycle (see SWBS.sweep, SWBS.compact, and BackupSweeper):
+            * Only the last POLICY_FIO_SWB_KEEP_LAST_N snapshots of each file are kept.
+            * Snapshots older than POLICY_FIO_SWB_MAX_AGE_DAYS are removed.
+            * The oldest snapshots are removed while the store is larger than POLICY_FIO_SWB_MAX_TOTAL_BYTES.
+            * Objects that are no longer referenced are deleted.
+
+        :param root:    Root directory of the store
+        """
+
+        self.root = root
+        self.index_file = qa_def.File(f'{root}\\backups.{self.index_extension}')
+
+        self._lock = RLock()
+        self._index: Optional[Dict[str, Any]] = None
+        self._data_cache: OrderedDict[str, bytes] = OrderedDict()
+
+    def object_file(self, digest: str) -> qa_def.File:
+        # Objects are fanned out into subdirectories (first two hex characters) to keep directory listings small.
+        return qa_def.File(f'{self.root}\\{digest[:2]}\\{digest}.{self.extension}')
+
+    @property
+    def index(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index_()
+
+            return self._index
+
+    def _load_index_(self) -> Dict[str, Any]:
+        if os.path.isfile(self.index_file.file_path):
+            try:
+                with open(self.index_file.file_path, 'rb') as f_in:
+                    index = json.loads(f_in.read())
+                    f_in.close()
+
+                assert isinstance(index.get('objects'), dict) & isinstance(index.get('files'), dict)
+                index.setdefault('pack', None)
+
+                return cast(Dict[str, Any], index)
+
+            except Exception as E:
+                qa_console_write.Write.warn('[SWBS] Backup index could not be read; creating a new index.', str(E))
+
+        return {'objects': {}, 'files': {}, 'pack': None}
+
+    def _save_index_(self) -> None:
+        # The index is replaced atomically (it is never backed up itself).
+        temp_file_path = FileIO._write_bytes_to_temp_file_(self.index_file, json.dumps(self.index).encode())
+        os.replace(temp_file_path, self.index_file.file_path)
+
+    @staticmethod
+    def _encode_(data: bytes) -> bytes:
+        # Compress (optionally) and encrypt data using the SecureWriteBackup encryption key (see BackupContainer).
+        f_out = io.BytesIO()
+        BackupContainer.encode(io.BytesIO(data), f_out, qa_app_pol.POLICY_FIO_SWB_CHUNK_SIZE)
+
+        return f_out.getvalue()
+
+    @staticmethod
+    def _decode_(raw: bytes) -> bytes:
+        if BackupContainer.is_container(raw):
+            f_out = io.BytesIO()
+            BackupContainer.decode(io.BytesIO(raw), f_out)
+
+            return f_out.getvalue()
+
+        # Legacy (Fernet) objects: compressed objects are detected using the gzip magic bytes (the policy may have
+        #   changed since).
+        if raw[:2] == b'\x1f\x8b':
+            raw = gzip.decompress(raw)
+
+        return Fernet(FileIO.MPV_FIO_710Nd_enK[FileType.SecureWriteBackup]).decrypt(raw)
+
+    def put(self, source: qa_def.File, data: bytes) -> Tuple[qa_def.File, str]:
+        """
+        SecureWriteBackupStore.put
+
+        Stores a snapshot of the source file's data (only if an identical object is not already stored).
+
+        :param source:  Source file
+        :param data:    Data to back up
+        :return:        Object file, object digest
+        """
+
+        return self._put_(source, io.BytesIO(data), hashlib.sha256(data).hexdigest(), len(data))
+
+    def put_file(self, source: qa_def.File) -> Tuple[qa_def.File, str]:
+        """
+        SecureWriteBackupStore.put_file
+
+        Stores a snapshot of the source file (read from the disk). Full snapshots are streamed (see BackupContainer);
+        the file is never loaded into memory as a whole (unless it is small enough to be stored as a delta).
+
+        :param source:  Source file
+        :return:        Object file, object digest
+        """
+
+        sha, size = hashlib.sha256(), 0
+
+        with open(source.file_path, 'rb') as f_in:
+            chunk = f_in.read(qa_app_pol.POLICY_FIO_SWB_CHUNK_SIZE)
+            while len(chunk):
+                sha.update(chunk)
+                size += len(chunk)
+                chunk = f_in.read(qa_app_pol.POLICY_FIO_SWB_CHUNK_SIZE)
+
+            output = self._put_(source, cast(BinaryIO, f_in), sha.hexdigest(), size)
+            f_in.close()
+
+        return output
+
+    def _put_(self, source: qa_def.File, f_in: BinaryIO, digest: str, size: int) -> Tuple[qa_def.File, str]:
+        object_file = self.object_file(digest)
+
+        with self._lock:
+            objects, files = self.index['objects'], self.index['files']
+            data: Optional[bytes] = None
+
+            if (digest not in objects) or not ('pack' in objects[digest] or os.path.isfile(object_file.file_path)):
+                # New contents (or a missing object file): (optionally) compute a delta against the previous snapshot
+                #   of the same file, then (compress,) encrypt, and store the object.
+                f_in.seek(0)
+                data = f_in.read() if self._delta_candidate_(size) else None
+                base, delta = self._delta_against_latest_(source, data, digest) if isinstance(data, bytes) else \
+                    (None, None)
+
+                f_in.seek(0)
+                temp_file_path, (e_hash, crc32, stored) = FileIO._write_stream_to_temp_file_(
+                    object_file,
+                    lambda f_out: BackupContainer.encode(
+                        f_in if delta is None else io.BytesIO(delta), f_out, qa_app_pol.POLICY_FIO_SWB_CHUNK_SIZE
+                    )
+                )
+
+                if isinstance(data, bytes) and (delta is not None):
+                    # The delta was verified against the digest (see _delta_against_latest_).
+                    crc32 = zlib.crc32(data)
+
+                elif e_hash != digest:
+                    os.remove(temp_file_path)
+                    raise IOError('Source file was modified while it was being backed up.')
+
+                os.replace(temp_file_path, object_file.file_path)
+                old = objects.get(digest, {})
+
+                objects[digest] = {
+                    'refs': objects.get(digest, {}).get('refs', {}),
+                    'size': size,
+                    'stored': stored,
+                    'crc32': crc32,
+                    'depth': 0
+                }
+
+                if isinstance(base, str) and (delta is not None):
+                    # The delta object holds a reference to its base.
+                    objects[digest].update({'base': base, 'depth': objects[base]['depth'] + 1})
+                    base_refs = objects[base]['refs']
+                    base_refs[f'@{digest}'] = base_refs.get(f'@{digest}', 0) + 1
+
+                if 'base' in old:
+                    # The object replaces a (missing) delta object: release the reference held on its old base. The
+                    #   new reference (if any) is added first so that a shared base is not deleted.
+                    self._release_(f'@{digest}', old['base'])
+
+            refs = objects[digest]['refs']
+            refs[source.file_path] = refs.get(source.file_path, 0) + 1
+
+            files.setdefault(source.file_path, []).append({'hash': digest, 'time': time.time()})
+            self._save_index_()
+
+            if isinstance(data, bytes):
+                self._cache_(digest, data)
+
+        return object_file, digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        SecureWriteBackupStore.get
+
+        :param digest:          Object digest
+        :raises AssertionError: If the object is missing or does not match its digest.
+        :return:                Backed up data
+        """
+
+        with self._lock:
+            if digest in self._data_cache:
+                self._data_cache.move_to_end(digest)
+                return self._data_cache[digest]
+
+            # Delta objects: walk the chain back to the full snapshot, then replay the deltas (oldest first).
+            chain = [digest]
+            while 'base' in self.index['objects'].get(chain[-1], {}):
+                # Every object appears (at most) once in a chain; this bounds the walk.
+                assert self.index['objects'][chain[-1]]['base'] not in chain, \
+                    f'Backup object {digest} has a broken delta chain.'
+
+                chain.append(self.index['objects'][chain[-1]]['base'])
+
+            data = SecureWriteBackupStore._decode_(self._read_object_(chain.pop()))
+
+            for delta_digest in reversed(chain):
+                data = BackupDelta.apply(data, SecureWriteBackupStore._decode_(self._read_object_(delta_digest)))
+
+        assert hashlib.sha256(data).hexdigest() == digest, f'Backup object {digest} is corrupted.'
+        return data
+
+    def get_to(self, digest: str, f_out: BinaryIO) -> Tuple[str, int]:
+        """
+        SecureWriteBackupStore.get_to
+
+        Writes the backed up data to f_out. Full snapshots are streamed, one chunk at a time.
+
+        :param digest:          Object digest
+        :param f_out:           Output stream
+        :raises AssertionError: If the object is missing or does not match its digest.
+        :return:                SHA-256 (hex) and CRC32 of the data that was written
+        """
+
+        with self._lock:
+            if ('base' in self.index['objects'].get(digest, {})) or (digest in self._data_cache):
+                data = self.get(digest)
+                f_out.write(data)
+
+                return digest, zlib.crc32(data)
+
+            with self._open_object_(digest) as f_in:
+                start = f_in.tell()
+                is_container = BackupContainer.is_container(f_in.read(BackupContainer.HEADER_LENGTH))
+                f_in.seek(start)
+
+                if is_container:
+                    d_hash, d_crc, _ = BackupContainer.decode(f_in, f_out)
+
+                f_in.close()
+
+        if not is_container:
+            # Legacy objects cannot be streamed.
+            data = self.get(digest)
+            f_out.write(data)
+
+            return digest, zlib.crc32(data)
+
+        assert d_hash == digest, f'Backup object {digest} is corrupted.'
+        return d_hash, d_crc
+
+    def _open_object_(self, digest: str) -> BinaryIO:
+        # Opens the object file (or the pack, if the object was compacted into it), positioned at the start of the
+        #   object.
+        packed = self.index['objects'].get(digest, {}).get('pack')
+
+        if isinstance(packed, list):
+            f_in = open(self.pack_file(self.index['pack']).file_path, 'rb')
+            f_in.seek(packed[0])
+
+            return cast(BinaryIO, f_in)
+
+        object_file = self.object_file(digest)
+        assert os.path.isfile(object_file.file_path), f'Backup object {digest} not found.'
+
+        return cast(BinaryIO, open(object_file.file_path, 'rb'))
+
+    def _read_object_(self, digest: str) -> bytes:
+        packed = self.index['objects'].get(digest, {}).get('pack')
+
+        with self._open_object_(digest) as f_in:
+            raw = f_in.read(packed[1] if isinstance(packed, list) else -1)
+            f_in.close()
+
+        return raw
+
+    def _cache_(self, digest: str, data: bytes) -> None:
+        # Keep the plain text of recently stored snapshots (bases for the next delta), bounded by
+        #   POLICY_FIO_SWB_DELTA_CACHE_BYTES.
+        if not qa_app_pol.POLICY_FIO_SWB_DELTA_ENABLED or len(data) > qa_app_pol.POLICY_FIO_SWB_DELTA_CACHE_BYTES:
+            return
+
+        self._data_cache[digest] = data
+        self._data_cache.move_to_end(digest)
+
+        while sum(len(d) for d in self._data_cache.values()) > qa_app_pol.POLICY_FIO_SWB_DELTA_CACHE_BYTES:
+            self._data_cache.popitem(last=False)
+
+    @staticmethod
+    def _delta_candidate_(size: int) -> bool:
+        # Deltas are computed in memory; larger files are always streamed as full snapshots.
+        return qa_app_pol.POLICY_FIO_SWB_DELTA_ENABLED and \
+            (qa_app_pol.POLICY_FIO_SWB_DELTA_MIN_SIZE <= size <= qa_app_pol.POLICY_FIO_SWB_DELTA_CACHE_BYTES)
+
+    def _delta_against_latest_(
+            self,
+            source: qa_def.File,
+            data: bytes,
+            digest: str
+    ) -> Tuple[Optional[str], Optional[bytes]]:
+        # Returns (base digest, delta) or (None, None) if a full snapshot should be stored.
+        if not SecureWriteBackupStore._delta_candidate_(len(data)):
+            return None, None
+
+        base = self.latest(source)
+        if (base is None) or (base not in self.index['objects']):
+            return None, None
+
+        # Force a full snapshot every POLICY_FIO_SWB_DELTA_MAX_CHAIN deltas.
+        if self.index['objects'][base].get('depth', 0) >= qa_app_pol.POLICY_FIO_SWB_DELTA_MAX_CHAIN:
+            return None, None
+
+        # The object cannot be a delta against itself (or against a delta that is based on it); this happens when the
+        #   object file of an earlier snapshot is missing and the object is stored again.
+        ancestors: List[str] = []
+        ancestor: Optional[str] = base
+
+        while isinstance(ancestor, str) and (ancestor not in ancestors):
+            if ancestor == digest:
+                return None, None
+
+            ancestors.append(ancestor)
+            ancestor = self.index['objects'].get(ancestor, {}).get('base')
+
+        try:
+            base_data = self.get(base)
+
+        except AssertionError as AE:
+            qa_console_write.Write.warn('[SWBS] Delta base could not be read; storing a full snapshot.', str(AE))
+            return None, None
+
+        delta = BackupDelta.compute(base_data, data, qa_app_pol.POLICY_FIO_SWB_DELTA_BLOCK_SIZE)
+
+        # The delta must rebuild the data that was hashed (otherwise, the full snapshot is checked against the digest).
+        if (delta is None) or (hashlib.sha256(BackupDelta.apply(base_data, delta)).hexdigest() != digest):
+            return None, None
+
+        return base, delta
+
+    def latest(self, source: qa_def.File) -> Optional[str]:
+        snapshots = self.index['files'].get(source.file_path, [])
+        return cast(str, snapshots[-1]['hash']) if len(snapshots) else None
+
+    def pack_file(self, pack_name: str) -> qa_def.File:
+        return qa_def.File(f'{self.root}\\{pack_name}')
+
+    def _release_(self, source_path: str, digest: str) -> int:
+        # Drop one reference (held by source_path) to the object. Deletes the object if it is no longer referenced.
+        #   Returns the number of bytes freed.
+        obj = self.index['objects'].get(digest)
+        if not isinstance(obj, dict):
+            return 0
+
+        refs = obj['refs']
+        refs[source_path] = refs.get(source_path, 0) - 1
+
+        if refs[source_path] <= 0:
+            refs.pop(source_path)
+
+        if len(refs):
+            return 0
+
+        self.index['objects'].pop(digest)
+        self._data_cache.pop(digest, None)
+        object_file = self.object_file(digest)
+
+        if os.path.isfile(object_file.file_path):
+            os.remove(object_file.file_path)
+
+        # Packed objects are only removed from the pack when it is compacted.
+        freed = cast(int, obj.get('stored', obj['size']))
+
+        if 'base' in obj:
+            # Delta objects release their base.
+            freed += self._release_(f'@{digest}', obj['base'])
+
+        return freed
+
+    def _list_object_files_(self) -> List[Tuple[str, str]]:
+        # Returns (digest, path) for every (loose) object file on disk.
+        output: List[Tuple[str, str]] = []
+
+        if not os.path.isdir(self.root):
+            return output
+
+        for sub_dir in os.scandir(self.root):
+            if not (sub_dir.is_dir() and len(sub_dir.name) == 2):
+                continue
+
+            for entry in os.scandir(sub_dir.path):
+                if entry.name.endswith(f'.{self.extension}'):
+                    output.append((entry.name.split('.')[0], entry.path))
+
+        return output
+
+    def sweep(self) -> Tuple[int, int]:
+        """
+        SecureWriteBackupStore.sweep
+
+        Applies the retention policies and deletes unreferenced objects, orphaned object files, stale packs, and legacy
+        backups (<name>-<md5>-<salt>.qSWBackup) older than POLICY_FIO_SWB_MAX_AGE_DAYS.
+
+        :return:        Number of snapshots removed, number of bytes freed
+        """
+
+        now = time.time()
+        max_age = qa_app_pol.POLICY_FIO_SWB_MAX_AGE_DAYS * 86_400
+        removed, freed = 0, 0
+
+        with self._lock:
+            objects, files = self.index['objects'], self.index['files']
+
+            # 1) Keep the last N snapshots of each file; remove snapshots older than the max. age.
+            for source_path in [*files.keys()]:
+                snapshots = files[source_path]
+                first_kept = max(0, len(snapshots) - qa_app_pol.POLICY_FIO_SWB_KEEP_LAST_N)
+                kept = []
+
+                for i, snapshot in enumerate(snapshots):
+                    if (i >= first_kept) and (now - snapshot['time'] <= max_age):
+                        kept.append(snapshot)
+                        continue
+
+                    freed += self._release_(source_path, snapshot['hash'])
+                    removed += 1
+
+                if len(kept):
+                    files[source_path] = kept
+                else:
+                    files.pop(source_path)
+
+            # 2) Remove the oldest snapshots (across all files) while the store is too large.
+            total = sum(obj.get('stored', obj['size']) for obj in objects.values())
+
+            if total > qa_app_pol.POLICY_FIO_SWB_MAX_TOTAL_BYTES:
+                for _, source_path in sorted(
+                    (snapshot['time'], source_path)
+                    for source_path, snapshots in files.items()
+                    for snapshot in snapshots
+                ):
+                    if total <= qa_app_pol.POLICY_FIO_SWB_MAX_TOTAL_BYTES:
+                        break
+
+                    # Snapshots are stored oldest first.
+                    snapshot = files[source_path].pop(0)
+                    if not len(files[source_path]):
+                        files.pop(source_path)
+
+                    n_freed = self._release_(source_path, snapshot['hash'])
+                    total, freed, removed = total - n_freed, freed + n_freed, removed + 1
+
+            # 3) Delete orphaned object files (not in the index, or already packed).
+            for digest, path in self._list_object_files_():
+                if (digest not in objects) or ('pack' in objects[digest]):
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+
+            # 4) Delete stale packs and legacy backups.
+            if os.path.isdir(self.root):
+                for entry in os.scandir(self.root):
+                    if not entry.is_file():
+                        continue
+
+                    stale_pack = entry.name.endswith('.qSWPack') and (entry.name != self.index['pack'])
+                    legacy_backup = entry.name.endswith(f'.{self.extension}') and \
+                        (now - entry.stat().st_mtime > max_age)
+
+                    if stale_pack or legacy_backup:
+                        freed += entry.stat().st_size
+                        os.remove(entry.path)
+
+            self._save_index_()
+
+        return removed, freed
+
+    def compact(self) -> int:
+        """
+        SecureWriteBackupStore.compact
+
+        Packs every object that has not been referenced for POLICY_FIO_SWB_COMPACT_AFTER_DAYS days (and every object
+        that is already packed) into a new pack: a single archive of the objects, followed by its table of contents
+        (JSON; {digest: [offset, length]}) and the length of the table of contents (8 bytes, big endian).
+
+        Objects that were removed since the last compaction are dropped from the pack.
+
+        :return:        Number of objects that were moved into the pack
+        """
+
+        cutoff = time.time() - qa_app_pol.POLICY_FIO_SWB_COMPACT_AFTER_DAYS * 86_400
+
+        with self._lock:
+            objects, files = self.index['objects'], self.index['files']
+            old_pack = self.index['pack']
+
+            # Time at which each object was last referenced.
+            last_ref: Dict[str, float] = {}
+            for snapshots in files.values():
+                for snapshot in snapshots:
+                    last_ref[snapshot['hash']] = max(last_ref.get(snapshot['hash'], 0), snapshot['time'])
+
+            packed = [digest for digest, obj in objects.items() if 'pack' in obj]
+            loose = [
+                digest for digest, obj in objects.items()
+                if ('pack' not in obj) and (last_ref.get(digest, 0) <= cutoff) and
+                os.path.isfile(self.object_file(digest).file_path)
+            ]
+
+            if not len(loose):
+                return 0
+
+            # Write the new pack under a new name; the old pack is only deleted (by the sweep) once the index has been
+            #   updated.
+            pack_name = f'pack-{int(time.time() * 1000)}.qSWPack'
+            pack_file = self.pack_file(pack_name)
+            toc: Dict[str, List[int]] = {}
+
+            if not os.path.isdir(self.root):
+                os.makedirs(self.root)
+
+            with open(pack_file.file_path, 'wb') as f_out:
+                if len(packed):
+                    # Copy the objects that are still referenced from the old pack.
+                    with open(self.pack_file(cast(str, old_pack)).file_path, 'rb') as f_in:
+                        for digest in packed:
+                            offset, length = objects[digest]['pack']
+                            f_in.seek(offset)
+
+                            toc[digest] = [f_out.tell(), length]
+                            f_out.write(f_in.read(length))
+
+                        f_in.close()
+
+                for digest in loose:
+                    with open(self.object_file(digest).file_path, 'rb') as f_in:
+                        raw = f_in.read()
+                        f_in.close()
+
+                    toc[digest] = [f_out.tell(), len(raw)]
+                    f_out.write(raw)
+
+                toc_bytes = json.dumps(toc).encode()
+                f_out.write(toc_bytes + len(toc_bytes).to_bytes(8, 'big'))
+
+                f_out.flush()
+                os.fsync(f_out.fileno())
+                f_out.close()
+
+            for digest, entry in toc.items():
+                objects[digest]['pack'] = entry
+
+            self.index['pack'] = pack_name
+            self._save_index_()
+
+            # Now that the index points to the new pack, remove the loose copies and the old pack.
+            for digest in loose:
+                os.remove(self.object_file(digest).file_path)
+
+            if isinstance(old_pack, str) and os.path.isfile(self.pack_file(old_pack).file_path):
+                os.remove(self.pack_file(old_pack).file_path)
+
+        return len(loose)
+
+
+class BackupSweeper(Thread):
+    def __init__(self, store: SecureWriteBackupStore) -> None:
+        """
+        BackupSweeper
+
+        Background thread that runs SecureWriteBackupStore.sweep every POLICY_FIO_SWB_SWEEP_INTERVAL seconds (and once
+        when started).
+
+        :param store:   Backup store to sweep
+        """
+
+        Thread.__init__(self, name='BackupSweeper', daemon=True)
+
+        self.store = store
+        self._stop_event = Event()
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.store.sweep()
+
+            except Exception as E:
+                qa_console_write.Write.error('[BackupSweeper] Failed to sweep the backup store: ', str(E))
+
+            if self._stop_event.wait(qa_app_pol.POLICY_FIO_SWB_SWEEP_INTERVAL):
+                return
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class FileView:
+    def __init__(self, file: qa_def.File, data: memoryview, mapping: Optional[mmap.mmap] = None) -> None:
+        """
+        FileView
+
+        Read-only view of a file's contents (see FileIO.open_view). Large files are memory-mapped; the view must be
+        closed (or used as a context manager) before the file is written to again.
+
+        :param file:        Source file
+        :param data:        View of the data
+        :param mapping:     Memory map backing the view (if any)
+        """
+
+        self.file, self.data, self._mapping = file, data, mapping
+
+    def close(self) -> None:
+        self.data.release()
+
+        if isinstance(self._mapping, mmap.mmap):
+            self._mapping.close()
+
+    def __enter__(self) -> memoryview:
+        return self.data
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class WriteAheadJournal:
+    extension = 'qWAL'
+
+    def __init__(self, file_path: str = qa_app_info.Storage.WriteAheadJournalFile) -> None:
+        """
+        WriteAheadJournal
+
+        Append-only journal of the transactions and secure appends that are in progress. Each record is stored as:
+            length of the payload (4 bytes), CRC32 of the payload (4 bytes), payload (JSON)
+
+        Records:
+            {"op": "replace", "id": str, "entries": [{"target": path, "temp": path, "old": path or null}, ...]}
+                Written once the new data of every target is in its (fsync'd) temp file, before any target is replaced.
+            {"op": "append", "id": str, "target": path, "length": int}
+                Written before data is appended to the target (length: original length of the target).
+            {"op": "end", "id": str}
+                Written once the operation has completed (or has been rolled back in-process).
+
+        Only the records that start an operation are fsync'd (one fsync per operation); "end" records are flushed. If an
+        "end" record is lost (OS crash), the operation is completed or discarded again at startup, which is harmless.
+        Single-file secure writes are not journaled: the target is replaced atomically (os.replace), and an interrupted
+        write only leaves a temp file behind.
+
+        At startup (see WriteAheadJournal.recover), operations without an "end" record are completed (replace; the new
+        data is already on the disk) or discarded (append; the target is truncated to its original length), and
+        orphaned temp files are deleted. A torn record at the end of the journal is ignored.
+
+        :param file_path:   Journal file
+        """
+
+        self.file = qa_def.File(file_path)
+
+        self._lock = Lock()
+        self._f_out: Optional[BinaryIO] = None
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._count = 0
+
+    def _write_record_(self, record: Dict[str, Any]) -> None:
+        # Must be called with the lock held.
+        payload = json.dumps(record).encode()
+
+        if self._f_out is None:
+            if len(self.file.path) and not os.path.isdir(self.file.path):
+                os.makedirs(self.file.path)
+
+            self._f_out = cast(BinaryIO, open(self.file.file_path, 'ab'))
+
+        self._f_out.write(len(payload).to_bytes(4, 'big') + zlib.crc32(payload).to_bytes(4, 'big') + payload)
+        self._f_out.flush()
+
+        if qa_app_pol.POLICY_FIO_WAL_FSYNC and (record['op'] != 'end'):
+            os.fsync(self._f_out.fileno())
+
+    def _begin_(self, record: Dict[str, Any]) -> str:
+        with self._lock:
+            self._count += 1
+            op_id = f'{os.getpid()}.{time.time_ns()}.{self._count}'
+
+            # The operation is open from the moment its record is written (the journal is never restarted while an
+            #   operation is open).
+            self._open[op_id] = {**record, 'id': op_id}
+
+            try:
+                self._write_record_(self._open[op_id])
+
+            except BaseException:
+                self._open.pop(op_id)
+                raise
+
+        return op_id
+
+    def begin_replace(self, entries: List[Dict[str, Any]]) -> str:
+        """
+        WriteAheadJournal.begin_replace
+
+        :param entries:     [{"target": path, "temp": path, "old": path or None}, ...]
+        :return:            Operation ID
+        """
+
+        return self._begin_({'op': 'replace', 'entries': entries})
+
+    def begin_append(self, target: qa_def.File) -> str:
+        length = os.path.getsize(target.file_path) if os.path.isfile(target.file_path) else 0
+        return self._begin_({'op': 'append', 'target': target.file_path, 'length': length})
+
+    def end(self, op_id: str) -> None:
+        with self._lock:
+            if self._open.pop(op_id, None) is None:
+                return
+
+            self._write_record_({'op': 'end', 'id': op_id})
+
+            # Start a new journal once it is large and no operation is in progress.
+            if (self._f_out is not None) and not len(self._open) and \
+                    self._f_out.tell() > qa_app_pol.POLICY_FIO_WAL_MAX_SIZE:
+                self._f_out.truncate(0)
+                self._f_out.seek(0)
+
+    def _read_records_(self) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+
+        if not os.path.isfile(self.file.file_path):
+            return records
+
+        with open(self.file.file_path, 'rb') as f_in:
+            while True:
+                prefix = f_in.read(8)
+                if len(prefix) < 8:
+                    break
+
+                length, crc32 = int.from_bytes(prefix[:4], 'big'), int.from_bytes(prefix[4:], 'big')
+                payload = f_in.read(length)
+
+                if (len(payload) < length) or (zlib.crc32(payload) != crc32):
+                    # Torn (partially written) record: the process died while writing it.
+                    break
+
+                records.append(json.loads(payload))
+
+            f_in.close()
+
+        return records
+
+    @staticmethod
+    def _complete_replace_(record: Dict[str, Any]) -> None:
+        # The new data is in the temp files (fsync'd before the record was written): finish replacing the targets.
+        for entry in record['entries']:
+            if os.path.isfile(entry['temp']):
+                if isinstance(entry['old'], str) and os.path.isfile(entry['target']) and not os.path.isfile(entry['old']):
+                    os.replace(entry['target'], entry['old'])
+
+                os.replace(entry['temp'], entry['target'])
+
+        for entry in record['entries']:
+            if isinstance(entry['old'], str) and os.path.isfile(entry['old']):
+                os.remove(entry['old'])
+
+    @staticmethod
+    def _discard_append_(record: Dict[str, Any]) -> None:
+        if os.path.isfile(record['target']) and os.path.getsize(record['target']) > record['length']:
+            with open(record['target'], 'r+b') as f_io:
+                f_io.truncate(record['length'])
+                f_io.close()
 
-from qa_std import (
-    qa_def,
-    qa_dtc,
-    qa_app_info,
-    qa_app_pol,
-    locale,
-    qa_console_write,
-    qa_nvf_manager
-)
+    def recover(self, directories: Optional[List[str]] = None) -> int:
+        """
+        WriteAheadJournal.recover
 
+        Completes or discards the operations that were in progress when the app last exited, deletes orphaned temp
+        files (left behind by interrupted secure writes), then starts a new journal. Must be called at startup, before
+        any file is written.
 
-class FileType(Enum):
-    SecureWriteBackup = 0
-    QuizFile = 1
-    AdminFile = 2
-    Theme = 3
+        :param directories:     Directories that are searched (recursively) for orphaned temp files
+                                (default: the app data directory)
+        :return:                Number of operations that were recovered
+        """
 
+        with self._lock:
+            assert self._f_out is None, 'The journal is already in use.'
 
-class BadFileFormat(Exception):
-    def __init__(self, file_format: str, error: str) -> None:
-        assert file_format in FileType._member_names_, 'Invalid file_format.'
-        self.ff = file_format
-        self.e = error
+        pending: Dict[str, Dict[str, Any]] = {}
+        for record in self._read_records_():
+            if record['op'] == 'end':
+                pending.pop(record['id'], None)
+            else:
+                pending[record['id']] = record
 
-    def __str__(self) -> str:
-        return f'Improper file format for "{self.ff}". {self.e}'
+        for record in pending.values():
+            try:
+                if record['op'] == 'replace':
+                    WriteAheadJournal._complete_replace_(record)
+                    qa_console_write.Write.ok(f'[WAL] Completed interrupted write ({record["id"]}).')
 
+                elif record['op'] == 'append':
+                    WriteAheadJournal._discard_append_(record)
+                    qa_console_write.Write.warn(f'[WAL] Discarded interrupted append to "{record["target"]}".')
 
-@dataclass
-class HeaderSection:
-    SectionName: str
+            except Exception as E:
+                qa_console_write.Write.error(f'[WAL] Failed to recover operation {record["id"]}: ', str(E))
 
-    # SectionStart and SectionLength are both both indices.
-    SectionStart: int
-    SectionLength: int
+        for directory in (directories if isinstance(directories, list) else [qa_app_info.Storage.AppDataDir]):
+            WriteAheadJournal._remove_temp_files_(directory)
 
-    # What version of the header is this applicable to?
-    HeaderVersion: Tuple[int]
+        if os.path.isfile(self.file.file_path):
+            os.remove(self.file.file_path)
 
+        return len(pending)
 
-class Header:
-    MAGIC_BYTES = HeaderSection('MAGIC_BYTES', 0, 4, (1,))
-    VERSION = HeaderSection('VERSION', 4, 2, (1,))
+    @staticmethod
+    def _remove_temp_files_(directory: str) -> None:
+        # Temp files are created next to their targets (see FileIO._write_stream_to_temp_file_); no write is in progress
+        #   at startup, so any temp file that is left is an orphan.
+        for root, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                if not file_name.endswith(f'.{FileIO.temp_extension}'):
+                    continue
 
-    HEADER_VERSION = HeaderSection('HEADER_VERSION', 6, 2, (1,))
+                try:
+                    os.remove(os.path.join(root, file_name))
+                    qa_console_write.Write.warn(f'[WAL] Deleted orphaned temp file "{file_name}".')
 
-    # Used by external functions
-    byteorder: Literal['big', 'little'] = 'big'
-    items = [MAGIC_BYTES, VERSION, HEADER_VERSION]
+                except OSError as E:
+                    qa_console_write.Write.error(f'[WAL] Failed to delete orphaned temp file "{file_name}": ', str(E))
 
+    def close(self) -> None:
+        with self._lock:
+            if self._f_out is not None:
+                self._f_out.close()
+                self._f_out = None
 
-@dataclass
-class HeaderData:
-    MAGIC_BYTES: bytes
 
-    # Version information
-    VERSION_BYTES: bytes
-    VERSION_INT: int
+class Transaction:
+    old_extension = 'qTxOld'
 
-    # Header version information
-    HEADER_VERSION_BYTES: bytes
-    HEADER_VERSION_INT: int
+    def __init__(self, file_io: 'FileIO', tag: str = IOHistory.DEFAULT_TAG) -> None:
+        """
+        Transaction
 
-    # File Type information
-    DETECTED_FILE_TYPE: FileType
+        Stages writes to one or more files and commits them together (see FileIO.transaction):
+            1) The new data for every file is written to a sibling temp file (fsync'd).
+            2) Each target file is moved aside (renamed) and replaced by its temp file.
+            3) Once every file has been replaced, the moved-aside files are deleted.
 
+        If any step fails, every file that was already replaced is restored (the journal records the temp and the
+        moved-aside file of each target). If the process dies between 2) and 3), the write-ahead journal completes the
+        transaction at the next startup (see WriteAheadJournal). The batch costs one IO event (see IOHistory).
 
-@dataclass
-class HeaderVersionOne(HeaderData):
-    pass
+        :param file_io:     FileIO object
+        :param tag:         Caller (subsystem) tag
+        """
 
+        self._fio, self.tag = file_io, tag
 
-# Each file type, except for SecureWriteBackup files, must have one of the following bytes in their header, which
-#   is used to identify the file type.
+        # Staged writes, keyed by file path: [file, data (parts), append to the current data?]
+        self._staged: Dict[str, Tuple[qa_def.File, List[bytes], bool]] = {}
+        self.committed = False
 
-MagicBytes = {
-    b'\x01\xff\x17\x10': FileType.QuizFile,
-    b'\x01\xff\x17\x11': FileType.AdminFile,
-    b'\x01\xff\x17\x12': FileType.Theme
-}
+    def write(self, file: qa_def.File, data: Any, append_mode: bool = False, append_delim: str = '\n') -> None:
+        """
+        Transaction.write
 
-MPV_FIO_923983nfu_MBR: Dict[FileType, bytes] = {v: k for k, v in MagicBytes.items()}
+        Stages a write (the data is converted to bytes now).
+
+        :param file:            qa_def.File object for output file
+        :param data:            Data to write (any type that can be converted to bytes via qa_std.qa_dtc)
+        :param append_mode:     Should the data be appended to the file (or to the data staged for the file)?
+        :param append_delim:    Delimiter used to separated current and new bytes, if append_mode is enabled.
+        :return:                None
+        """
 
+        assert not self.committed, 'Transaction already committed.'
 
-def GetMagicBytes(file_type: FileType) -> bytes:
-    global MPV_FIO_923983nfu_MBR
-    return MPV_FIO_923983nfu_MBR[file_type]
+        new_bytes = qa_dtc.convert(bytes, data, cfa=self._fio.cfa)
 
+        if not append_mode:
+            self._staged[file.file_path] = (file, [new_bytes], False)
+            return
 
-class OperationType(Enum):
-    READ = 0
-    WRITE = 1
+        delim_bytes = qa_dtc.convert(bytes, append_delim, cfa=self._fio.cfa)
+        _, parts, append = self._staged.get(file.file_path, (file, [], True))
+        self._staged[file.file_path] = (file, [*parts, delim_bytes, new_bytes], append)
 
+    def _final_bytes_(self, file: qa_def.File, parts: List[bytes], append: bool) -> bytes:
+        if append and os.path.isfile(file.file_path):
+            with open(file.file_path, 'rb') as f_in:
+                parts = [f_in.read(), *parts]
+                f_in.close()
 
-class IOHistory:
-    def __init__(self) -> None:
-        self.after = lambda t, f: Timer(t, f)
-        self._buffer: List[Tuple[OperationType, int]] = []
-        self.current_task = self.after(10, self._clear_buffer)
-        self.current_task.start()
-
-    def _clear_buffer(self) -> None:
-        if not qa_nvf_manager.NVF.check_flag('AppRun'):
-            sys.stderr.write('[ERROR in QA 4 File Standardization] <IOHistory._clear_buffer> App not running.')
+        return b''.join(parts)
+
+    @staticmethod
+    def _rollback_(journal: List[Dict[str, Any]]) -> None:
+        # Undo (in reverse order) every step recorded in the journal.
+        for entry in reversed(journal):
+            try:
+                if entry['state'] == 'replaced':
+                    if isinstance(entry['old'], str):
+                        os.replace(entry['old'], entry['target'])
+                    else:
+                        os.remove(entry['target'])
+
+                elif entry['state'] == 'moved':
+                    os.replace(entry['old'], entry['target'])
+
+                if isinstance(entry['temp'], str) and os.path.isfile(entry['temp']):
+                    os.remove(entry['temp'])
+
+            except Exception as E:
+                qa_console_write.Write.error(f'[Transaction] Failed to roll back "{entry["target"]}": ', str(E))
+
+    def commit(self) -> None:
+        """
+        Transaction.commit
+
+        :raises IOError:        If the transaction could not be committed (every file is rolled back).
+        :return:                None
+        """
+
+        assert not self.committed, 'Transaction already committed.'
+        self.committed = True
+
+        if not len(self._staged):
             return
 
-        self._buffer = []
-        self.current_task = self.after(10, self._clear_buffer)
-        self.current_task.start()
+        self._fio.iohm.add_event(OperationType.WRITE, self.tag)
 
-    def add_event(self, op_type: OperationType) -> None:
-        self._buffer.append(
-            (op_type, len(self._buffer) * random.randint(1001, 9999))
-        )
+        # Make sure that any queued writes to the same files are applied first.
+        for file, _, _ in self._staged.values():
+            self._fio.flush(file)
 
-        if len(self._buffer) > qa_app_pol.POLICY_MAX_IO_EVENTS_PER_MINUTE // 6:
-            raise IOError(
-                'Too many IO events in 10 sec. ' +
-                f'({len(self._buffer)} > {qa_app_pol.POLICY_MAX_IO_EVENTS_PER_MINUTE // 6})'
-            )
+        journal: List[Dict[str, Any]] = []
+        op_id: Optional[str] = None
+        start = time.perf_counter()
+
+        try:
+            for path, (file, parts, append) in self._staged.items():
+                if qa_app_pol.POLICY_FIO_SW_KEEP_BACKUP and os.path.isfile(path) and os.path.getsize(path):
+                    _, _, backup_made = self._fio._create_file_backup_(file)
+                    assert backup_made, '[TRANSACTION] Failed to create file backup'
+
+                temp = FileIO._write_bytes_to_temp_file_(file, self._final_bytes_(file, parts, append))
+                journal.append({
+                    'target': path, 'temp': temp, 'old': f'{temp}.{Transaction.old_extension}', 'state': 'staged'
+                })
+
+            if qa_app_pol.POLICY_FIO_WAL_ENABLED:
+                op_id = self._fio.journal.begin_replace(
+                    [{'target': e['target'], 'temp': e['temp'], 'old': e['old']} for e in journal]
+                )
+
+            for entry in journal:
+                if os.path.isfile(entry['target']):
+                    os.replace(entry['target'], entry['old'])
+                    entry['state'] = 'moved'
+
+                else:
+                    entry['old'] = None
+
+                os.replace(entry['temp'], entry['target'])
+                entry['temp'], entry['state'] = None, 'replaced'
+
+        except Exception as E:
+            qa_console_write.Write.error('[Transaction] Failed to commit transaction; rolling back: ', str(E))
+            Transaction._rollback_(journal)
+
+            if isinstance(op_id, str):
+                self._fio.journal.end(op_id)
 
-    def __del__(self) -> None:
-        self.current_task.cancel()
+            latency = time.perf_counter() - start
+            for path in self._staged:
+                self._fio.iohm.record(OperationType.WRITE, 0, latency, self.tag, path, failed=True)
+
+            raise IOError('Failed to commit transaction.')
+
+        for entry in journal:
+            if isinstance(entry['old'], str) and os.path.isfile(entry['old']):
+                os.remove(entry['old'])
+
+        if isinstance(op_id, str):
+            self._fio.journal.end(op_id)
+
+        latency = (time.perf_counter() - start) / len(journal)
+        for path, (_, parts, _) in self._staged.items():
+            self._fio.iohm.record(OperationType.WRITE, sum(len(p) for p in parts), latency, self.tag, path)
+
+    def __enter__(self) -> 'Transaction':
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        # Staged writes are discarded if the block raised an exception.
+        if exc_type is None:
+            self.commit()
 
 
 class FileIO:
+    temp_extension = 'qSWTemp'
 
     MPV_FIO_710Nd_enK: Dict[FileType, bytes] = {
         FileType.SecureWriteBackup: b'TniX7J7DK67d4kkNl-6NAz4oFX9gOdGZ502N5-LoNMs='
@@ -188,12 +1929,19 @@ class FileIO:
 
         Contains functions for:
             1) Writing to files
+            2) Queued (write-behind) writes; see FileIO.flush and FileIO.close
+            3) Reading files; see FileIO.read and FileIO.open_view
+            4) Multi-file (atomic) writes; see FileIO.transaction
 
         Automatically takes care of encryption and decryption.
 
         :param IOHistoryManager:
         :param args: Misc. args
         :param kwargs: Misc. keyword args
+
+        :keyword cfa:           CFA struct used to convert data to bytes
+        :keyword backup_store:  SecureWriteBackupStore used for secure write backups
+        :keyword journal:       WriteAheadJournal used for crash recovery
         """
 
         self.locale: locale.Locale = locale.get_locale()
@@ -202,92 +1950,200 @@ class FileIO:
         self.cfa = qa_dtc.CFA() if not isinstance(self._kw.get('cfa'), qa_dtc.CFA) else self._kw.get('cfa')
         self.iohm = IOHistoryManager
 
+        self.backup_store = cast(SecureWriteBackupStore, self._kw.get('backup_store')) \
+            if isinstance(self._kw.get('backup_store'), SecureWriteBackupStore) else SecureWriteBackupStore()
+
+        self.journal = cast(WriteAheadJournal, self._kw.get('journal')) \
+            if isinstance(self._kw.get('journal'), WriteAheadJournal) else WriteAheadJournal()
+
+        # Writer threads (one per target file), keyed by file path.
+        self._writers: Dict[str, FileWriter] = {}
+        self._writers_lock = Lock()
+
+    @staticmethod
+    def _emit_(output_file: BinaryIO, data: Union[bytes, EncodedStream]) -> int:
+        return data.write_to(output_file) if isinstance(data, EncodedStream) else output_file.write(data)
+
     @staticmethod
-    def _write_bytes_to_file_(file: qa_def.File, data: bytes) -> None:
+    def _size_(data: Union[bytes, EncodedStream]) -> int:
+        # The size of an EncodedStream is only known once it has been written.
+        return data.size if isinstance(data, EncodedStream) else len(data)
+
+    @staticmethod
+    def _write_bytes_to_file_(file: qa_def.File, data: Union[bytes, EncodedStream]) -> None:
         if len(file.path):
             if not os.path.isdir(file.path):
                 os.makedirs(file.path)
 
         with open(file.file_path, 'wb') as output_file:
-            output_file.write(data)
+            FileIO._emit_(cast(BinaryIO, output_file), data)
             output_file.close()
 
-    def _create_file_backup_(self, file: qa_def.File, current_bytes: bytes) -> Tuple[qa_def.File, bool]:
-        # Take a backup of the file, store it in the appdata folder
-        i = 1
-
-        # This loop is compliant with the MAX_WHILE_LOOP_RETRIES policy.
-        #   Use i as a counter for how many attempts have been made at file name generation.
-        while i < qa_app_pol.POLICY_MAX_WHILE_LOOP_RETRIES:
-            # Base file name
-            backup_file_name = f'{file.file_name}-{hashlib.md5(current_bytes).hexdigest()}'
-            # Salt: random number. Add: extension
-            backup_file_name += f'-{str(random.random()).split(".")[-1]}.qSWBackup'
-            # Add: directory absolute path.
-            backup_file_name = f'{qa_app_info.Storage.SecureWriteBackupDir}\\{backup_file_name}'
-
-            if not os.path.exists(backup_file_name):
-                break
+    @staticmethod
+    def _write_bytes_to_temp_file_(file: qa_def.File, data: Union[bytes, EncodedStream]) -> str:
+        return FileIO._write_stream_to_temp_file_(file, lambda output_file: FileIO._emit_(output_file, data))[0]
 
-            i += 1
+    @staticmethod
+    def _write_stream_to_temp_file_(file: qa_def.File, writer: Callable[[BinaryIO], Any]) -> Tuple[str, Any]:
+        # The writer writes the data to the (open) temp file; its return value is passed on to the caller.
+        if len(file.path):
+            if not os.path.isdir(file.path):
+                os.makedirs(file.path)
 
-        else:
-            raise Exception(f'File name generation took too many attempts ({i}).')
+        # Create a temporary file next to the target file (same directory --> same volume; os.replace is atomic).
+        fd, temp_file_path = tempfile.mkstemp(
+            suffix=f'.{FileIO.temp_extension}',
+            prefix=f'{file.file_name}.',
+            dir=file.path if len(file.path) else os.curdir
+        )
 
-        # Encrypt current_bytes using SecureWriteBackup encryption key.
-        current_enc_bytes = Fernet(self.MPV_FIO_710Nd_enK[FileType.SecureWriteBackup]).encrypt(current_bytes)
+        try:
+            with os.fdopen(fd, 'wb') as output_file:
+                output = writer(cast(BinaryIO, output_file))
 
-        # Store the backup_file_name as a File object for ease of use (splits dir and file names with regex).
-        backup_file = qa_def.File(backup_file_name)
+                # Make sure that the data has reached the disk before the temp file replaces the target file.
+                output_file.flush()
+                os.fsync(output_file.fileno())
+                output_file.close()
 
-        if not os.path.isdir(backup_file.path):
-            # If the destination directory tree does not exist, create it before creating the backup file.
-            os.makedirs(backup_file.path)
+        except BaseException:
+            os.remove(temp_file_path)
+            raise
 
-        # Store the data as encrypted bytes.
-        with open(backup_file.file_path, 'wb') as f_out:
-            # Optionally: compress the data too
-            if qa_app_pol.POLICY_FIO_SW_COMPRESS_SRC_FILE:
-                f_out.write(gzip.compress(current_enc_bytes, qa_app_pol.POLICY_SW_GZIP_COMPRESSION_LEVEL))
+        return temp_file_path, output
 
-            else:
-                f_out.write(current_enc_bytes)
+    def _atomic_write_(self, file: qa_def.File, new_bytes: Union[bytes, EncodedStream]) -> bool:
+        if qa_app_pol.POLICY_FIO_SW_KEEP_BACKUP and os.path.isfile(file.file_path) and os.path.getsize(file.file_path):
+            # Optionally (opt-in): keep an encrypted backup of the current data.
+            _, _, backup_made = self._create_file_backup_(file)
+            assert backup_made, '[SECURE WRITE] Failed to create file backup'
 
-            f_out.close()
+        try:
+            # Write the new data to a sibling temp file, then replace the target file with it. The target file is never
+            #   partially written; if anything fails, the target file is left untouched.
+            #   The write is not journaled: if the process dies, the temp file is deleted at startup (see
+            #   WriteAheadJournal.recover).
+            temp_file_path = FileIO._write_bytes_to_temp_file_(file, new_bytes)
 
-        return backup_file, os.path.isfile(backup_file.file_path)
+            try:
+                os.replace(temp_file_path, file.file_path)
 
-    @staticmethod
-    def _restore_from_backup_(output_file: qa_def.File, backup_file: qa_def.File, crc32: int) -> None:
-        # Make sure that the backup file exists, and it is in the right directory
-        assert (backup_file.path == qa_app_info.Storage.SecureWriteBackupDir) & os.path.isfile(backup_file.file_path), \
-            'Invalid backup file (ERROR 1)'
+            except BaseException:
+                os.remove(temp_file_path)
+                raise
 
-        qa_console_write.Write.ok('File format accepted.')
+        except PermissionError as PE:
+            qa_console_write.Write.error('Failed to write data to output file due to insufficient permission(s).')
+            raise PE
 
-        # Copy backup file to output_dir
-        shutil.copyfile(backup_file.file_path, f'{output_file.file_path}.swb')
+        except Exception as E:
+            qa_console_write.Write.error('Failed to write data to output file (the original file was not modified): ', str(E))
+            raise IOError('Failed to write bytes to file.')
 
-        qa_console_write.Write.ok('Backup file copied to output dir.')
+        return True
 
-        with open(f'{output_file.file_path}.swb', 'rb') as f_in:
-            raw0: bytes = f_in.read()
+    @staticmethod
+    def _append_bytes_to_file_(file: qa_def.File, data: Union[bytes, EncodedStream], delim: bytes = b'') -> None:
+        if len(file.path):
+            if not os.path.isdir(file.path):
+                os.makedirs(file.path)
 
-            if qa_app_pol.POLICY_FIO_SW_COMPRESS_SRC_FILE:
-                raw: bytes = gzip.decompress(raw0)
+        # Open the file in append mode so that only the new bytes are written (the existing data is never re-read).
+        with open(file.file_path, 'ab') as output_file:
+            if isinstance(data, EncodedStream):
+                output_file.write(delim)
+                data.write_to(cast(BinaryIO, output_file))
 
             else:
-                raw = raw0
+                output_file.write(delim + data)
 
+            output_file.close()
+
+    @staticmethod
+    def _snapshot_file_tail_(file: qa_def.File) -> Tuple[int, int, int]:
+        # Take a snapshot of the tail of the file (the only region that an append operation touches).
+        #   Returns the length of the file, the CRC32 of the last block, and the length of the last block.
+        if not os.path.isfile(file.file_path):
+            return 0, zlib.crc32(b''), 0
+
+        with open(file.file_path, 'rb') as f_in:
+            f_len = f_in.seek(0, os.SEEK_END)
+            b_len = min(f_len, qa_app_pol.POLICY_FIO_SW_APPEND_TAIL_SNAPSHOT_SIZE)
+
+            f_in.seek(f_len - b_len)
+            b_crc = zlib.crc32(f_in.read(b_len))
             f_in.close()
 
-        # Read in the bytes, decrypt the bytes.
-        d_bytes = Fernet(FileIO.MPV_FIO_710Nd_enK[FileType.SecureWriteBackup]).decrypt(raw)
+        return f_len, b_crc, b_len
 
-        qa_console_write.Write.ok('Decrypted backup.')
+    @staticmethod
+    def _restore_file_tail_(file: qa_def.File, tail: Tuple[int, int, int]) -> None:
+        f_len, b_crc, b_len = tail
+
+        # Discard any bytes that were (partially) appended to the file.
+        with open(file.file_path, 'r+b') as f_io:
+            f_io.truncate(f_len)
+            f_io.seek(f_len - b_len)
+            r_crc = zlib.crc32(f_io.read(b_len))
+            f_io.close()
+
+        qa_console_write.Write.write(f'CRC32 of original tail: {b_crc}. CRC32 of recovered tail: {r_crc}')
+        if r_crc - b_crc:
+            qa_console_write.Write.warn(
+                'CRC32 checksum of recovered tail does not match the original data.',
+                'Data was potentially lost.'
+            )
+
+        else:
+            qa_console_write.Write.ok('File tail restored and validated with CRC32.')
+
+    def _append_(self, file: qa_def.File, new_bytes: Union[bytes, EncodedStream], delim_bytes: bytes, secure_mode: bool) -> bool:
+        # If secure_mode is enabled, snapshot the tail of the file (rather than backing up the entire file); an append
+        #   operation does not modify any of the existing bytes.
+        tail = FileIO._snapshot_file_tail_(file) if secure_mode else None
+
+        # The journal covers the case where the process dies mid-append (the append is discarded at startup).
+        op_id = self.journal.begin_append(file) if secure_mode and qa_app_pol.POLICY_FIO_WAL_ENABLED else None
+
+        try:
+            # Write the delimiter and the new data to the end of the file (single write call, unless streamed).
+            FileIO._append_bytes_to_file_(file, new_bytes, delim_bytes)
+
+        except PermissionError as PE:
+            qa_console_write.Write.error('Failed to append data to output file due to insufficient permission(s).')
+            raise PE
+
+        except Exception as E:
+            qa_console_write.Write.error('Failed to append data to output file: ', str(E))
+
+            if isinstance(tail, tuple) and os.path.isfile(file.file_path):
+                # If the append fails, truncate the file back to its original length.
+                qa_console_write.Write.emphasis('Trying to restore your data. DO NOT QUIT THE APP.')
+                FileIO._restore_file_tail_(file, tail)
+
+            raise IOError('Failed to append bytes to file.')
+
+        finally:
+            if isinstance(op_id, str):
+                self.journal.end(op_id)
+
+        return True
 
-        # Compute the CRC
-        d_crc = zlib.crc32(d_bytes)
+    def _create_file_backup_(self, file: qa_def.File) -> Tuple[str, int, bool]:
+        # Take a backup of the file, store it in the appdata folder (content-addressed; identical data is stored once).
+        #   The file is streamed from the disk. Returns the digest and the CRC32 of the backed up data.
+        backup_file, digest = self.backup_store.put_file(file)
+        crc32 = cast(int, self.backup_store.index['objects'][digest]['crc32'])
+
+        return digest, crc32, 'pack' in self.backup_store.index['objects'][digest] or os.path.isfile(backup_file.file_path)
+
+    def _restore_from_backup_(self, output_file: qa_def.File, digest: str, crc32: int) -> None:
+        # Decrypt the backup straight into the output file (streamed; validated against its digest).
+        with open(output_file.file_path, 'wb') as f_out:
+            _, d_crc = self.backup_store.get_to(digest, cast(BinaryIO, f_out))
+            f_out.close()
+
+        qa_console_write.Write.ok('Decrypted backup.')
 
         qa_console_write.Write.write(f'CRC32 of original bytes: {crc32}. CRC32 of recovered bytes: {d_crc}')
         if d_crc - crc32:
@@ -299,19 +2155,157 @@ class FileIO:
         else:
             qa_console_write.Write.ok('Backup validated with CRC32.')
 
-        with open(output_file.file_path, 'wb') as f_out:
-            f_out.write(d_bytes)
-            f_out.close()
-
         qa_console_write.Write.write('Wrote backup to file.')
 
         with open(output_file.file_path, 'rb') as f_in:
-            n_hash = hashlib.md5(f_in.read()).hexdigest()
-            if n_hash in backup_file.file_name:
+            sha = hashlib.sha256()
+            chunk = f_in.read(qa_app_pol.POLICY_FIO_SWB_CHUNK_SIZE)
+            while len(chunk):
+                sha.update(chunk)
+                chunk = f_in.read(qa_app_pol.POLICY_FIO_SWB_CHUNK_SIZE)
+
+            n_hash = sha.hexdigest()
+            if n_hash == digest:
                 qa_console_write.Write.ok(f'Backup restoration validated ({n_hash}).')
             else:
                 qa_console_write.Write.warn(n_hash)
 
+    def _get_writer_(self, file: qa_def.File) -> FileWriter:
+        # Each target file has (at most) one writer thread; this guarantees that queued writes are applied in order.
+        with self._writers_lock:
+            writer = self._writers.get(file.file_path)
+
+            if not isinstance(writer, FileWriter) or not writer.is_alive():
+                writer = FileWriter(file, self._queued_write_)
+                self._writers[file.file_path] = writer
+
+            return writer
+
+    def flush(self, file: Optional[qa_def.File] = None) -> None:
+        """
+        FileIO.flush
+
+        Blocks until all queued writes (to the given file or, if no file is given, to all files) have been applied.
+
+        :param file:            qa_def.File object for the target file (optional)
+        :raises IOError:        If a queued write failed.
+        :return:                None
+        """
+
+        with self._writers_lock:
+            writers = [*self._writers.values()] if file is None else \
+                [w for w in (self._writers.get(file.file_path), ) if isinstance(w, FileWriter)]
+
+        for writer in writers:
+            writer.flush()
+
+    def close(self) -> None:
+        """
+        FileIO.close
+
+        Applies all queued writes, stops every writer thread, and closes the write-ahead journal.
+
+        :raises IOError:        If a queued write failed.
+        :return:                None
+        """
+
+        with self._writers_lock:
+            writers = [*self._writers.values()]
+            self._writers.clear()
+
+        try:
+            for writer in writers:
+                writer.close()
+
+        finally:
+            self.journal.close()
+
+    @staticmethod
+    def _verify_checksum_(file: qa_def.File, data: Any, checksum: Optional[int]) -> None:
+        if (checksum is not None) and (zlib.crc32(data) != checksum):
+            raise IOError(f'CRC32 checksum of "{file.file_path}" does not match the expected checksum.')
+
+    def read(self, file: qa_def.File, tag: str = IOHistory.DEFAULT_TAG, checksum: Optional[int] = None) -> bytes:
+        """
+        FileIO.read
+
+        :param file:            qa_def.File object for the source file
+        :param tag:             Caller (subsystem) tag; used for IO quotas and accounting (see IOHistory)
+        :param checksum:        Expected CRC32 checksum of the data (optional)
+        :raises IOError:        If the IO quota is exhausted or if the checksum does not match.
+        :return:                Data in the file
+        """
+
+        self.iohm.add_event(OperationType.READ, tag, file.file_path)
+
+        # Make sure that any queued writes to the same file are applied first.
+        self.flush(file)
+        start = time.perf_counter()
+
+        with open(file.file_path, 'rb') as f_in:
+            data = f_in.read()
+            f_in.close()
+
+        self.iohm.record(OperationType.READ, len(data), time.perf_counter() - start, tag, file.file_path)
+        FileIO._verify_checksum_(file, data, checksum)
+
+        return data
+
+    def open_view(self, file: qa_def.File, tag: str = IOHistory.DEFAULT_TAG, checksum: Optional[int] = None) -> FileView:
+        """
+        FileIO.open_view
+
+        Opens a read-only (zero-copy) view of the file. Files of POLICY_FIO_MMAP_MIN_SIZE bytes or more are
+        memory-mapped; smaller files are read into memory.
+
+        :param file:            qa_def.File object for the source file
+        :param tag:             Caller (subsystem) tag; used for IO quotas and accounting (see IOHistory)
+        :param checksum:        Expected CRC32 checksum of the data (optional)
+        :raises IOError:        If the IO quota is exhausted or if the checksum does not match.
+        :return:                FileView (close it, or use it as a context manager, once done)
+        """
+
+        if os.path.getsize(file.file_path) < qa_app_pol.POLICY_FIO_MMAP_MIN_SIZE:
+            return FileView(file, memoryview(self.read(file, tag, checksum)))
+
+        self.iohm.add_event(OperationType.READ, tag, file.file_path)
+
+        self.flush(file)
+        start = time.perf_counter()
+
+        with open(file.file_path, 'rb') as f_in:
+            mapping = mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ)
+            f_in.close()
+
+        view = FileView(file, memoryview(mapping), mapping)
+
+        try:
+            FileIO._verify_checksum_(file, view.data, checksum)
+
+        except BaseException:
+            view.close()
+            raise
+
+        # Pages are only read in when accessed (or when the checksum is verified).
+        self.iohm.record(OperationType.READ, len(mapping), time.perf_counter() - start, tag, file.file_path)
+
+        return view
+
+    def transaction(self, tag: str = IOHistory.DEFAULT_TAG) -> Transaction:
+        """
+        FileIO.transaction
+
+        Usage:
+            with file_io_manager.transaction('theme') as tx:
+                tx.write(file_1, data_1)
+                tx.write(file_2, data_2)
+
+        :param tag:             Caller (subsystem) tag; used for IO quotas and accounting (see IOHistory)
+        :return:                Transaction (committed when the with block exits without an exception)
+        """
+
+        return Transaction(self, tag)
+
     def write(
             self,
             file: qa_def.File,
@@ -320,7 +2314,8 @@ class FileIO:
             append_mode: bool = False,
             offload_to_new_thread: bool = False,
             append_delim: str = '\n',
-            th: Optional[Thread] = None
+            tag: str = IOHistory.DEFAULT_TAG,
+            record_delim: str = '\n'
     ) -> bool:
 
         """
@@ -330,49 +2325,121 @@ class FileIO:
             * SW
 
         :param file:            qa_def.File object for output file
-        :param data:            Data to write (any type that can be converted to bytes via qa_std.qa_dtc)
+        :param data:            Data to write (any type that can be converted to bytes via qa_std.qa_dtc), or an
+                                iterator (e.g., a generator) of records. Aggregates and records are encoded straight
+                                into the file (see EncodedStream) unless the write is offloaded.
         :param secure_mode:     Should secure mode be used (default = True; highly recommended)
-        :param append_mode:     Should the data be appended to the file?
-        :param offload_to_new_thread: Should the write operation be offloaded to a new thread?
+                                (see POLICY_FIO_SW_ATOMIC_REPLACE and POLICY_FIO_SW_KEEP_BACKUP)
+        :param append_mode:     Should the data be appended to the file? (the current bytes are not re-read; if
+                                secure_mode is enabled, only the tail of the file is snapshotted)
+        :param offload_to_new_thread: Should the write operation be queued onto the file's writer thread? (use
+                                FileIO.flush or FileIO.close to wait for queued writes)
         :param append_delim:    Delimiter used to separated current and new bytes, if append_mode is enabled.
+        :param tag:             Caller (subsystem) tag; used for IO quotas and accounting (see IOHistory)
+        :param record_delim:    Delimiter used to separate records, if data is an iterator of records.
         :raises AssertionError:
-        :return:                Success status as a boolean (unless offloaded to a new thread)
+        :raises IOError:        If the IO quota of the caller (or the file) is exhausted (see IOHistory.add_event;
+                                offloaded writes are throttled by the writer thread instead).
+        :return:                Success status as a boolean (unless offloaded to the writer thread)
         """
 
-        if offload_to_new_thread and not isinstance(th, Thread):
-            Thread(target=lambda: self.write(file, data, secure_mode, append_mode, False)).start()
+        delim_bytes = qa_dtc.convert(bytes, append_delim, cfa=self.cfa) if append_mode else b''
+        new_bytes: Union[bytes, EncodedStream]
+
+        if EncodedStream.is_record_stream(data) or ((type(data) in qa_dtc.DA) and not offload_to_new_thread):
+            # Encoded straight into the file (the serialized data is never held in memory in full).
+            new_bytes = EncodedStream(
+                data, cast(qa_dtc.CFA, self.cfa), qa_dtc.convert(bytes, record_delim, cfa=self.cfa)
+            )
+
+        else:
+            # Convert data to bytes (taking the locale into account).
+            new_bytes = qa_dtc.convert(bytes, data, cfa=self.cfa)
+
+        if offload_to_new_thread:
+            # This is always done on the caller's thread so that the data is captured at the time of the call.
+            if isinstance(new_bytes, EncodedStream):
+                new_bytes = new_bytes.to_bytes()
+
+            # The write event is added (and throttled, if need be) by the writer thread (see FileIO._queued_write_).
+            self._get_writer_(file).put(WriteRequest(new_bytes, secure_mode, append_mode, delim_bytes, tag))
             return True
 
-        # Add a write event to the IO history
-        self.iohm.add_event(OperationType.WRITE)
+        # Add a write event to the IO history (rejected if an IO quota is exhausted).
+        self.iohm.add_event(OperationType.WRITE, tag, file.file_path)
 
-        # Convert data to bytes (taking the locale into account).
-        new_bytes = qa_dtc.convert(bytes, data, cfa=self.cfa)
+        # Make sure that any queued writes to the same file are applied first.
+        self.flush(file)
 
-        if os.path.isfile(file.file_path):
-            # Read in the current bytes in the file, if it exists (soft handling)
-            with open(file.file_path, 'rb') as f_in:
-                current_bytes = f_in.read()
-                f_in.close()
+        return self._timed_write_(file, new_bytes, secure_mode, append_mode, delim_bytes, tag)
 
-        else:
-            current_bytes = qa_dtc.convert(bytes, '', cfa=self.cfa)
+    def _queued_write_(
+            self,
+            file: qa_def.File,
+            new_bytes: bytes,
+            secure_mode: bool,
+            append_mode: bool,
+            delim_bytes: bytes,
+            tag: str
+    ) -> bool:
+        # Applies a (coalesced) queued write on the writer thread; the writer thread is throttled if an IO quota is
+        #   exhausted (one event per coalesced write).
+        self.iohm.add_event(OperationType.WRITE, tag, file.file_path, throttle=True)
 
-        # Generate a checksum of the current data using the zlib.crc32 command
-        cb_crc32, cb_l = zlib.crc32(current_bytes), len(current_bytes)
+        return self._timed_write_(file, new_bytes, secure_mode, append_mode, delim_bytes, tag)
 
-        if secure_mode and cb_l:
-            # If secure_mode is enabled, and there is data in the file, make a backup of the file and store it
-            # to the user data directory (AppData in WIN).
-            backup_file, backup_made = self._create_file_backup_(file, current_bytes)
-            assert backup_made, '[SECURE WRITE] Failed to create file backup'
+    def _timed_write_(
+            self,
+            file: qa_def.File,
+            new_bytes: Union[bytes, EncodedStream],
+            secure_mode: bool,
+            append_mode: bool,
+            delim_bytes: bytes,
+            tag: str
+    ) -> bool:
+        # Applies the write and records its size and latency in the IO history (failed writes are recorded as such,
+        #   without any bytes).
+        start = time.perf_counter()
+
+        try:
+            output = self._write_(file, new_bytes, secure_mode, append_mode, delim_bytes)
+
+        except BaseException:
+            self.iohm.record(OperationType.WRITE, 0, time.perf_counter() - start, tag, file.file_path, failed=True)
+            raise
 
+        self.iohm.record(
+            OperationType.WRITE, len(delim_bytes) + FileIO._size_(new_bytes), time.perf_counter() - start, tag,
+            file.file_path
+        )
+
+        return output
+
+    def _write_(
+            self,
+            file: qa_def.File,
+            new_bytes: Union[bytes, EncodedStream],
+            secure_mode: bool,
+            append_mode: bool,
+            delim_bytes: bytes
+    ) -> bool:
         if append_mode:
-            delim_bytes = qa_dtc.convert(bytes, append_delim, cfa=self.cfa)
-            new_bytes = (current_bytes + delim_bytes + new_bytes)
+            # Append mode never reads the current bytes in the file.
+            return self._append_(file, new_bytes, delim_bytes, secure_mode)
+
+        if secure_mode and qa_app_pol.POLICY_FIO_SW_ATOMIC_REPLACE:
+            # Write to a temp file and replace the target file (no full backup unless opted in).
+            return self._atomic_write_(file, new_bytes)
+
+        # The size of the current data in the file, if it exists (soft handling)
+        cb_l = os.path.getsize(file.file_path) if os.path.isfile(file.file_path) else 0
 
-        # Release the memory occupied by the following variable(s).
-        del current_bytes
+        if secure_mode and cb_l:
+            # If secure_mode is enabled, and there is data in the file, make a backup of the file and store it
+            # to the user data directory (AppData in WIN). The backup is streamed from the disk, and its CRC32 checksum
+            # is kept to validate a restoration.
+            backup_digest, cb_crc32, backup_made = self._create_file_backup_(file)
+            assert backup_made, '[SECURE WRITE] Failed to create file backup'
 
         try:
             # Write the new data to the file.
@@ -395,14 +2462,11 @@ class FileIO:
                 qa_console_write.Write.emphasis('Trying to restore your data using a backup. DO NOT QUIT THE APP.')
 
                 try:
-                    FileIO._restore_from_backup_(file, backup_file, cb_crc32)  # type: ignore
+                    self._restore_from_backup_(file, backup_digest, cb_crc32)
 
                 except NameError:
                     raise Exception('[FATAL] Did not find backup file object.')
 
             raise IOError('Failed to write bytes to file.')
 
-        if isinstance(th, Thread):
-            th.join(0)
-
         return True
@@ -14,15 +14,29 @@ DEFINES
     (dataclass)     ThemeFile_s                                                                     Tf, theme file struct
     (dataclass)     Theme                                                                           Th
     (class)         ThemeFile                                                                       TF
+    (class)         TrustedDigests
+    (class)         ThemeIndex
+    (class)         ThemeRecords            bytes, int, int, int                                    (lazy) Sequence[Theme]
     (method)        TF._read_header_        BytesIO object              HeaderData object
+    (method)        TF.read_file            File, bool                  ThemeFile_s
+    (method)        TF.read_theme           File, str, int | None       Theme
+    (method)        TF.compute_theme_code   Theme                       str
+    (method)        TF.match_theme_code     str, str                    bool
+    (method)        TF.generate_file_data   ThemeFile_s, int | None     bytes
+    (method)        TF.validate_many        File, int | None            Iterator[ThemeCheckResult]
+    (method)        TF.install_many         File, int | None, Callable  ThemeBulkReport
+    (dataclass)     ThemeCheckResult
+    (dataclass)     ThemeBulkReport
 
 DEPENDENCIES
 
     hashlib
+    hmac
     os
     io  (BytesIO)
     qa_file_std
     qa_theme
+    struct
     zlib
 
 
@@ -41,6 +55,9 @@ ERRORS
     * 0x0001:0x0003             AssertionError          Invalid header version for specified file version.
     * 0x0001:0x0004             AssertionError          Bad header (read.header_match_case or read.file_match_case)
     * 0x0001:0x0005             AssertionError          Bad header (struct).
+    * 0x0001:0x0006             AssertionError          Bad theme record (v2; CRC32 mismatch).
+    * 0x0001:0x0007             AssertionError          Bad section table (v2).
+    * 0x0001:0x0008             AssertionError          Bad checksum/hash (v2).
 
     Generate File Data
     * 0x0011:0x0000             AssertionError          Bad theme header in theme struct (file header)
@@ -52,25 +69,40 @@ ERRORS
     * 0x0011:0x0006             AssertionError          Bad theme meta (theme collection name)
     * 0x0011:0x0007             AssertionError          Bad theme meta (no themes)
 
+    Install Many
+    * 0x0012:0x0000             AssertionError          Install target shared with another source file (same name)
+
 RELEVANT POLICIES
     * POLICY_FO_GEN_THEME_FILE_VERSION
+    * POLICY_FO_TRUST_BUILTIN_THEME_DIGESTS
+    * POLICY_FO_THEME_BULK_WORKERS
 
 """
 
-import os, io, json, zlib, hashlib, random
+import os, io, json, zlib, hashlib, hmac, struct, time, zipfile
+from threading import RLock
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
 
 from typing import (
     cast,
+    overload,
+    Callable,
+    Iterator,
     List, 
     Dict, 
+    Tuple,
+    Sequence,
+    Optional,
+    Union,
     Any
 )
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from qa_std import (
     qa_def, 
     qa_app_pol, 
+    qa_app_info,
     locale
 )
 
@@ -92,7 +124,7 @@ file_io_manager: FileIO
 class Theme:
     # Meta
     theme_name: str  # "Light", "Dark", etc.
-    theme_code: str  # An MD5 string and a CRC32 value for the theme + a random number (salt)
+    theme_code: str  # An MD5 string and a CRC32 value for the theme (see ThemeFile.compute_theme_code)
 
     # Theme Colors
     background: qa_def.HexColor
@@ -127,20 +159,341 @@ class ThemeFile_s:
     # Theme File
     file: qa_def.File  # Location of the theme file
 
-    # Content
-    themes: List[Theme]
+    # Content (version two files: decoded lazily; see ThemeRecords)
+    themes: Sequence[Theme]
 
     # Validation data
     CHECKSUM: int
     SHA3_256: str
 
 
+@dataclass
+class ThemeCheckResult:
+    source: str  # File name (or archive member name)
+    valid: bool
+    size: int
+
+    collection_name: str = ''
+    author: str = ''
+    themes: List[Tuple[str, str]] = field(default_factory=list)  # [(theme name, theme code), ...]
+    error: str = ''
+
+    installed_to: Optional[str] = None
+
+
+@dataclass
+class ThemeBulkReport:
+    total: int = 0
+    valid: int = 0
+    invalid: int = 0
+    installed: int = 0
+    bytes_checked: int = 0
+    elapsed: float = 0.0
+
+    errors: Dict[str, str] = field(default_factory=dict)  # {source: error}
+
+    def add(self, result: ThemeCheckResult) -> None:
+        self.total += 1
+        self.bytes_checked += result.size
+
+        if result.valid:
+            self.valid += 1
+            self.installed += result.installed_to is not None
+
+        else:
+            self.invalid += 1
+
+        if len(result.error):
+            # Invalid files, and valid files that could not be installed.
+            self.errors[result.source] = result.error
+
+
+class TrustedDigests:
+    _cache: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # Trusted (built-in) theme files whose digest was verified once are not re-verified, as long as the file has not
+    #   changed (size and modification time) since. Each cache entry is signed (HMAC-SHA256) so that the cache file
+    #   cannot be edited to vouch for a different file.
+
+    @staticmethod
+    def _sign_(path: str, size: int, mtime_ns: int, digest: str) -> str:
+        key = hashlib.sha256(b'qTheme/trusted-digest' + FileIO.MPV_FIO_710Nd_enK[FileType.SecureWriteBackup]).digest()
+        return hmac.new(key, f'{path}|{size}|{mtime_ns}|{digest}'.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _load_() -> Dict[str, Dict[str, Any]]:
+        if TrustedDigests._cache is None:
+            cache_file = qa_def.File(qa_app_info.Storage.TrustedThemeDigestFile)
+            TrustedDigests._cache = {}
+
+            if os.path.isfile(cache_file.file_path):
+                try:
+                    TrustedDigests._cache = json.loads(file_io_manager.read(cache_file, tag='theme'))
+                except Exception:
+                    pass
+
+        return TrustedDigests._cache
+
+    @staticmethod
+    def is_trusted(file: qa_def.File, digest: Any) -> bool:
+        if not qa_app_pol.POLICY_FO_TRUST_BUILTIN_THEME_DIGESTS:
+            return False
+
+        entry = TrustedDigests._load_().get(file.file_path)
+        if not isinstance(entry, dict) or (entry.get('digest') != digest):
+            return False
+
+        stat = os.stat(file.file_path)
+        return hmac.compare_digest(
+            str(entry.get('sig')), TrustedDigests._sign_(file.file_path, stat.st_size, stat.st_mtime_ns, str(digest))
+        )
+
+    @staticmethod
+    def trust(file: qa_def.File, digest: str) -> None:
+        if not qa_app_pol.POLICY_FO_TRUST_BUILTIN_THEME_DIGESTS:
+            return
+
+        stat = os.stat(file.file_path)
+        TrustedDigests._load_()[file.file_path] = {
+            'digest': digest,
+            'sig': TrustedDigests._sign_(file.file_path, stat.st_size, stat.st_mtime_ns, digest)
+        }
+
+        file_io_manager.write(
+            qa_def.File(qa_app_info.Storage.TrustedThemeDigestFile),
+            json.dumps(TrustedDigests._load_()),
+            offload_to_new_thread=True,
+            tag='theme'
+        )
+
+
+class ThemeIndex:
+    _lock = RLock()
+    _files: Optional[Dict[str, Dict[str, Any]]] = None
+    _lookup: Dict[Tuple[str, str], List[Tuple[str, str, int]]] = {}
+
+    # Maps (collection name, theme name, theme code) onto the theme file (and the position of the theme in that file)
+    #   for every theme file in ThemeDefaultDir and ThemeInstallDir. The index is persisted (ThemeIndexFile); only theme
+    #   files whose size or modification time changed since they were indexed are parsed when the index is refreshed.
+    #   Full theme codes are compared (codes written by earlier releases also match; see ThemeFile.match_theme_code).
+
+    @staticmethod
+    def _directories_() -> Tuple[str, ...]:
+        return qa_app_info.Storage.ThemeDefaultDir, qa_app_info.Storage.ThemeInstallDir
+
+    @staticmethod
+    def _load_() -> Dict[str, Dict[str, Any]]:
+        if ThemeIndex._files is None:
+            index_file = qa_def.File(qa_app_info.Storage.ThemeIndexFile)
+            ThemeIndex._files = {}
+
+            if os.path.isfile(index_file.file_path):
+                try:
+                    files = json.loads(file_io_manager.read(index_file, tag='theme'))
+                    assert isinstance(files, dict)
+                    ThemeIndex._files = files
+
+                except Exception:
+                    pass
+
+            ThemeIndex._build_lookup_()
+
+        return ThemeIndex._files
+
+    @staticmethod
+    def _build_lookup_() -> None:
+        ThemeIndex._lookup = {}
+
+        for path, entry in cast(Dict[str, Dict[str, Any]], ThemeIndex._files).items():
+            for name, code, position in entry['themes']:
+                ThemeIndex._lookup.setdefault((entry['collection'], name), []).append((code, path, position))
+
+    @staticmethod
+    def _match_(collection: str, theme_name: str, theme_code: str) -> Optional[Tuple[str, int]]:
+        for code, path, position in ThemeIndex._lookup.get((collection, theme_name), []):
+            if ThemeFile.match_theme_code(theme_code, code):
+                return path, position
+
+        return None
+
+    @staticmethod
+    def _save_() -> None:
+        file_io_manager.write(
+            qa_def.File(qa_app_info.Storage.ThemeIndexFile),
+            json.dumps(ThemeIndex._load_()),
+            offload_to_new_thread=True,
+            tag='theme'
+        )
+
+    @staticmethod
+    def refresh() -> None:
+        """
+        Refreshes the index. Theme files that were not changed (size and modification time) since they were indexed are
+        not parsed.
+
+        :return: None
+        """
+
+        with ThemeIndex._lock:
+            files, found, changed = ThemeIndex._load_(), set(), False
+
+            for directory in ThemeIndex._directories_():
+                if not os.path.isdir(qa_def.File(directory).file_path):
+                    continue
+
+                for entry in os.scandir(qa_def.File(directory).file_path):
+                    if not (entry.is_file() and entry.name.endswith(f'.{ThemeFile.extension}')):
+                        continue
+
+                    stat = entry.stat()
+                    found.add(entry.path)
+                    indexed = files.get(entry.path)
+
+                    if isinstance(indexed, dict) and \
+                            (indexed.get('size'), indexed.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+
+                    changed |= ThemeIndex._add_(qa_def.File(entry.path), stat.st_size, stat.st_mtime_ns)
+
+            for path in set(files) - found:
+                del files[path]
+                changed = True
+
+            if changed:
+                ThemeIndex._build_lookup_()
+                ThemeIndex._save_()
+
+    @staticmethod
+    def _add_(file: qa_def.File, size: int, mtime_ns: int) -> bool:
+        files = ThemeIndex._load_()
+
+        try:
+            theme_file = ThemeFile.read_file(file)
+
+        except Exception:
+            return files.pop(file.file_path, None) is not None
+
+        files[file.file_path] = {
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'collection': theme_file.collection_name,
+            'themes': [[theme.theme_name, theme.theme_code, i] for i, theme in enumerate(theme_file.themes)]
+        }
+
+        return True
+
+    @staticmethod
+    def add(file: qa_def.File) -> None:
+        """
+        Indexes (or re-indexes) one theme file (e.g., a newly installed theme file).
+
+        :param file:    Theme file
+        :return:        None
+        """
+
+        with ThemeIndex._lock:
+            stat = os.stat(file.file_path)
+            ThemeIndex._add_(file, stat.st_size, stat.st_mtime_ns)
+
+            ThemeIndex._build_lookup_()
+            ThemeIndex._save_()
+
+    @staticmethod
+    def find(collection: str, theme_name: str, theme_code: str) -> Optional[Tuple[qa_def.File, int]]:
+        """
+        Finds a theme in the index.
+
+        :param collection:  Theme collection name
+        :param theme_name:  Theme name
+        :param theme_code:  Theme code
+        :return:            (theme file, position of the theme in the file) or None
+        """
+
+        with ThemeIndex._lock:
+            refreshed = ThemeIndex._files is None
+            if refreshed:
+                ThemeIndex.refresh()
+
+            result = ThemeIndex._match_(collection, theme_name, theme_code)
+
+            if not refreshed and ((result is None) or not os.path.isfile(result[0])):
+                # The index may be out of date.
+                ThemeIndex.refresh()
+                result = ThemeIndex._match_(collection, theme_name, theme_code)
+
+        return None if result is None else (qa_def.File(result[0]), result[1])
+
+
+class ThemeRecords(Sequence[Theme]):
+    def __init__(self, data: bytes, records_offset: int, count: int, strings_offset: int) -> None:
+        """
+        ThemeRecords
+
+        Lazily decoded themes of a version two theme file. Each theme record is only decoded (and validated) when it is
+        accessed.
+
+        :param data:            File data
+        :param records_offset:  Offset of the THMS section
+        :param count:           Number of theme records
+        :param strings_offset:  Offset of the STRS section
+        """
+
+        self._data, self._records_offset, self._count, self._strings_offset = \
+            data, records_offset, count, strings_offset
+
+        self._themes: Dict[int, Theme] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Theme: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Theme]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Theme, List[Theme]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError('Theme index out of range.')
+
+        if index not in self._themes:
+            self._themes[index] = ThemeFile._decode_theme_record_(
+                self._data, self._records_offset + index * ThemeFile.THEME_RECORD.size, self._strings_offset
+            )
+
+        return self._themes[index]
+
+
 class ThemeFile:
     extension = 'qTheme'
+    bulk_batch_size = 32  # Theme files per worker task (see ThemeFile.validate_many)
     _allowed_header_versions = {
-        1: (1, )
+        1: (1, ),
+        2: (1, )
     }
 
+    # Version two files
+    #   Header          Standard header (see qa_file_std.Header)
+    #   Validation      CRC32 (4 bytes) and SHA3-256 (32 bytes) of everything that follows
+    #   Section table   Number of sections (2 bytes), then (name, offset, length) for each section
+    #   META            Author, collection name (string references), number of themes
+    #   THMS            Fixed-size theme records (THEME_RECORD)
+    #   STRS            String table (UTF-8); strings are referenced by (offset, length)
+    #
+    # Theme record: name, code (string references), 8 colors (7 bytes each), title font face, font face (string
+    #   references), 4 font sizes and the border radius (4 bytes each), and the CRC32 of the record and its strings.
+    VALIDATION = struct.Struct('>I32s')
+    SECTION_COUNT = struct.Struct('>H')
+    SECTION = struct.Struct('>4sII')
+    META = struct.Struct('>IHIHI')
+    THEME_RECORD = struct.Struct('>IHIH7s7s7s7s7s7s7s7sIHIHiiiiiI')
+
     @staticmethod
     def _read_header_(fp: io.BytesIO) -> HeaderData:
 
@@ -180,7 +533,7 @@ class ThemeFile:
                 raise BadFileFormat('Theme', f'0x0000:0x0003 Bad header (VER; {header_version_int})')
 
     @staticmethod
-    def _read_version_one_file_(file: qa_def.File, theme_file: Dict[str, Any]) -> ThemeFile_s:
+    def _read_version_one_file_(file: qa_def.File, theme_file: Dict[str, Any], body: bytes, trusted: bool) -> ThemeFile_s:
         assert 'meta' in theme_file
         assert 'content' in theme_file
         assert 'v' in theme_file
@@ -193,13 +546,39 @@ class ThemeFile:
         assert (len(meta) == 4) & (len(content) > 0)
         assert isinstance(meta, dict) & isinstance(content, dict)
 
-        m_and_c = json.dumps(theme_file).encode()
-        checksum = zlib.crc32(m_and_c)
-        sha3_256 = hashlib.sha3_256(m_and_c).hexdigest()
+        if trusted and TrustedDigests.is_trusted(file, v.get('Theme.HASH')):
+            # Verified before (and unchanged since).
+            checksum, sha3_256 = v['Theme.CRC32'], v['Theme.HASH']
+
+        elif v.get('Theme.Span') == 'raw':
+            # The meta and the content are stored exactly as they are serialized for the checksum (see
+            #   _gen_version_one_file_): the checksum covers '{' and the raw bytes that follow the first line (the
+            #   validation data) of the body; nothing is re-serialized.
+            span = memoryview(body)[body.index(b'\n') + 1:]
+            checksum = zlib.crc32(span, zlib.crc32(b'{'))
+
+            sha = hashlib.sha3_256(b'{')
+            sha.update(span)
+            sha3_256 = sha.hexdigest()
+
+        else:
+            # Legacy files: the checksum covers the (re-serialized) meta and content.
+            m_and_c = json.dumps(theme_file).encode()
+            checksum = zlib.crc32(m_and_c)
+            sha3_256 = hashlib.sha3_256(m_and_c).hexdigest()
+
+            del m_and_c
 
-        del theme_file, m_and_c
+        del theme_file
         assert (v['Theme.CRC32'] == checksum) & (v['Theme.HASH'] == sha3_256)
 
+        if trusted and not TrustedDigests.is_trusted(file, sha3_256):
+            TrustedDigests.trust(file, sha3_256)
+
+        # Theme codes are precomputed by the generator (see _gen_version_one_file_); legacy files do not have them.
+        codes = v.get('Theme.Codes')
+        codes = codes if isinstance(codes, dict) else {}
+
         file_version = meta["ThemeFile.FileVersion"]
         header_version = meta["ThemeFile.HeaderVersion"]
         author = meta["Theme.Author"]
@@ -217,6 +596,7 @@ class ThemeFile:
 
         for theme_name, theme in content.items():
             assert isinstance(theme_name, str)
+            theme_code = codes.get(theme_name)
             theme_name = theme_name.strip()
             assert len(theme_name)
 
@@ -236,14 +616,9 @@ class ThemeFile:
             BC = qa_def.HexColor(theme["Theme.Border"]["Theme.Border.Color"])
             BR = theme["Theme.Border"]["Theme.Border.Radius"]
 
-            # An MD5 string and a CRC32 value for the theme + a random number (salt)
-            t_str = json.dumps(theme)
-            t_crc = zlib.crc32(t_str.encode())
-            t_md5 = hashlib.md5(t_str.encode()).hexdigest()
-            t_rnd = random.randint(100_000_000, 999_999_999) % random.randint(10, 20)
-
-            theme_code = f'{t_md5}{t_crc}{t_rnd}'
-            del t_str, t_crc, t_md5, t_rnd
+            # An MD5 string and a CRC32 value for the theme (deterministic; see ThemeFile._code_)
+            if not (isinstance(theme_code, str) and len(theme_code.strip())):
+                theme_code = ThemeFile._code_(theme)
 
             assert isinstance(TTL_FF, str) & isinstance(FF, str) & isinstance(TTL_FS, int) & \
                    isinstance(LRG_FS, int) & isinstance(NRM_FS, int) & isinstance(SML_FS, int) & \
@@ -266,24 +641,214 @@ class ThemeFile:
         return ThemeFile_s(header, author, collection, file, themes, checksum, sha3_256)
 
     @staticmethod
-    def read_file(file: qa_def.File) -> ThemeFile_s:
+    def _code_(theme: Dict[str, Any]) -> str:
+        t_str = json.dumps(theme).encode()
+        return f'{hashlib.md5(t_str).hexdigest()}{zlib.crc32(t_str)}'
+
+    @staticmethod
+    def _theme_dict_(theme: Theme) -> Dict[str, Any]:
+        # The version one representation of a theme.
+        return {
+            "Theme.BG":                     theme.background.color,
+            "Theme.FG":                     theme.foreground.color,
+            "Theme.ER":                     theme.error.color,
+            "Theme.WA":                     theme.warning.color,
+            "Theme.OK":                     theme.successful.color,
+            "Theme.AC":                     theme.accent.color,
+            "Theme.GR":                     theme.grey.color,
+            "Theme.Font":
+                {
+                    "Theme.Font.TTL_FF":    theme.title_font_face,
+                    "Theme.Font.FF":        theme.font_face,
+                    "Theme.Font.TTL_FS":    theme.font_size_title,
+                    "Theme.Font.LRG_FS":    theme.font_size_large,
+                    "Theme.Font.NRM_FS":    theme.font_size_normal,
+                    "Theme.Font.SML_FS":    theme.font_size_small
+                },
+            "Theme.Border":
+                {
+                    "Theme.Border.Color":   theme.border_color.color,
+                    "Theme.Border.Radius":  theme.border_radius
+                }
+        }
+
+    @staticmethod
+    def compute_theme_code(theme: Theme) -> str:
+        """
+        Compute Theme Code
+
+        Theme codes are deterministic: the same theme always has the same code. Codes are computed once (when the theme
+        file is generated; version one files compute them when read) and are stored in version two files.
+
+        :param theme:   Theme
+        :return:        Theme code (MD5 string + CRC32 value)
+        """
+
+        return ThemeFile._code_(ThemeFile._theme_dict_(theme))
+
+    @staticmethod
+    def match_theme_code(code: str, theme_code: str) -> bool:
+        """
+        Match Theme Code
+
+        Codes written by earlier releases (e.g., in the theme configuration file) are the theme code followed by a
+        random salt; they match the theme code they start with.
+
+        :param code:        Requested theme code
+        :param theme_code:  Code of a theme (see compute_theme_code)
+        :return:            Does the requested code refer to the theme?
+        """
+
+        return (code == theme_code) or ((len(theme_code) > 32) and code.startswith(theme_code))
+
+    @staticmethod
+    def _read_string_(data: bytes, strings_offset: int, offset: int, length: int) -> str:
+        start = strings_offset + offset
+        return bytes(data[start:start + length]).decode('utf-8')
+
+    @staticmethod
+    def _decode_theme_record_(data: bytes, offset: int, strings_offset: int) -> Theme:
+        record = ThemeFile.THEME_RECORD.unpack_from(data, offset)
+
+        def string(i: int) -> str:
+            return ThemeFile._read_string_(data, strings_offset, record[i], record[i + 1])
+
+        name, code, TTL_FF, FF = string(0), string(2), string(12), string(14)
+        colors = [qa_def.HexColor(c.rstrip(b'\x00').decode('ascii')) for c in record[4:12]]
+
+        crc = zlib.crc32(bytes(data[offset:offset + ThemeFile.THEME_RECORD.size - 4]))
+        for value in (name, code, TTL_FF, FF):
+            crc = zlib.crc32(value.encode('utf-8'), crc)
+
+        assert crc == record[21], '0x0001:0x0006 Bad theme record'
+
+        BG, FG, OK, ER, WA, AC, GR, BC = colors
+        TTL_FS, LRG_FS, NRM_FS, SML_FS, BR = record[16:21]
+
+        return Theme(name, code, BG, FG, OK, ER, WA, AC, GR, TTL_FF, FF, TTL_FS, LRG_FS, NRM_FS, SML_FS, BR, BC)
+
+    @staticmethod
+    def _read_sections_(data: bytes) -> Dict[str, Tuple[int, int]]:
+        # Returns {section name: (offset, length)}
+        offset = sum([section.SectionLength for section in Header.items if 1 in section.HeaderVersion]) + \
+            ThemeFile.VALIDATION.size
+
+        (count, ), offset = ThemeFile.SECTION_COUNT.unpack_from(data, offset), offset + ThemeFile.SECTION_COUNT.size
+        sections: Dict[str, Tuple[int, int]] = {}
+
+        for i in range(count):
+            name, s_offset, s_length = ThemeFile.SECTION.unpack_from(data, offset + i * ThemeFile.SECTION.size)
+            assert s_offset + s_length <= len(data), '0x0001:0x0007 Bad section table'
+
+            sections[name.decode('ascii')] = (s_offset, s_length)
+
+        assert {'META', 'THMS', 'STRS'}.issubset(sections), '0x0001:0x0007 Bad section table'
+        return sections
+
+    @staticmethod
+    def _read_version_two_file_(file: qa_def.File, header: HeaderData, data: bytes, trusted: bool) -> ThemeFile_s:
+        v_offset = sum([section.SectionLength for section in Header.items if 1 in section.HeaderVersion])
+        checksum, sha3_256_bytes = ThemeFile.VALIDATION.unpack_from(data, v_offset)
+
+        if not (trusted and TrustedDigests.is_trusted(file, sha3_256_bytes.hex())):
+            body = memoryview(data)[v_offset + ThemeFile.VALIDATION.size:]
+            assert (zlib.crc32(body) == checksum) & (hashlib.sha3_256(body).digest() == sha3_256_bytes), \
+                '0x0001:0x0008 Bad checksum'
+
+            if trusted:
+                TrustedDigests.trust(file, sha3_256_bytes.hex())
+
+        sections = ThemeFile._read_sections_(data)
+        strings_offset = sections['STRS'][0]
+
+        a_off, a_len, c_off, c_len, count = ThemeFile.META.unpack_from(data, sections['META'][0])
+        author = ThemeFile._read_string_(data, strings_offset, a_off, a_len)
+        collection = ThemeFile._read_string_(data, strings_offset, c_off, c_len)
+
+        assert count * ThemeFile.THEME_RECORD.size == sections['THMS'][1], '0x0001:0x0007 Bad section table'
+
+        themes = ThemeRecords(data, sections['THMS'][0], count, strings_offset)
+        return ThemeFile_s(header, author, collection, file, themes, checksum, sha3_256_bytes.hex())
+
+    @staticmethod
+    def read_theme(file: qa_def.File, theme_code: str, index: Optional[int] = None) -> Theme:
+        """
+        Read Theme
+
+        Reads one theme (by its code; see match_theme_code) off a theme file. Only the requested theme record is
+        decoded (version two files are memory-mapped if large; see FileIO.open_view).
+
+        :param file:        Source file
+        :param theme_code:  Theme code
+        :param index:       (optional) Position of the theme in the file (see ThemeIndex); checked first
+        :return:            Theme
+        """
+
+        assert os.path.isfile(file.file_path), '0x0001:0x0001'
+
+        header_length = sum([section.SectionLength for section in Header.items if 1 in section.HeaderVersion])
+
+        with file_io_manager.open_view(file, tag='theme') as data:
+            header = ThemeFile._read_header_(io.BytesIO(data[:header_length]))
+
+            if header.VERSION_INT != 2:
+                themes: Sequence[Theme] = ThemeFile.read_file(file).themes
+
+            else:
+                sections = ThemeFile._read_sections_(cast(bytes, data))
+                themes = ThemeRecords(
+                    cast(bytes, data), sections['THMS'][0], sections['THMS'][1] // ThemeFile.THEME_RECORD.size,
+                    sections['STRS'][0]
+                )
+
+                positions = list(range(len(themes)))
+                if (index is not None) and (0 <= index < len(themes)):
+                    positions.insert(0, index)
+
+                for i in positions:
+                    # Compare the code (string reference) without decoding the rest of the record.
+                    record_offset = sections['THMS'][0] + i * ThemeFile.THEME_RECORD.size
+                    code_offset, code_length = struct.unpack_from('>IH', data, record_offset + 6)
+
+                    if ThemeFile.match_theme_code(
+                        theme_code, ThemeFile._read_string_(cast(bytes, data), sections['STRS'][0], code_offset, code_length)
+                    ):
+                        return themes[i]
+
+                raise KeyError(f'Theme {theme_code} not found.')
+
+        if (index is not None) and (0 <= index < len(themes)) and \
+                ThemeFile.match_theme_code(theme_code, themes[index].theme_code):
+            return themes[index]
+
+        for theme in themes:
+            if ThemeFile.match_theme_code(theme_code, theme.theme_code):
+                return theme
+
+        raise KeyError(f'Theme {theme_code} not found.')
+
+    @staticmethod
+    def read_file(file: qa_def.File, trusted: bool = False) -> ThemeFile_s:
         """
         Read Theme File
 
         :param file:    Source file
+        :param trusted: Is the file a trusted (built-in) theme file? If so, its checksum is only verified if the file
+                        changed since it was last verified (see TrustedDigests).
         :return:        Theme information
         """
 
         # 1) Read the file
         assert os.path.isfile(file.file_path), '0x0001:0x0001'
 
-        with open(file.file_path, 'rb') as f_in:
-            fp = io.BytesIO(f_in.read())
-            f_in.close()
+        return ThemeFile._read_data_(file, file_io_manager.read(file, tag='theme'), trusted)
+
+    @staticmethod
+    def _read_data_(file: qa_def.File, data: bytes, trusted: bool) -> ThemeFile_s:
+        fp = io.BytesIO(data)
 
-        # 2) Read the header. fp then only contains the theme data (JSON)
+        # 2) Read the header. fp then only contains the theme data (JSON for version one files)
         header = ThemeFile._read_header_(fp)
-        body = fp.read()
 
         # 3) Basic checks
         header_version = header.HEADER_VERSION_INT
@@ -299,19 +864,27 @@ class ThemeFile:
             case _:
                 raise Exception('0x0001:0x0004 Bad header')
 
-        # 4) Read the json data
-        theme = json.loads(body.decode(cast(str, locale.get_locale().encoding)))
-
-        # 5) Convert the theme data to an appropriate Theme struct
+        # 4) Convert the theme data to an appropriate Theme struct
         match file_version:
             case 1:
-                return ThemeFile._read_version_one_file_(file, theme)
+                # Read the json data
+                body = fp.read()
+                theme = json.loads(body.decode(cast(str, locale.get_locale().encoding)))
+                return ThemeFile._read_version_one_file_(file, theme, body, trusted)
+
+            case 2:
+                # Binary file; themes are decoded lazily.
+                return ThemeFile._read_version_two_file_(file, header, data, trusted)
 
             case _:
                 raise Exception('0x0001:0x0004 Bad header')
 
     @staticmethod
     def _create_version_one_header_() -> bytes:
+        return ThemeFile._create_header_(1)
+
+    @staticmethod
+    def _create_header_(file_version: int) -> bytes:
         # Create a bytearray of the correct length
         header_length = sum([section.SectionLength for section in Header.items if 1 in section.HeaderVersion])
         output = bytearray()
@@ -326,25 +899,12 @@ class ThemeFile:
 
         output[
             Header.VERSION.SectionStart:(Header.VERSION.SectionStart + Header.VERSION.SectionLength)
-        ] = (1).to_bytes(Header.VERSION.SectionLength, Header.byteorder)
+        ] = file_version.to_bytes(Header.VERSION.SectionLength, Header.byteorder)
 
         return bytes(output)
 
     @staticmethod
-    def _gen_version_one_file_(theme_file: ThemeFile_s) -> bytes:
-        # Create new HeaderData
-        #   Version one theme files only support version one headers.
-        #       1) Magic Bytes
-        #       2) Header Version
-        #       3) File Version
-
-        magic_bytes = GetMagicBytes(FileType.Theme)
-        header_version = (1).to_bytes(Header.HEADER_VERSION.SectionLength, Header.byteorder)
-        file_version = (1).to_bytes(Header.VERSION.SectionLength, Header.byteorder)
-
-        assert HeaderVersionOne(magic_bytes, file_version, 1, header_version, 1, FileType.Theme) == theme_file.header, \
-            '0x0011:0x0000 Bad theme'
-
+    def _validate_theme_file_(theme_file: ThemeFile_s) -> None:
         assert isinstance(theme_file.author, str), '0x0011:0x0001 Bad theme'
         theme_file.author = theme_file.author.strip()
         assert len(theme_file.author), '0x0011:0x0002 Bad theme'
@@ -353,7 +913,7 @@ class ThemeFile:
             assert isinstance(theme, Theme), '0x0011:0x0007 Bad theme'
             assert isinstance(theme.theme_name, str) & isinstance(theme.theme_code, str), '0x0011:0x0005 Bad theme'
             theme.theme_name = theme.theme_name.strip()
-            theme.theme_code = theme.theme_code.strip()
+            theme.theme_code = theme.theme_code.strip() or ThemeFile.compute_theme_code(theme)
             assert (len(theme.theme_name) > 0) and (len(theme.theme_code) > 0), '0x0011:0x0006 Bad theme'
 
         assert isinstance(theme_file.collection_name, str), '0x0011:0x0005 Bad theme'
@@ -362,6 +922,23 @@ class ThemeFile:
 
         assert len(theme_file.themes), '0x0011:0x0007 Bad theme'
 
+    @staticmethod
+    def _gen_version_one_file_(theme_file: ThemeFile_s) -> bytes:
+        # Create new HeaderData
+        #   Version one theme files only support version one headers.
+        #       1) Magic Bytes
+        #       2) Header Version
+        #       3) File Version
+
+        magic_bytes = GetMagicBytes(FileType.Theme)
+        header_version = (1).to_bytes(Header.HEADER_VERSION.SectionLength, Header.byteorder)
+        file_version = (1).to_bytes(Header.VERSION.SectionLength, Header.byteorder)
+
+        assert HeaderVersionOne(magic_bytes, file_version, 1, header_version, 1, FileType.Theme) == theme_file.header, \
+            '0x0011:0x0000 Bad theme'
+
+        ThemeFile._validate_theme_file_(theme_file)
+
         output = {
             "meta":
                 {
@@ -372,57 +949,305 @@ class ThemeFile:
                 },
             "content":
                 {
-                    theme.theme_name:
-                        {
-                            "Theme.BG":                     theme.background.color,
-                            "Theme.FG":                     theme.foreground.color,
-                            "Theme.ER":                     theme.error.color,
-                            "Theme.WA":                     theme.warning.color,
-                            "Theme.OK":                     theme.successful.color,
-                            "Theme.AC":                     theme.accent.color,
-                            "Theme.GR":                     theme.grey.color,
-                            "Theme.Font":
-                                {
-                                    "Theme.Font.TTL_FF":    theme.title_font_face,
-                                    "Theme.Font.FF":        theme.font_face,
-                                    "Theme.Font.TTL_FS":    theme.font_size_title,
-                                    "Theme.Font.LRG_FS":    theme.font_size_large,
-                                    "Theme.Font.NRM_FS":    theme.font_size_normal,
-                                    "Theme.Font.SML_FS":    theme.font_size_small
-                                },
-                            "Theme.Border":
-                                {
-                                    "Theme.Border.Color":   theme.border_color.color,
-                                    "Theme.Border.Radius":  theme.border_radius
-                                }
-                        }
+                    theme.theme_name: ThemeFile._theme_dict_(theme)
                     for theme in theme_file.themes if isinstance(theme, Theme)
                 }
         }
 
         assert len(cast(List[Any], output['content'])), '0x0011:0x0007 Bad theme'
 
-        # Generate checksum and hash values
+        # The checksum and hash cover the serialized meta and content (as in legacy files). The validation data is
+        #   written on the first line of the body, followed by the meta and the content exactly as they were serialized
+        #   (the body is the same JSON object as in legacy files); readers that support raw spans verify the raw bytes,
+        #   legacy readers re-serialize the meta and the content (same bytes).
         m_and_c = json.dumps(output).encode()
-        checksum = zlib.crc32(m_and_c)
-        sha3_256 = hashlib.sha3_256(m_and_c).hexdigest()
-
-        del m_and_c
-
-        output['v'] = {
-            'Theme.CRC32': checksum,
-            'Theme.HASH': sha3_256
+        v = {
+            'Theme.CRC32': zlib.crc32(m_and_c),
+            'Theme.HASH': hashlib.sha3_256(m_and_c).hexdigest(),
+            'Theme.Span': 'raw',
+
+            # Precomputed theme codes (readers do not have to serialize and hash every theme). They are stored with the
+            #   validation data so that the meta and the content stay exactly as legacy readers expect them.
+            'Theme.Codes': {theme.theme_name: theme.theme_code for theme in theme_file.themes if isinstance(theme, Theme)}
         }
 
         # Add a version one header and return the output as JSON
-        return ThemeFile._create_version_one_header_() + json.dumps(output, indent=4).encode()
+        return ThemeFile._create_version_one_header_() + b'{"v": ' + json.dumps(v).encode() + b',\n' + m_and_c[1:]
+
+    @staticmethod
+    def _gen_version_two_file_(theme_file: ThemeFile_s) -> bytes:
+        # Version two files use a version one header (only the file version differs). The theme file struct may have
+        #   been read off a version one or a version two file.
+        assert (theme_file.header.MAGIC_BYTES == GetMagicBytes(FileType.Theme)) & \
+               (theme_file.header.HEADER_VERSION_INT == 1), '0x0011:0x0000 Bad theme'
+
+        ThemeFile._validate_theme_file_(theme_file)
+
+        # String table (each distinct string is stored once).
+        strings, string_refs = bytearray(), {}
+
+        def ref(string: str) -> Tuple[int, int]:
+            if string not in string_refs:
+                encoded = string.encode('utf-8')
+                string_refs[string] = (len(strings), len(encoded))
+                strings.extend(encoded)
+
+            return string_refs[string]
+
+        records = bytearray()
+        for theme in theme_file.themes:
+            colors = [
+                c.color.encode('ascii') for c in (
+                    theme.background, theme.foreground, theme.successful, theme.error, theme.warning, theme.accent,
+                    theme.grey, theme.border_color
+                )
+            ]
+
+            record = ThemeFile.THEME_RECORD.pack(
+                *ref(theme.theme_name), *ref(theme.theme_code), *colors,
+                *ref(theme.title_font_face), *ref(theme.font_face),
+                theme.font_size_title, theme.font_size_large, theme.font_size_normal, theme.font_size_small,
+                theme.border_radius, 0
+            )[:-4]
+
+            crc = zlib.crc32(record)
+            for value in (theme.theme_name, theme.theme_code, theme.title_font_face, theme.font_face):
+                crc = zlib.crc32(value.encode('utf-8'), crc)
+
+            records += record + crc.to_bytes(4, 'big')
+
+        meta = ThemeFile.META.pack(
+            *ref(theme_file.author), *ref(theme_file.collection_name), len(theme_file.themes)
+        )
+
+        # Section offsets are absolute (from the start of the file).
+        header = ThemeFile._create_header_(2)
+        offset = len(header) + ThemeFile.VALIDATION.size + ThemeFile.SECTION_COUNT.size + 3 * ThemeFile.SECTION.size
+
+        table = ThemeFile.SECTION_COUNT.pack(3)
+        for name, section in ((b'META', meta), (b'THMS', records), (b'STRS', strings)):
+            table += ThemeFile.SECTION.pack(name, offset, len(section))
+            offset += len(section)
+
+        body = table + meta + bytes(records) + bytes(strings)
+
+        return header + ThemeFile.VALIDATION.pack(zlib.crc32(body), hashlib.sha3_256(body).digest()) + body
 
     @staticmethod
-    def generate_file_data(theme_file: ThemeFile_s) -> bytes:
-        match qa_app_pol.POLICY_FO_GEN_THEME_FILE_VERSION:
+    def generate_file_data(theme_file: ThemeFile_s, file_version: Optional[int] = None) -> bytes:
+        # The file version defaults to POLICY_FO_GEN_THEME_FILE_VERSION (version two files have to be opted into).
+        match qa_app_pol.POLICY_FO_GEN_THEME_FILE_VERSION if file_version is None else file_version:
             case 1:
                 return ThemeFile._gen_version_one_file_(theme_file)
 
+            case 2:
+                return ThemeFile._gen_version_two_file_(theme_file)
+
             case _:
                 raise Exception('Invalid theme file version requested.')
 
+    @staticmethod
+    def _check_data_(source: str, data: bytes) -> ThemeCheckResult:
+        # Runs in a worker process: only uses the data it is given (no file IO).
+        try:
+            # _read_data_ checks the header (_read_header_) before the body is decoded.
+            theme_file = ThemeFile._read_data_(qa_def.File(source), data, False)
+            themes = [(theme.theme_name, theme.theme_code) for theme in theme_file.themes]  # Decodes every record.
+
+            assert len(themes), '0x0011:0x0007 Bad theme'
+
+            return ThemeCheckResult(
+                source, True, len(data), theme_file.collection_name, theme_file.author, themes
+            )
+
+        except Exception as E:
+            return ThemeCheckResult(source, False, len(data), error=f'{E.__class__.__name__}: {E}')
+
+    @staticmethod
+    def _check_batch_(batch: List[Tuple[str, bytes]]) -> List[ThemeCheckResult]:
+        return [ThemeFile._check_data_(name, data) for name, data in batch]
+
+    @staticmethod
+    def _list_sources_(source: qa_def.File) -> List[str]:
+        if zipfile.is_zipfile(source.file_path):
+            with zipfile.ZipFile(source.file_path) as archive:
+                return [
+                    name for name in archive.namelist()
+                    if name.endswith(f'.{ThemeFile.extension}') and not name.endswith('/')
+                ]
+
+        assert os.path.isdir(source.file_path), '0x0001:0x0001'
+
+        return sorted(
+            entry.name for entry in os.scandir(source.file_path)
+            if entry.is_file() and entry.name.endswith(f'.{ThemeFile.extension}')
+        )
+
+    @staticmethod
+    def _iter_sources_(source: qa_def.File, names: List[str]) -> Iterator[Tuple[str, bytes]]:
+        if zipfile.is_zipfile(source.file_path):
+            with zipfile.ZipFile(source.file_path) as archive:
+                for name in names:
+                    yield name, archive.read(name)
+
+        else:
+            for name in names:
+                yield name, file_io_manager.read(qa_def.File(os.path.join(source.file_path, name)), tag='theme')
+
+    @staticmethod
+    def validate_many(source: qa_def.File, workers: Optional[int] = None) -> Iterator[ThemeCheckResult]:
+        """
+        Validate Many
+
+        Validates every theme file in a directory or in a (zip) archive using a process pool. Files are sent to the
+        workers in batches (theme files are small; see ThemeFile.bulk_batch_size) and results are yielded as each batch
+        completes (not in order). At most two batches per worker are read ahead.
+
+        :param source:  Directory or archive (zip) of theme files
+        :param workers: Number of worker processes (default: see POLICY_FO_THEME_BULK_WORKERS)
+        :return:        Iterator of ThemeCheckResult objects
+        """
+
+        yield from ThemeFile._validate_many_(source, ThemeFile._list_sources_(source), workers, None)
+
+    @staticmethod
+    def _validate_many_(
+            source: qa_def.File,
+            names: List[str],
+            workers: Optional[int],
+            keep: Optional[Dict[str, bytes]]
+    ) -> Iterator[ThemeCheckResult]:
+        # See validate_many; the data of every file that is read is also stored to keep (if given).
+        workers = workers or qa_app_pol.POLICY_FO_THEME_BULK_WORKERS or os.cpu_count() or 1
+        workers = min(workers, -(-len(names) // ThemeFile.bulk_batch_size))
+
+        if workers <= 1:
+            # Not worth starting a process pool for.
+            for name, data in ThemeFile._iter_sources_(source, names):
+                if keep is not None:
+                    keep[name] = data
+
+                yield ThemeFile._check_data_(name, data)
+
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: set[Future[List[ThemeCheckResult]]] = set()
+            batch: List[Tuple[str, bytes]] = []
+
+            for name, data in ThemeFile._iter_sources_(source, names):
+                if keep is not None:
+                    keep[name] = data
+
+                batch.append((name, data))
+
+                if len(batch) >= ThemeFile.bulk_batch_size:
+                    pending.add(executor.submit(ThemeFile._check_batch_, batch))
+                    batch = []
+
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from (result for future in done for result in future.result())
+
+            if len(batch):
+                pending.add(executor.submit(ThemeFile._check_batch_, batch))
+
+            while len(pending):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (result for future in done for result in future.result())
+
+    @staticmethod
+    def install_many(
+            source: qa_def.File,
+            workers: Optional[int] = None,
+            on_result: Optional[Callable[[ThemeCheckResult], None]] = None
+    ) -> ThemeBulkReport:
+        """
+        Install Many
+
+        Validates (see ThemeFile.validate_many) and installs every valid theme file in a directory or in a (zip)
+        archive to ThemeInstallDir. Valid files are installed as they are validated, in chunks of (at most)
+        ThemeFile.bulk_batch_size files (one transaction per chunk; see FileIO.transaction), and are then added to the
+        theme index (see ThemeIndex). Each file is read once (the data read for validation is installed); only the data
+        of the files that are validated but not yet installed is held in memory. A file only counts as installed
+        (installed_to) once its chunk is committed; valid files whose chunk fails keep the error.
+
+        Files are installed under their file name. Archive members that share a file name (e.g., a/x.qTheme and
+        b/x.qTheme) are not installed (error 0x0012:0x0000).
+
+        :param source:      Directory or archive (zip) of theme files
+        :param workers:     Number of worker processes (default: see POLICY_FO_THEME_BULK_WORKERS)
+        :param on_result:   (optional) Called with each result as it completes (valid files: once installed)
+        :return:            Summary report
+        """
+
+        start = time.perf_counter()
+        report = ThemeBulkReport()
+
+        install_dir = qa_def.File(qa_app_info.Storage.ThemeInstallDir).file_path
+        if not os.path.isdir(install_dir):
+            os.makedirs(install_dir)
+
+        # Archive members may be in sub-directories; only the file name is kept.
+        names = ThemeFile._list_sources_(source)
+        targets = {name: qa_def.File(os.path.join(install_dir, os.path.basename(name))).file_path for name in names}
+
+        shared: Dict[str, List[str]] = {}
+        for name, target in targets.items():
+            shared.setdefault(os.path.normcase(target), []).append(name)
+
+        data: Dict[str, bytes] = {}
+        chunk: List[ThemeCheckResult] = []
+
+        def report_result(result: ThemeCheckResult) -> None:
+            report.add(result)
+
+            if on_result is not None:
+                on_result(result)
+
+        def install_chunk() -> None:
+            try:
+                with file_io_manager.transaction(tag='theme') as tx:
+                    for result in chunk:
+                        tx.write(qa_def.File(targets[result.source]), data.pop(result.source))
+
+            except Exception as E:
+                for result in chunk:
+                    result.error = f'{E.__class__.__name__}: {E}'
+
+            else:
+                for result in chunk:
+                    result.installed_to = targets[result.source]
+
+            for result in chunk:
+                data.pop(result.source, None)
+                report_result(result)
+
+            chunk.clear()
+
+        for result in ThemeFile._validate_many_(source, names, workers, data):
+            others = [name for name in shared[os.path.normcase(targets[result.source])] if name != result.source]
+
+            if result.valid and len(others):
+                result.valid = False
+                result.error = 'AssertionError: 0x0012:0x0000 Install target shared with %s' % ', '.join(others)
+
+            if not result.valid:
+                data.pop(result.source, None)
+                report_result(result)
+                continue
+
+            chunk.append(result)
+
+            if len(chunk) >= ThemeFile.bulk_batch_size:
+                install_chunk()
+
+        if len(chunk):
+            install_chunk()
+
+        if report.installed:
+            ThemeIndex.refresh()
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
@@ -33,7 +33,7 @@ from qa_std import (
     Logger, LoggingLevel, LogDataPacket,
     qa_def, ErrorManager, ThemeManager, LocaleManager
 )
-from qa_file_io import file_io_manager
+from qa_file_io import file_io_manager, backup_sweeper
 from qa_ui import RunAdminTools, CreateSplashScreen
 from qa_ui.qa_ui_def import UI_OBJECT
 from qa_update import Update
@@ -241,9 +241,15 @@ def _terminate_app_(**kwargs: Any) -> None:
     NonvolatileFlags.NVF.remove_flag('AppRun', True)
 
     try:
-        file_io_manager.iohm.current_task.cancel()
+        backup_sweeper.stop()
     except Exception as E:
-        ConsoleWriter.Write.error(f'IOHistManager.CT.CANCEL:', str(E))
+        ConsoleWriter.Write.error(f'BackupSweeper.STOP:', str(E))
+
+    try:
+        # Apply any queued (write-behind) writes before the app exits.
+        file_io_manager.close()
+    except Exception as E:
+        ConsoleWriter.Write.error(f'FileIOManager.CLOSE:', str(E))
 
     if kwargs.get('redirect_exception_hook', False):
         sys.excepthook = sys.__excepthook__
@@ -395,6 +401,10 @@ if __name__ == "__main__":
         NonvolatileFlags.NVF.create_flag('AppRun')
         ErrorManager.RedirectExceptionHandler()
 
+        # Complete (or discard) any writes that were interrupted when the app last exited. This has to be done before
+        #   any file is written to.
+        file_io_manager.journal.recover()
+
         AppLogger = Logger()
         ErrorManager._global_logger = AppLogger
         ThemeManager._global_logger = AppLogger
@@ -404,18 +414,15 @@ if __name__ == "__main__":
         ErrorManager.Minf_EH_Md7182_eHookTasks.append(
             (lambda is_fatal: is_fatal, lambda: NonvolatileFlags.NVF.remove_flag('AppRun', True))  # type: ignore
         )
-        # Add a new error hook task that cancels file_io_manager's IOHistory timer
-        #   (contingent on whether the error is fatal)
-        ErrorManager.Minf_EH_Md7182_eHookTasks.append(
-            (lambda is_fatal: is_fatal, file_io_manager.iohm.current_task.cancel)  # type: ignore
-        )
-
         ErrorManager.Minf_EH_Md7182_eHookTasks.append(
             (lambda is_fatal: is_fatal, lambda: AppLogger.thread.join(AppLogger, 0))  # type: ignore
         )
 
         # Check if the script is allowed to run as main (it has to be)
         ScriptPolicy.run_as_main()
+
+        # Start the secure write backup sweeper (retention policies; see AppPolicy.POLICY_FIO_SWB_*)
+        backup_sweeper.start()
         # assert sys.excepthook == ErrorManager._O_exception_hook, 'Exception hook was not redirected.'
 
         # --------------------------------------------------------------------------------------------
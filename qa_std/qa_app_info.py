@@ -55,15 +55,20 @@ class Storage:
     ThemeInstallDir = f'{AppDataDir}\\.tid'
     NonvolatileFlagDir = f'{AppDataDir}\\.nvf'
     LoggerDir = f'{AppDataDir}\\.log'
+    WriteAheadJournalDir = f'{AppDataDir}\\.wal'
     
     ThemeDefaultDir = f'{SourceDirectory}\\.theme'
     ConfigurationDefaultDir = f'{SourceDirectory}\\.conf'
 
     ThemeConfigurationFile = f'{AppSettingsDir}\\qt.{QAConfigFileExtension}'
     QuizConfigurationFile = f'{AppSettingsDir}\\qz.{QAConfigFileExtension}'
+    TrustedThemeDigestFile = f'{AppSettingsDir}\\ttd.{QAConfigFileExtension}'
+    ThemeIndexFile = f'{AppSettingsDir}\\tix.{QAConfigFileExtension}'
 
     DefaultThemeFile = f'{ThemeDefaultDir}\\default_themes.qTheme'
 
+    WriteAheadJournalFile = f'{WriteAheadJournalDir}\\journal.qWAL'
+
 
 class BuildType(Enum):
     ALPHA = 0
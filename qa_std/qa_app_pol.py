@@ -41,6 +41,39 @@ class FailureToComplyWithPolicy(Exception):
 #
 POLICY_MAX_IO_EVENTS_PER_MINUTE = 15_000
 #
+# POLICY_IO_TAG_QUOTAS_PER_MINUTE
+#   Specifies the maximum number of IO events that each (tagged) subsystem can perform in any given one-minute period.
+#   Subsystems that are not listed are only subject to POLICY_MAX_IO_EVENTS_PER_MINUTE.
+#   IO events of subsystems that exceed their quota are rejected (offloaded writes are throttled instead; see
+#   POLICY_IO_MAX_THROTTLE_SECONDS).
+#
+# Default: {'logger': 6_000}
+#
+POLICY_IO_TAG_QUOTAS_PER_MINUTE = {'logger': 6_000}
+#
+# POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE
+#   Specifies the maximum number of IO events that can be performed on any one file in any given one-minute period.
+#
+# Default: 6_000
+#
+POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE = 6_000
+#
+# POLICY_IO_MAX_THROTTLE_SECONDS
+#   Specifies the maximum amount of time (in seconds) an offloaded write can be delayed (throttled) for, on its writer
+#   thread, when an IO quota is exhausted. An IOError exception is invoked if the event cannot be allowed within this
+#   period. Other IO events are never delayed (the calling thread may be the UI thread); they are rejected instead.
+#
+# Default: 5
+#
+POLICY_IO_MAX_THROTTLE_SECONDS = 5
+#
+# POLICY_IO_LATENCY_SAMPLES
+#   Specifies the number of recent IO operations (per subsystem and per file) used to compute latency percentiles.
+#
+# Default: 1024
+#
+POLICY_IO_LATENCY_SAMPLES = 1024
+#
 # POLICY_FIO_SW_COMPRESS_SRC_FILE
 #   Specifies whether the secure write function should compress source files (if secure write mode is enabled)
 #
@@ -54,6 +87,151 @@ POLICY_FIO_SW_COMPRESS_SRC_FILE = True
 # Default: 7
 #
 POLICY_SW_GZIP_COMPRESSION_LEVEL = 7
+#
+# POLICY_FIO_SW_APPEND_TAIL_SNAPSHOT_SIZE
+#   Specifies the number of bytes (at the end of the file) that the secure write function snapshots (CRC32) before
+#   appending data to a file. The snapshot is used to validate the file after a failed append is rolled back.
+#
+# Default: 4096
+#
+POLICY_FIO_SW_APPEND_TAIL_SNAPSHOT_SIZE = 4096
+#
+# POLICY_FIO_WB_MAX_QUEUED_WRITES
+#   Specifies the maximum number of queued (write-behind) write requests per file. Callers block when the queue of the
+#   target file is full.
+#
+# Default: 1024
+#
+POLICY_FIO_WB_MAX_QUEUED_WRITES = 1024
+#
+# POLICY_FIO_SW_ATOMIC_REPLACE
+#   Specifies whether the secure write function should write the new data to a temporary file (in the same directory)
+#   and atomically replace the target file with it (True), or back up the current data and overwrite the target file in
+#   place (False).
+#
+# Default: True
+#
+POLICY_FIO_SW_ATOMIC_REPLACE = True
+#
+# POLICY_FIO_SW_KEEP_BACKUP
+#   Specifies whether the secure write function should also keep an encrypted backup of the current data when
+#   POLICY_FIO_SW_ATOMIC_REPLACE is enabled (backups are always made otherwise).
+#
+# Default: False
+#
+POLICY_FIO_SW_KEEP_BACKUP = False
+#
+# POLICY_FIO_SWB_KEEP_LAST_N
+#   Specifies the number of secure write backups (snapshots) that are kept for each file.
+#
+# Default: 10
+#
+POLICY_FIO_SWB_KEEP_LAST_N = 10
+#
+# POLICY_FIO_SWB_MAX_TOTAL_BYTES
+#   Specifies the maximum size (in bytes, as stored) of the secure write backup store. The oldest backups are removed
+#   when the store exceeds this size.
+#
+# Default: 256 MiB
+#
+POLICY_FIO_SWB_MAX_TOTAL_BYTES = 256 * 1024 * 1024
+#
+# POLICY_FIO_SWB_MAX_AGE_DAYS
+#   Specifies the number of days after which a secure write backup is removed.
+#
+# Default: 30
+#
+POLICY_FIO_SWB_MAX_AGE_DAYS = 30
+#
+# POLICY_FIO_SWB_COMPACT_AFTER_DAYS
+#   Specifies the number of days after which a secure write backup (that has not been referenced since) is moved into
+#   the backup pack when the backup store is compacted.
+#
+# Default: 7
+#
+POLICY_FIO_SWB_COMPACT_AFTER_DAYS = 7
+#
+# POLICY_FIO_SWB_SWEEP_INTERVAL
+#   Specifies the interval (in seconds) between background sweeps of the secure write backup store.
+#
+# Default: 600
+#
+POLICY_FIO_SWB_SWEEP_INTERVAL = 600
+#
+# POLICY_FIO_SWB_DELTA_ENABLED
+#   Specifies whether secure write backups of large files may be stored as binary deltas against the previous backup of
+#   the same file.
+#
+# Default: True
+#
+POLICY_FIO_SWB_DELTA_ENABLED = True
+#
+# POLICY_FIO_SWB_DELTA_MIN_SIZE
+#   Specifies the minimum size (in bytes) of a file for its backups to be stored as deltas.
+#
+# Default: 64 KiB
+#
+POLICY_FIO_SWB_DELTA_MIN_SIZE = 64 * 1024
+#
+# POLICY_FIO_SWB_DELTA_BLOCK_SIZE
+#   Specifies the block size (in bytes) used to compute backup deltas.
+#
+# Default: 2048
+#
+POLICY_FIO_SWB_DELTA_BLOCK_SIZE = 2048
+#
+# POLICY_FIO_SWB_DELTA_MAX_CHAIN
+#   Specifies the maximum number of consecutive deltas; a full backup is stored after this many deltas.
+#
+# Default: 8
+#
+POLICY_FIO_SWB_DELTA_MAX_CHAIN = 8
+#
+# POLICY_FIO_SWB_DELTA_CACHE_BYTES
+#   Specifies the maximum number of bytes of recently backed up data that are cached (in memory) as bases for deltas.
+#
+# Default: 32 MiB
+#
+POLICY_FIO_SWB_DELTA_CACHE_BYTES = 32 * 1024 * 1024
+#
+# POLICY_FIO_SWB_CHUNK_SIZE
+#   Specifies the size (in bytes) of the chunks in which secure write backups are compressed and encrypted. Bounds the
+#   memory used to create or restore a (full) backup.
+#
+# Default: 1 MiB
+#
+POLICY_FIO_SWB_CHUNK_SIZE = 1024 * 1024
+#
+# POLICY_FIO_MMAP_MIN_SIZE
+#   Specifies the minimum size (in bytes) of a file for FileIO.open_view to memory-map it (rather than read it).
+#
+# Default: 1 MiB
+#
+POLICY_FIO_MMAP_MIN_SIZE = 1024 * 1024
+#
+# POLICY_FIO_WAL_ENABLED
+#   Specifies whether transactions and secure appends are recorded in the write-ahead journal, which is used to complete
+#   or discard interrupted writes when the app starts. (Single-file secure writes replace the target atomically; they
+#   are not journaled.)
+#
+# Default: True
+#
+POLICY_FIO_WAL_ENABLED = True
+#
+# POLICY_FIO_WAL_FSYNC
+#   Specifies whether the write-ahead journal record that starts an operation is flushed to the disk (fsync) before the
+#   operation proceeds (one fsync per operation; "end" records are only flushed to the OS).
+#
+# Default: True
+#
+POLICY_FIO_WAL_FSYNC = True
+#
+# POLICY_FIO_WAL_MAX_SIZE
+#   Specifies the size (in bytes) after which the write-ahead journal is restarted (once no write is in progress).
+#
+# Default: 1 MiB
+#
+POLICY_FIO_WAL_MAX_SIZE = 1024 * 1024
 
 # ----------------------- Section Complete -----------------------
 
@@ -67,11 +245,42 @@ POLICY_MAX_WHILE_LOOP_RETRIES = 100_000
 #
 # POLICY_FO_GEN_THEME_FILE_VERSION
 #   Specifies the version of theme files that is to be generated
+#       1:  JSON
+#       2:  Binary (fixed-size theme records; themes are decoded lazily)
+#
+#   NOTE: VERSION TWO FILES CANNOT BE READ BY RELEASES THAT ONLY SUPPORT VERSION ONE FILES; ONLY OPT IN IF THE
+#   GENERATED THEME FILES WILL NOT BE SHARED WITH SUCH RELEASES.
 #
 # Default: 1
 #
 POLICY_FO_GEN_THEME_FILE_VERSION = 1
 #
+# POLICY_FO_TRUST_BUILTIN_THEME_DIGESTS
+#   Specifies whether the checksum of built-in theme files is only verified when the file has changed since it was last
+#   verified (the verified digest is cached and signed).
+#
+# Default: True
+#
+POLICY_FO_TRUST_BUILTIN_THEME_DIGESTS = True
+#
+# POLICY_FO_THEME_BULK_WORKERS
+#   Specifies the number of worker processes used to validate theme files in bulk (see ThemeFile.validate_many).
+#       0:  One worker per CPU
+#
+# Default: 0
+#
+POLICY_FO_THEME_BULK_WORKERS = 0
+#
+# POLICY_DTC_MEMO_SIZE
+#   Specifies the maximum number of memoized data type conversions (see qa_dtc.Memo); conversions are only memoized
+#   when requested (convert(..., memo=True)) with a frozen CFA struct (or none). Read when qa_dtc is loaded (see
+#   qa_dtc.Memo.resize).
+#       0:  Disabled
+#
+# Default: 256
+#
+POLICY_DTC_MEMO_SIZE = 256
+#
 #
 # POLICY_CWRT_ENABLE_STDOUT
 #   Specifies whether the ConsoleWriter.STDOUT function is allowed to print messages to console.
@@ -74,7 +74,7 @@ class Write:
         try:
             stderr(
                 theme.ER,
-                '[ERROR]    ', *[qa_dtc.convert(str, d) for d in data],
+                '[ERROR]    ', *qa_dtc.convert_many(str, data),
                 qa_def.ANSI.RESET,
                 delim=delim,
                 line_termination=line_termination
@@ -90,7 +90,7 @@ class Write:
         try:
             stdout(
                 theme.OK,
-                f'[{label}]  ', *[qa_dtc.convert(str, d) for d in data],
+                f'[{label}]  ', *qa_dtc.convert_many(str, data),
                 qa_def.ANSI.RESET,
                 delim=delim,
                 line_termination=line_termination
@@ -106,7 +106,7 @@ class Write:
         try:
             stdout(
                 theme.WA,
-                '[WARNING]  ', *[qa_dtc.convert(str, d) for d in data],
+                '[WARNING]  ', *qa_dtc.convert_many(str, data),
                 qa_def.ANSI.RESET,
                 delim=delim,
                 line_termination=line_termination
@@ -122,7 +122,7 @@ class Write:
         try:
             stdout(
                 theme.HG,
-                f'[{label}]', *[qa_dtc.convert(str, d) for d in data],
+                f'[{label}]', *qa_dtc.convert_many(str, data),
                 qa_def.ANSI.RESET,
                 delim=delim,
                 line_termination=line_termination
@@ -138,7 +138,7 @@ class Write:
         try:
             stdout(
                 theme.FG,
-                f'[{label}]  ', *[qa_dtc.convert(str, d) for d in data],
+                f'[{label}]  ', *qa_dtc.convert_many(str, data),
                 qa_def.ANSI.RESET,
                 delim=delim,
                 line_termination=line_termination
@@ -15,10 +15,11 @@ DEFINES
 DEPENDENCIES
 
     AppPolicy
+    qa_file_io
 
 """
 
-import sys
+import sys, os, io, shutil, tempfile, random, time, hashlib, zlib, mmap, json, zipfile
 
 from . import locale as M_locale
 from . import qa_def as M_qa_def
@@ -30,8 +31,10 @@ from . import qa_logger as Logger
 from . import qa_app_pol as AppPolicy
 
 from qa_ui import qa_ui_def as M_qa_ui_def
+from qa_file_io import qa_file_std as M_qa_file_std
+from qa_file_io import qa_theme_file as M_qa_theme_file
 
-from typing import Callable, Any, Type, cast
+from typing import Callable, Iterator, List, Set, Any, Type, cast
 from tkinter import Label
 
 
@@ -399,7 +402,124 @@ class ModDiagnostics:
                 ModDiagnostics._qa_dtc_sr1_('0xF001:0x0027', exp_dict, from_dict, 'dict --> float')
         )
 
+    # QA DTC Module (streaming encoder)
+    #   ENCODE_TO == CONVERT(BYTES)             0xF001:0x0039
+    @staticmethod
+    def _qa_dtc_encode_to() -> bool:
+        samples = [
+            ModDiagnostics._qa_dtc_test_str, ModDiagnostics._qa_dtc_test_bytes, ModDiagnostics._qa_dtc_test_int,
+            ModDiagnostics._qa_dtc_test_float, ModDiagnostics._qa_dtc_test_list, ModDiagnostics._qa_dtc_test_tuple,
+            ModDiagnostics._qa_dtc_test_complex, ModDiagnostics._qa_dtc_test_bool, ModDiagnostics._qa_dtc_test_set,
+            ModDiagnostics._qa_dtc_test_dict, [], (), {}, [[(1, 2.5), {3: [b'4']}], {'k': ('v', True)}],
+        ]
+
+        expected, actual = [], []
+
+        for cfa in (ModDiagnostics._qa_dtc_test_cfa, M_qa_dtc.CFA()):
+            # A small chunk size makes the encoder flush in the middle of (nested) aggregates.
+            for chunk_size in (1, 7, 64 * 1024):
+                for sample in samples:
+                    sink = io.BytesIO()
+                    written = M_qa_dtc.encode_to(sink, sample, cfa, chunk_size)
+
+                    output = M_qa_dtc.convert(bytes, sample, cfa=cfa)
+                    expected.append((output, len(output)))
+                    actual.append((sink.getvalue(), written))
+
+        return ModDiagnostics._qa_dtc_sr1_('0xF001:0x0039', expected, actual, 'encode_to == convert(bytes)')
+
+    # QA DTC Module (batch conversion)
+    #   CONVERT_MANY == [CONVERT, ...]          0xF001:0x003A
+    @staticmethod
+    def _qa_dtc_convert_many() -> bool:
+        samples: List[List[Any]] = [
+            ['1', '2.5', '-3', '1e3'], [1, 2, -3, 10 ** 20], [1.0, 2.5, -3.75], [True, False],
+            [b'1', b'2.5'], [[1, 2], (3, 4)], [{1: 2}, {3: 4}], [1, 2.5, '3', True], [complex(1, 2)], [],
+        ]
+
+        expected, actual = [], []
+
+        for cfa in (ModDiagnostics._qa_dtc_test_cfa, M_qa_dtc.CFA(aggregate_to_numerical_conversion=1)):
+            for output_type in (*M_qa_dtc.DNA, *M_qa_dtc.DA):
+                for sample in samples:
+                    # Unsupported conversions must raise the same error as convert.
+                    try:
+                        converted = [M_qa_dtc.convert(output_type, e, cfa=cfa) for e in sample]
+                        expected.append([(type(e), e) for e in converted])
+                    except Exception as E:
+                        expected.append([(type(E), str(E))])
+
+                    try:
+                        actual.append([(type(e), e) for e in M_qa_dtc.convert_many(output_type, iter(sample), cfa=cfa)])
+                    except Exception as E:
+                        actual.append([(type(E), str(E))])
+
+        return ModDiagnostics._qa_dtc_sr1_('0xF001:0x003A', expected, actual, 'convert_many == [convert, ...]')
+
+    # QA DTC Module (memo)
+    #   FROZEN CFA; MEMO HITS, MISSES, AND BOUND        0xF001:0x003B
+    @staticmethod
+    def _qa_dtc_memo() -> bool:
+        M_qa_dtc.Memo.resize(4)
 
+        try:
+            cfa = M_qa_dtc.CFA(';', '-', ':', 0)
+            frozen = cfa.freeze()
+
+            _raises(AttributeError, lambda _: setattr(frozen, 'list_delim', ','), None)
+            assert frozen.freeze() is frozen and frozen == M_qa_dtc.CFA(';', '-', ':', 0).freeze(), 'freeze'
+            assert hash(frozen) == hash(M_qa_dtc.CFA(';', '-', ':', 0).freeze()), 'FrozenCFA hash'
+            assert frozen != M_qa_dtc.CFA().freeze(), 'FrozenCFA equality'
+
+            outputs = [
+                M_qa_dtc.convert(bytes, 'ERROR', cfa=frozen, memo=True),
+                M_qa_dtc.convert(bytes, 'ERROR', cfa=frozen, memo=True),
+                M_qa_dtc.convert(str, 1, memo=True),
+                M_qa_dtc.convert(str, True, memo=True),   # Not a hit for 1 (1 == True)
+            ]
+            counts = [M_qa_dtc.Memo.info()]
+
+            # Mutable CFA structs, aggregates, and long strings are never memoized.
+            M_qa_dtc.convert(bytes, 'ERROR', cfa=cfa, memo=True)
+            M_qa_dtc.convert(bytes, ['ERROR'], cfa=frozen, memo=True)
+            M_qa_dtc.convert(bytes, 'E' * (M_qa_dtc.Memo.max_item_length + 1), cfa=frozen, memo=True)
+            counts.append(M_qa_dtc.Memo.info())
+
+            # Errors are never memoized.
+            _raises(ValueError, lambda _: M_qa_dtc.convert(int, 'ERROR', memo=True), None)
+            _raises(ValueError, lambda _: M_qa_dtc.convert(int, 'ERROR', memo=True), None)
+            counts.append(M_qa_dtc.Memo.info())
+
+            # Bounded (LRU): 'ERROR' is used again, so 1 is removed first.
+            M_qa_dtc.convert(bytes, 'ERROR', cfa=frozen, memo=True)
+            for i in range(2, 5):
+                M_qa_dtc.convert(str, i, memo=True)
+
+            M_qa_dtc.convert(bytes, 'ERROR', cfa=frozen, memo=True)
+            M_qa_dtc.convert(str, 1, memo=True)
+            counts.append(M_qa_dtc.Memo.info())
+
+            M_qa_dtc.Memo.clear()
+            counts.append(M_qa_dtc.Memo.info())
+
+        finally:
+            M_qa_dtc.Memo.resize(AppPolicy.POLICY_DTC_MEMO_SIZE)
+
+        return (
+                ModDiagnostics._qa_dtc_sr1_('0xF001:0x003B', [b'ERROR', b'ERROR', '1', 'True'], outputs, 'memo (outputs)') &
+                ModDiagnostics._qa_dtc_sr1_(
+                    '0xF001:0x003B',
+                    [
+                        M_qa_dtc.MemoInfo(1, 3, 3, 4),
+                        M_qa_dtc.MemoInfo(1, 3, 3, 4),
+                        M_qa_dtc.MemoInfo(1, 5, 3, 4),
+                        M_qa_dtc.MemoInfo(3, 9, 4, 4),
+                        M_qa_dtc.MemoInfo(0, 0, 0, 4),
+                    ],
+                    counts,
+                    'memo (hits, misses, size)'
+                )
+        )
 
     @staticmethod
     def qa_dtc() -> bool:
@@ -407,7 +527,10 @@ class ModDiagnostics:
                 ModDiagnostics._qa_dtc_to_bytes()   &
                 ModDiagnostics._qa_dtc_to_str()     &
                 ModDiagnostics._qa_dtc_to_int()     &
-                ModDiagnostics._qa_dtc_to_float()
+                ModDiagnostics._qa_dtc_to_float()   &
+                ModDiagnostics._qa_dtc_encode_to()  &
+                ModDiagnostics._qa_dtc_convert_many() &
+                ModDiagnostics._qa_dtc_memo()
         )
 
     # Test 0xF001:0x0028
@@ -436,6 +559,829 @@ class ModDiagnostics:
         )
         return False
 
+    # ----
+    # QA_FILE_IO
+    #   Each test is run in a new (temporary) directory that is deleted afterwards.
+
+    @staticmethod
+    def _qa_fio_sr1_(diagnostic_code: str, name: str, test: Callable[[str], None]) -> bool:
+        global _global_logger
+        directory = tempfile.mkdtemp(prefix='qa_diag_')
+
+        try:
+            test(directory)
+
+        except Exception as E:
+            _global_logger.write(
+                Logger.LogDataPacket(
+                    'Diagnostics', Logger.LoggingLevel.L_ERROR,
+                    f'DIAG <{diagnostic_code}> "{name}" FAILED: {E.__class__.__name__}: {E}'
+                )
+            )
+            return False
+
+        else:
+            _global_logger.write(
+                Logger.LogDataPacket(
+                    'Diagnostics', Logger.LoggingLevel.L_SUCCESS,
+                    f'DIAG <{diagnostic_code}> "{name}" PASS'
+                )
+            )
+            return True
+
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    @staticmethod
+    def _read_bytes_(file_path: str) -> bytes:
+        with open(file_path, 'rb') as f_in:
+            data = f_in.read()
+            f_in.close()
+
+        return data
+
+    @staticmethod
+    def _write_bytes_(file_path: str, data: bytes, mode: str = 'wb') -> None:
+        with open(file_path, mode) as f_out:
+            f_out.write(data)
+            f_out.close()
+
+    @staticmethod
+    def _file_io_(directory: str) -> M_qa_file_std.FileIO:
+        # FileIO object with its own IO history, backup store, and journal (in the test directory).
+        return M_qa_file_std.FileIO(
+            M_qa_file_std.IOHistory(),
+            backup_store=M_qa_file_std.SecureWriteBackupStore(os.path.join(directory, 'swb')),
+            journal=M_qa_file_std.WriteAheadJournal(os.path.join(directory, 'journal.qWAL'))
+        )
+
+    # Test 0xF001:0x0029
+    #       FileIO.write (append mode): only the delimiter and the new data are written to the end of the file
+    @staticmethod
+    def _qa_fio_append(directory: str) -> None:
+        file_io = ModDiagnostics._file_io_(directory)
+        file = M_qa_def.File(os.path.join(directory, 'log.txt'))
+
+        try:
+            file_io.write(file, 'line 1', secure_mode=False)
+            file_io.write(file, 'line 2', append_mode=True)                       # Secure (tail snapshot) append
+            file_io.write(file, 'line 3', secure_mode=False, append_mode=True, append_delim=' | ')
+            file_io.write(M_qa_def.File(os.path.join(directory, 'new.txt')), 'line 1', append_mode=True)
+
+            assert ModDiagnostics._read_bytes_(file.file_path) == b'line 1\nline 2 | line 3', 'Appended data'
+            assert ModDiagnostics._read_bytes_(os.path.join(directory, 'new.txt')) == b'\nline 1', 'New file'
+            assert not len(file_io.journal._open), 'Journal operation left open'
+
+            # The target is opened in append mode: a failed append leaves the file (and its tail) untouched.
+            os.chmod(file.file_path, 0o444)
+
+            if not os.access(file.file_path, os.W_OK):
+                _raises(PermissionError, lambda data: file_io.write(file, data, append_mode=True), 'line 4')
+                assert ModDiagnostics._read_bytes_(file.file_path) == b'line 1\nline 2 | line 3', 'Failed append'
+
+        finally:
+            os.chmod(file.file_path, 0o644)
+            file_io.close()
+
+    # Test 0xF001:0x002A
+    #       FileWriter: consecutive queued writes are coalesced and applied in order; FileIO.flush raises queued errors
+    @staticmethod
+    def _qa_fio_write_behind(directory: str) -> None:
+        WR = M_qa_file_std.WriteRequest
+
+        coalesced = M_qa_file_std.FileWriter._coalesce_([
+            WR(b'a', True, False, b'', 'x'),
+            WR(b'b', True, True, b'\n', 'x'),
+            WR(b'c', True, True, b'; ', 'x'),
+            WR(b'd', False, True, b'\n', 'x'),                                  # Different secure_mode
+            WR(b'e', False, False, b'', 'x'),                                   # Overwrites 'd'
+            WR(b'f', False, True, b'\n', 'y'),                                  # Different tag
+        ])
+
+        assert [(r.data, r.secure_mode, r.append_mode, r.tag) for r in coalesced] == [
+            (b'a\nb; c', True, False, 'x'), (b'e', False, False, 'x'), (b'\nf', False, True, 'y')
+        ], 'FileWriter._coalesce_'
+
+        file_io = ModDiagnostics._file_io_(directory)
+        file = M_qa_def.File(os.path.join(directory, 'queued.txt'))
+
+        try:
+            file_io.write(file, 'line 0', offload_to_new_thread=True)
+            for i in range(1, 100):
+                file_io.write(file, f'line {i}', append_mode=True, offload_to_new_thread=True)
+
+            file_io.flush(file)
+            assert ModDiagnostics._read_bytes_(file.file_path) == '\n'.join(f'line {i}' for i in range(100)).encode(), \
+                'Queued writes (order)'
+
+            # Reads apply any queued writes first.
+            file_io.write(file, 'overwritten', offload_to_new_thread=True)
+            assert file_io.read(file) == b'overwritten', 'Read after queued write'
+
+            # A queued write that fails is reported by the next flush (and only by that flush).
+            ModDiagnostics._write_bytes_(os.path.join(directory, 'blocker'), b'')    # Not a directory
+            bad_file = M_qa_def.File(os.path.join(directory, 'blocker', 'queued.txt'))
+            assert file_io.write(bad_file, 'data', offload_to_new_thread=True), 'Queued write'
+
+            _raises(IOError, file_io.flush, bad_file)
+            file_io.flush(bad_file)
+
+        finally:
+            file_io.close()
+
+    # Test 0xF001:0x002B
+    #       FileIO.write (secure mode): the target file is replaced atomically; a failed write leaves it untouched
+    @staticmethod
+    def _qa_fio_atomic_replace(directory: str) -> None:
+        file_io = ModDiagnostics._file_io_(directory)
+        file = M_qa_def.File(os.path.join(directory, 'data.txt'))
+        keep_backup = AppPolicy.POLICY_FIO_SW_KEEP_BACKUP
+
+        def records() -> Iterator[str]:
+            yield 'record 1'
+            raise ValueError('Interrupted')
+
+        def temp_files() -> List[str]:
+            return [f for f in os.listdir(directory) if f.endswith('.qSWTemp')]
+
+        try:
+            file_io.write(file, 'version 1', secure_mode=False)
+            file_io.write(file, 'version 2')
+
+            assert ModDiagnostics._read_bytes_(file.file_path) == b'version 2', 'Replaced data'
+            assert not len(temp_files()), 'Temp file left behind'
+            assert file_io.backup_store.latest(file) is None, 'Backup made (not opted in)'
+
+            # The records are encoded straight into the temp file; the target is not modified when encoding fails.
+            _raises(IOError, lambda data: file_io.write(file, data), records())
+
+            assert ModDiagnostics._read_bytes_(file.file_path) == b'version 2', 'Failed write'
+            assert not len(temp_files()), 'Temp file left behind (failed write)'
+
+            # Opt-in: keep a backup of the replaced data.
+            AppPolicy.POLICY_FIO_SW_KEEP_BACKUP = True
+            file_io.write(file, 'version 3')
+
+            backup = file_io.backup_store.latest(file)
+            assert isinstance(backup, str) and file_io.backup_store.get(backup) == b'version 2', 'Backup (opted in)'
+            assert ModDiagnostics._read_bytes_(file.file_path) == b'version 3', 'Replaced data (with backup)'
+
+        finally:
+            AppPolicy.POLICY_FIO_SW_KEEP_BACKUP = keep_backup
+            file_io.close()
+
+    # Test 0xF001:0x002C
+    #       SecureWriteBackupStore: identical snapshots are stored once (content-addressed, reference counted)
+    @staticmethod
+    def _qa_fio_backup_dedup(directory: str) -> None:
+        store = M_qa_file_std.SecureWriteBackupStore(os.path.join(directory, 'swb'))
+        file_1, file_2 = M_qa_def.File(os.path.join(directory, '1.txt')), M_qa_def.File(os.path.join(directory, '2.txt'))
+        data = b'Backed up data ' * 64
+
+        object_file, digest = store.put(file_1, data)
+        object_file_2, digest_2 = store.put(file_2, data)
+        assert (object_file.file_path, digest) == (object_file_2.file_path, digest_2), 'Deduplicated object'
+        store.put(file_1, data)
+
+        objects = [d for d, _ in store._list_object_files_()]
+        assert objects == [digest], 'Object files'
+        assert store.index['objects'][digest]['refs'] == {file_1.file_path: 2, file_2.file_path: 1}, 'References'
+        assert store.get(digest) == data, 'Backed up data'
+
+        # The index survives a restart (the object is read back from the disk).
+        store = M_qa_file_std.SecureWriteBackupStore(os.path.join(directory, 'swb'))
+        assert store.get(digest) == data, 'Backed up data (new store)'
+        assert [s['hash'] for s in store.index['files'][file_1.file_path]] == [digest, digest], 'Snapshots'
+
+        # A missing object file is stored again (rather than referenced).
+        os.remove(object_file.file_path)
+        store.put(file_2, data)
+
+        assert store.get(digest) == data, 'Restored object'
+        assert store.index['objects'][digest]['refs'][file_2.file_path] == 2, 'References (restored object)'
+
+    # Test 0xF001:0x002D
+    #       SecureWriteBackupStore: sweep and compact keep every live object (and the bases of live delta objects), and
+    #       delete every other object
+    @staticmethod
+    def _qa_fio_backup_store(directory: str) -> None:
+        keep, chain = AppPolicy.POLICY_FIO_SWB_KEEP_LAST_N, AppPolicy.POLICY_FIO_SWB_DELTA_MAX_CHAIN + 1
+        root = os.path.join(directory, 'swb')
+        store = M_qa_file_std.SecureWriteBackupStore(root)
+        source = M_qa_def.File(os.path.join(directory, 'source.bin'))
+
+        # Enough snapshots for the first delta chain (full snapshot and its deltas) to be removed as a whole.
+        data = random.Random(0x2D).randbytes(max(AppPolicy.POLICY_FIO_SWB_DELTA_MIN_SIZE, 128 * 1024))
+        versions = [data[:i * 1024] + b'version %d' % i + data[i * 1024:] for i in range(keep + 2 * chain)]
+        digests: List[str] = []
+
+        def put_aged(count: int) -> None:
+            # Snapshots older than POLICY_FIO_SWB_COMPACT_AFTER_DAYS (but not old enough to expire) can be compacted.
+            for version in versions[len(digests):len(digests) + count]:
+                digests.append(store.put(source, version)[1])
+
+            for snapshot in store.index['files'][source.file_path]:
+                snapshot['time'] = min(
+                    snapshot['time'], time.time() - (AppPolicy.POLICY_FIO_SWB_COMPACT_AFTER_DAYS + 1) * 86_400
+                )
+
+        def live_objects() -> Set[str]:
+            live = {*digests[-keep:]}
+
+            for digest in digests[-keep:]:
+                while 'base' in store.index['objects'][digest]:
+                    digest = store.index['objects'][digest]['base']
+                    live.add(digest)
+
+            return live
+
+        # 1) Compact all but the last few snapshots into a pack; the most recent of these outlive the sweep below.
+        put_aged(len(versions) - keep // 2)
+        assert store.compact() == len(digests), 'Number of objects compacted'
+
+        # 2) Add more snapshots: the oldest are removed, the rest are compacted with the live objects in the first pack.
+        put_aged(keep // 2)
+        assert store.sweep()[0] == len(versions) - keep, 'Number of snapshots removed'
+        assert {*store.index['objects']} == live_objects(), 'Objects kept by the sweep'
+        assert len(live_objects()) < len(versions) - chain, 'Delta chain not released'
+
+        store.compact()
+        store.sweep()
+
+        store = M_qa_file_std.SecureWriteBackupStore(root)
+        assert {*store.index['objects']} == live_objects(), 'Objects kept by the compaction'
+        assert not len(store._list_object_files_()), 'Loose object files left behind'
+        assert [entry for entry in os.listdir(root) if entry.endswith('.qSWPack')] == [store.index['pack']], 'Packs'
+
+        for digest, version in [*zip(digests, versions)][-keep:]:
+            assert store.get(digest) == version, 'Snapshot round trip (packed)'
+
+    # Test 0xF001:0x002E
+    #       BackupDelta and SecureWriteBackupStore: delta snapshots round trip; delta chains never form a cycle
+    @staticmethod
+    def _qa_fio_backup_delta(directory: str) -> None:
+        base = random.Random(0x2E).randbytes(max(AppPolicy.POLICY_FIO_SWB_DELTA_MIN_SIZE, 128 * 1024))
+        target = base[:1000] + b'inserted' + base[1000:50_000] + base[60_000:] + b'appended'
+
+        delta = M_qa_file_std.BackupDelta.compute(base, target, AppPolicy.POLICY_FIO_SWB_DELTA_BLOCK_SIZE)
+        assert isinstance(delta, bytes) and (len(delta) < len(target) // 2), 'Delta not computed'
+        assert M_qa_file_std.BackupDelta.apply(base, delta) == target, 'Delta round trip'
+
+        root = os.path.join(directory, 'swb')
+        store = M_qa_file_std.SecureWriteBackupStore(root)
+        source = M_qa_def.File(os.path.join(directory, 'source.bin'))
+
+        _, base_digest = store.put(source, base)
+        target_file, target_digest = store.put(source, target)
+
+        assert store.index['objects'][target_digest].get('base') == base_digest, 'Snapshot not stored as a delta'
+
+        # A new store object reads every object off the disk.
+        store = M_qa_file_std.SecureWriteBackupStore(root)
+        assert store.get(base_digest) == base, 'Full snapshot round trip'
+        assert store.get(target_digest) == target, 'Delta snapshot round trip'
+
+        f_out = io.BytesIO()
+        store.get_to(target_digest, f_out)
+        assert f_out.getvalue() == target, 'Delta snapshot round trip (get_to)'
+
+        # Data that does not match the digest is never stored (neither as a delta nor as a full snapshot).
+        modified = target[:-8] + b'modified'
+        _raises(
+            IOError,
+            lambda data: store._put_(source, io.BytesIO(data), hashlib.sha256(target + b'!').hexdigest(), len(data)),
+            modified
+        )
+
+        # The object file of a delta snapshot is missing: the snapshot is stored again, as a full snapshot (it cannot
+        #   be a delta against itself); the reference held on its old base is released.
+        os.remove(target_file.file_path)
+        store.put(source, target)
+
+        objects = store.index['objects']
+        assert 'base' not in objects[target_digest], 'Delta against itself'
+        assert f'@{target_digest}' not in objects[base_digest]['refs'], 'Old base reference'
+        assert store.get(target_digest) == target, 'Stored again'
+
+        # The object file of the base is missing: the base cannot be a delta against the snapshot based on it.
+        _, delta_digest = store.put(source, modified)
+        assert objects[delta_digest].get('base') == target_digest, 'Snapshot not stored as a delta'
+
+        os.remove(store.object_file(target_digest).file_path)
+        store._data_cache.clear()
+        store.put(source, target)
+
+        assert 'base' not in objects[target_digest], 'Delta chain cycle'
+        assert store.get(delta_digest) == modified, 'Delta snapshot round trip (stored base)'
+
+        # Delta chain walks are bounded (e.g., a cycle in an index written by an older release).
+        objects[target_digest]['base'] = delta_digest
+        store._data_cache.clear()
+
+        _raises(AssertionError, store.get, delta_digest)
+
+    # Test 0xF001:0x002F
+    #       BackupContainer: round trip; modified, reordered, and truncated containers are rejected
+    @staticmethod
+    def _qa_fio_backup_container(directory: str) -> None:
+        BC = M_qa_file_std.BackupContainer
+        plain = b'Quizzing Application ' * 2048 + random.Random(0x2F).randbytes(16384)
+
+        f_out = io.BytesIO()
+        digest, crc32, _ = BC.encode(io.BytesIO(plain), f_out, 4096)
+        raw = f_out.getvalue()
+
+        f_out = io.BytesIO()
+        assert BC.decode(io.BytesIO(raw), f_out)[:2] == (digest, crc32), 'Container digest'
+        assert f_out.getvalue() == plain == M_qa_file_std.SecureWriteBackupStore._decode_(raw), 'Container round trip'
+
+        # Split the container into its records (see BackupContainer).
+        records, p = [], BC.HEADER_LENGTH
+        while p < len(raw):
+            length = 5 + BC.NONCE_LENGTH + int.from_bytes(raw[p:p + 4], 'big')
+            records.append(raw[p:p + length])
+            p += length
+
+        assert len(records) > 2, 'Container chunks'
+
+        modified = bytearray(raw)
+        modified[-1] ^= 0x01
+        reordered = raw[:BC.HEADER_LENGTH] + records[1] + records[0] + b''.join(records[2:])
+        truncated = raw[:BC.HEADER_LENGTH] + b''.join(records[:-1])
+
+        for bad in (bytes(modified), reordered, truncated, raw[:-1]):
+            _raises(M_qa_file_std.BadFileFormat, lambda container: BC.decode(io.BytesIO(container), io.BytesIO()), bad)
+
+    # Test 0xF001:0x0030
+    #       SlidingWindow and IOHistory: IO quotas are enforced without blocking the caller's thread
+    @staticmethod
+    def _qa_fio_rate_limit(directory: str) -> None:
+        op = M_qa_file_std.OperationType
+        window = M_qa_file_std.SlidingWindow(3)
+
+        for now in (10.0, 11.0, 12.0):
+            assert window.wait(now, 60.0) == 0.0, 'SlidingWindow.wait (not full)'
+            window.add(now, op.WRITE if now == 11.0 else op.READ)
+
+        assert window.wait(12.5, 60.0) == 57.5, 'SlidingWindow.wait (full)'
+        assert window.wait(70.0, 60.0) == 0.0, 'SlidingWindow.wait (oldest event left the window)'
+        assert window.count(10.5) == {op.READ: 1, op.WRITE: 1}, 'SlidingWindow.count'
+
+        window.add(70.0, op.WRITE)                                              # Overwrites the oldest event
+        window.resize(2)                                                        # Keeps the most recent events
+
+        assert (window.capacity, window.count(0.0)) == (2, {op.READ: 1, op.WRITE: 1}), 'SlidingWindow.resize'
+        assert window.wait(70.0, 60.0) == 2.0, 'SlidingWindow.wait (resized)'
+
+        tag_quotas, max_throttle = AppPolicy.POLICY_IO_TAG_QUOTAS_PER_MINUTE, AppPolicy.POLICY_IO_MAX_THROTTLE_SECONDS
+        file_io = ModDiagnostics._file_io_(directory)
+        file = M_qa_def.File(os.path.join(directory, 'limited.txt'))
+
+        try:
+            AppPolicy.POLICY_IO_TAG_QUOTAS_PER_MINUTE = {'diagnostics': 2}
+            AppPolicy.POLICY_IO_MAX_THROTTLE_SECONDS = 0
+
+            file_io.write(file, 'line 1', tag='diagnostics')
+            file_io.write(file, 'line 2', append_mode=True, tag='diagnostics')
+
+            # The quota is exhausted: the event is rejected at once (the caller is never put to sleep).
+            start = time.monotonic()
+            _raises(IOError, lambda data: file_io.write(file, data, tag='diagnostics'), 'line 3')
+            _raises(IOError, lambda f: file_io.read(f, tag='diagnostics'), file)
+
+            assert time.monotonic() - start < 1, 'Caller throttled'
+            assert file_io.read(file) == b'line 1\nline 2', 'Rejected write applied'
+
+            # Offloaded writes are accepted; the writer thread is throttled (here: rejected, see
+            #   POLICY_IO_MAX_THROTTLE_SECONDS) and the error is reported by FileIO.flush.
+            assert file_io.write(file, 'line 3', tag='diagnostics', offload_to_new_thread=True), 'Offloaded write'
+            _raises(IOError, file_io.flush, file)
+
+            assert file_io.iohm.metrics()['tags']['diagnostics']['WRITE']['ops'] == 2, 'Writes applied'
+
+        finally:
+            AppPolicy.POLICY_IO_TAG_QUOTAS_PER_MINUTE = tag_quotas
+            AppPolicy.POLICY_IO_MAX_THROTTLE_SECONDS = max_throttle
+            file_io.close()
+
+    # Test 0xF001:0x0031
+    #       IOHistory: quotas are kept per subsystem (tag) and per file; operations and bytes are accounted for
+    @staticmethod
+    def _qa_fio_accounting(directory: str) -> None:
+        op = M_qa_file_std.OperationType
+        tag_quotas = AppPolicy.POLICY_IO_TAG_QUOTAS_PER_MINUTE
+        path_quota = AppPolicy.POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE
+        file_io = ModDiagnostics._file_io_(directory)
+        file_1, file_2 = M_qa_def.File(os.path.join(directory, '1.txt')), M_qa_def.File(os.path.join(directory, '2.txt'))
+
+        try:
+            AppPolicy.POLICY_IO_TAG_QUOTAS_PER_MINUTE = {'chatty': 1}
+            AppPolicy.POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE = 3
+
+            # A subsystem that exhausts its quota does not affect other subsystems.
+            iohm = M_qa_file_std.IOHistory()
+            iohm.add_event(op.WRITE, 'chatty', file_1.file_path)
+
+            _raises(IOError, lambda tag: iohm.add_event(op.WRITE, tag, file_2.file_path), 'chatty')
+            iohm.add_event(op.WRITE, 'quiet', file_1.file_path)
+            iohm.add_event(op.READ, path=file_1.file_path)
+
+            # Neither does a file that exhausts its quota.
+            _raises(IOError, lambda path: iohm.add_event(op.READ, 'quiet', path), file_1.file_path)
+            iohm.add_event(op.READ, 'quiet', file_2.file_path)
+
+            assert iohm.rate() == 4, 'IOHistory.rate'
+            assert iohm.metrics()['window'] == {'READ': 2, 'WRITE': 2}, 'IOHistory.metrics (window)'
+
+            # Accounting (per tag and per file)
+            AppPolicy.POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE = path_quota
+
+            file_io.write(file_1, 'x' * 100, tag='quiz')
+            file_io.write(file_1, 'y' * 10, append_mode=True, append_delim='', tag='quiz')
+            file_io.read(file_1, tag='theme')
+
+            ModDiagnostics._write_bytes_(os.path.join(directory, 'blocker'), b'')    # Not a directory
+            bad_file = M_qa_def.File(os.path.join(directory, 'blocker', 'failed.txt'))
+            _raises(IOError, lambda tag: file_io.write(bad_file, 'z', tag=tag), 'quiz')
+
+            metrics = file_io.iohm.metrics()
+            quiz, theme, path = metrics['tags']['quiz'], metrics['tags']['theme'], metrics['paths'][file_1.file_path]
+
+            assert (quiz['WRITE']['ops'], quiz['WRITE']['bytes'], quiz['WRITE']['failed']) == (2, 110, 1), 'Writes (tag)'
+            assert (theme['READ']['ops'], theme['READ']['bytes'], theme['WRITE']['ops']) == (1, 110, 0), 'Reads (tag)'
+            assert (path['WRITE']['bytes'], path['READ']['bytes']) == (110, 110), 'Bytes (file)'
+            assert quiz['WRITE']['p99_latency'] >= quiz['WRITE']['p50_latency'] > 0, 'Latency'
+            assert quiz['bytes_per_second'] == 110 / M_qa_file_std.IOHistory.WINDOW, 'Bytes per second'
+
+        finally:
+            AppPolicy.POLICY_IO_TAG_QUOTAS_PER_MINUTE = tag_quotas
+            AppPolicy.POLICY_IO_MAX_EVENTS_PER_PATH_PER_MINUTE = path_quota
+            file_io.close()
+
+    # Test 0xF001:0x0032
+    #       FileIO.read and FileIO.open_view: data, checksums, and memory-mapped views
+    @staticmethod
+    def _qa_fio_read(directory: str) -> None:
+        mmap_min_size = AppPolicy.POLICY_FIO_MMAP_MIN_SIZE
+        file_io = ModDiagnostics._file_io_(directory)
+        small = M_qa_def.File(os.path.join(directory, 'small.txt'))
+        large = M_qa_def.File(os.path.join(directory, 'large.bin'))
+        data = random.Random(0x32).randbytes(64 * 1024)
+
+        try:
+            AppPolicy.POLICY_FIO_MMAP_MIN_SIZE = 32 * 1024
+
+            ModDiagnostics._write_bytes_(small.file_path, b'small file')
+            ModDiagnostics._write_bytes_(large.file_path, data)
+
+            assert file_io.read(small, checksum=zlib.crc32(b'small file')) == b'small file', 'FileIO.read'
+            _raises(IOError, lambda crc32: file_io.read(small, checksum=crc32), zlib.crc32(b'small file') ^ 1)
+
+            with file_io.open_view(small) as view:
+                assert view.tobytes() == b'small file', 'FileIO.open_view (small file)'
+
+            view_object = file_io.open_view(large, checksum=zlib.crc32(data))
+            assert isinstance(view_object._mapping, mmap.mmap), 'Large file not memory-mapped'
+
+            with view_object as view:
+                assert view.readonly and (view[:1000] == data[:1000]) and (len(view) == len(data)), \
+                    'FileIO.open_view (large file)'
+
+            assert view_object._mapping.closed, 'Memory map not closed'
+            _raises(IOError, lambda crc32: file_io.open_view(large, checksum=crc32), zlib.crc32(data) ^ 1)
+
+            # Queued writes are applied before the file is read.
+            file_io.write(large, 'replaced', offload_to_new_thread=True)
+
+            with file_io.open_view(large) as view:
+                assert view.tobytes() == b'replaced', 'FileIO.open_view (queued write)'
+
+            assert file_io.iohm.metrics()['paths'][large.file_path]['READ']['bytes'] == len(data) + 8, 'Bytes read'
+
+        finally:
+            AppPolicy.POLICY_FIO_MMAP_MIN_SIZE = mmap_min_size
+            file_io.close()
+
+    # Test 0xF001:0x0033
+    #       Transaction: if one staged write fails, every file is rolled back
+    @staticmethod
+    def _qa_fio_transaction(directory: str) -> None:
+        file_io = ModDiagnostics._file_io_(directory)
+
+        a = M_qa_def.File(os.path.join(directory, 'a.txt'))
+        b = M_qa_def.File(os.path.join(directory, 'b.txt'))
+        blocked = M_qa_def.File(os.path.join(directory, 'blocked'))  # A directory cannot be replaced by a file.
+
+        try:
+            ModDiagnostics._write_bytes_(a.file_path, b'A0')
+            os.makedirs(blocked.file_path)
+
+            try:
+                with file_io.transaction() as tx:
+                    tx.write(a, 'A1')
+                    tx.write(b, 'B1')
+                    tx.write(blocked, 'C1')
+
+            except IOError:
+                pass
+
+            else:
+                raise AssertionError('Transaction did not fail')
+
+            assert ModDiagnostics._read_bytes_(a.file_path) == b'A0', 'Replaced file not rolled back'
+            assert not os.path.exists(b.file_path), 'Created file not rolled back'
+            assert not len(file_io.journal._open), 'Journal operation left open'
+            assert sorted(os.listdir(directory)) == ['a.txt', 'blocked', 'journal.qWAL'], 'Temp files left behind'
+
+            with file_io.transaction() as tx:
+                tx.write(a, 'A2')
+                tx.write(b, 'B2')
+
+            assert ModDiagnostics._read_bytes_(a.file_path) == b'A2', 'Transaction not committed'
+            assert ModDiagnostics._read_bytes_(b.file_path) == b'B2', 'Transaction not committed'
+
+        finally:
+            file_io.close()
+
+    # Test 0xF001:0x0034
+    #       WriteAheadJournal: operations that were in progress when the app "crashed" are recovered at startup, and
+    #       orphaned temp files are deleted
+    @staticmethod
+    def _qa_fio_journal(directory: str) -> None:
+        target = M_qa_def.File(os.path.join(directory, 'target.txt'))
+        log = M_qa_def.File(os.path.join(directory, 'log.txt'))
+        journal_path = os.path.join(directory, 'journal.qWAL')
+
+        ModDiagnostics._write_bytes_(target.file_path, b'old data')
+        ModDiagnostics._write_bytes_(log.file_path, b'line 1')
+
+        journal = M_qa_file_std.WriteAheadJournal(journal_path)
+
+        # A completed operation is not recovered.
+        journal.end(journal.begin_append(log))
+
+        # Replace: the new data is in the temp file and the target was moved aside, but it was never replaced.
+        temp = f'{target.file_path}.tmp'
+        ModDiagnostics._write_bytes_(temp, b'new data')
+        journal.begin_replace([{'target': target.file_path, 'temp': temp, 'old': f'{temp}.old'}])
+        os.replace(target.file_path, f'{temp}.old')
+
+        # Append: part of the new data was appended.
+        journal.begin_append(log)
+        ModDiagnostics._write_bytes_(log.file_path, b'\nline 2 (partial)', 'ab')
+
+        # Torn (partially written) record: the CRC32 does not match the payload.
+        journal.close()
+        ModDiagnostics._write_bytes_(journal_path, b'\x00\x00\x00\x10\x00\x00\x00\x00{"op": "replace"', 'ab')
+
+        # Orphaned temp file (interrupted single-file secure write; these are not journaled).
+        os.makedirs(os.path.join(directory, 'sub'))
+        ModDiagnostics._write_bytes_(os.path.join(directory, 'sub', 'data.txt.x1y2.qSWTemp'), b'new data')
+
+        recovered = M_qa_file_std.WriteAheadJournal(journal_path).recover([directory])
+        assert recovered == 2, 'Number of recovered operations'
+
+        assert ModDiagnostics._read_bytes_(target.file_path) == b'new data', 'Interrupted replace not completed'
+        assert ModDiagnostics._read_bytes_(log.file_path) == b'line 1', 'Interrupted append not discarded'
+        assert sorted(os.listdir(directory)) == ['log.txt', 'sub', 'target.txt'], 'Temp files or journal left behind'
+        assert not len(os.listdir(os.path.join(directory, 'sub'))), 'Orphaned temp file left behind'
+
+        # Single-file secure writes are not journaled; secure appends are (and their operations are closed).
+        file_io = ModDiagnostics._file_io_(directory)
+
+        try:
+            file_io.write(target, 'newer data')
+            assert not os.path.exists(file_io.journal.file.file_path), 'Single-file write journaled'
+
+            file_io.write(log, 'line 2', append_mode=True)
+            assert [r['op'] for r in file_io.journal._read_records_()] == ['append', 'end'], 'Append not journaled'
+
+        finally:
+            file_io.close()
+
+        # The journal is only restarted once no operation is open.
+        max_size = AppPolicy.POLICY_FIO_WAL_MAX_SIZE
+        journal = M_qa_file_std.WriteAheadJournal(os.path.join(directory, 'restart.qWAL'))
+
+        try:
+            AppPolicy.POLICY_FIO_WAL_MAX_SIZE = 0
+
+            op_1, op_2 = journal.begin_append(log), journal.begin_append(target)
+            journal.end(op_1)
+
+            assert [r['id'] for r in journal._read_records_()] == [op_1, op_2, op_1], 'Journal restarted (open operation)'
+
+            journal.end(op_2)
+            assert os.path.getsize(journal.file.file_path) == 0, 'Journal not restarted'
+
+        finally:
+            AppPolicy.POLICY_FIO_WAL_MAX_SIZE = max_size
+            journal.close()
+
+    @staticmethod
+    def qa_file_io() -> bool:
+        return (
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0029', 'QA_FIO:APPEND', ModDiagnostics._qa_fio_append) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x002A', 'QA_FIO:WRITE_BEHIND', ModDiagnostics._qa_fio_write_behind) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x002B', 'QA_FIO:ATOMIC_REPLACE', ModDiagnostics._qa_fio_atomic_replace) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x002C', 'QA_FIO:SWB_DEDUP', ModDiagnostics._qa_fio_backup_dedup) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x002D', 'QA_FIO:SWB_SWEEP', ModDiagnostics._qa_fio_backup_store) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x002E', 'QA_FIO:SWB_DELTA', ModDiagnostics._qa_fio_backup_delta) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x002F', 'QA_FIO:SWB_CONTAINER', ModDiagnostics._qa_fio_backup_container) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0030', 'QA_FIO:RATE_LIMIT', ModDiagnostics._qa_fio_rate_limit) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0031', 'QA_FIO:ACCOUNTING', ModDiagnostics._qa_fio_accounting) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0032', 'QA_FIO:READ', ModDiagnostics._qa_fio_read) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0033', 'QA_FIO:TX_ROLLBACK', ModDiagnostics._qa_fio_transaction) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0034', 'QA_FIO:WAL_RECOVERY', ModDiagnostics._qa_fio_journal)
+        )
+
+    # Test 0xF001:0x0035
+    #       Version two theme files: write then read (every theme, and a single theme by code); modified files are
+    #       rejected
+    @staticmethod
+    def _qa_theme_file_v2(directory: str) -> None:
+        TF = M_qa_theme_file.ThemeFile
+        source = TF.read_file(M_qa_def.File(M_qa_app_info.Storage.DefaultThemeFile))
+
+        file = M_qa_def.File(os.path.join(directory, f'themes.{TF.extension}'))
+        data = TF.generate_file_data(source, 2)
+        ModDiagnostics._write_bytes_(file.file_path, data)
+
+        theme_file = TF.read_file(file)
+
+        assert theme_file.header.VERSION_INT == 2, 'File version'
+        assert (theme_file.collection_name, theme_file.author) == (source.collection_name, source.author), 'Meta'
+        assert len(theme_file.themes) == len(source.themes), 'Number of themes'
+
+        for expected, actual in zip(source.themes, theme_file.themes):
+            assert actual.theme_name == expected.theme_name, 'Theme name'
+            assert actual.theme_code == expected.theme_code == TF.compute_theme_code(actual), 'Theme code'
+            assert TF._theme_dict_(actual) == TF._theme_dict_(expected), 'Theme data'
+
+        for i, expected in enumerate(source.themes):
+            assert TF._theme_dict_(TF.read_theme(file, expected.theme_code)) == TF._theme_dict_(expected), 'read_theme'
+            assert TF.read_theme(file, expected.theme_code, i).theme_name == expected.theme_name, 'read_theme (index)'
+
+        modified = bytearray(data)
+        modified[-1] ^= 0x01
+        ModDiagnostics._write_bytes_(file.file_path, bytes(modified))
+
+        _raises(AssertionError, TF.read_file, file)
+
+    # Test 0xF001:0x0036
+    #       Version one theme files: write then read; the checksum (raw span) is also valid for legacy readers (which
+    #       re-serialize the meta and the content); modified files are rejected
+    @staticmethod
+    def _qa_theme_file_v1(directory: str) -> None:
+        TF = M_qa_theme_file.ThemeFile
+        source = TF.read_file(M_qa_def.File(M_qa_app_info.Storage.DefaultThemeFile))
+
+        file = M_qa_def.File(os.path.join(directory, f'themes.{TF.extension}'))
+        data = TF.generate_file_data(source, 1)
+        ModDiagnostics._write_bytes_(file.file_path, data)
+
+        theme_file = TF.read_file(file)
+
+        assert (theme_file.collection_name, theme_file.author) == (source.collection_name, source.author), 'Meta'
+        assert [TF._theme_dict_(t) for t in theme_file.themes] == [TF._theme_dict_(t) for t in source.themes], 'Themes'
+
+        # Legacy readers: parse the body, remove the validation data, and re-serialize the rest.
+        body = json.loads(data[len(TF._create_version_one_header_()):])
+        v = body.pop('v')
+        m_and_c = json.dumps(body).encode()
+
+        assert [*body] == ['meta', 'content'] and len(body['meta']) == 4, 'Legacy structure'
+        assert (v['Theme.CRC32'], v['Theme.HASH']) == (zlib.crc32(m_and_c), hashlib.sha3_256(m_and_c).hexdigest()), \
+            'Legacy checksum'
+
+        assert (theme_file.CHECKSUM, theme_file.SHA3_256) == (v['Theme.CRC32'], v['Theme.HASH']), 'Raw span checksum'
+
+        for position in (-4, len(data) // 2):
+            modified = bytearray(data)
+            modified[position] = ord('0') if modified[position] != ord('0') else ord('1')
+            ModDiagnostics._write_bytes_(file.file_path, bytes(modified))
+
+            _raises(Exception, TF.read_file, file)
+
+    # Test 0xF001:0x0037
+    #       ThemeIndex: themes are found by their full code (or by a code written by an earlier release); version one
+    #       files store precomputed theme codes
+    @staticmethod
+    def _qa_theme_file_index(directory: str) -> None:
+        TF, TI, Storage = M_qa_theme_file.ThemeFile, M_qa_theme_file.ThemeIndex, M_qa_app_info.Storage
+        storage = Storage.ThemeDefaultDir, Storage.ThemeInstallDir, Storage.ThemeIndexFile
+        source = TF.read_file(M_qa_def.File(Storage.DefaultThemeFile))
+
+        try:
+            Storage.ThemeDefaultDir, Storage.ThemeInstallDir = os.path.join(directory, 'd'), os.path.join(directory, 'i')
+            Storage.ThemeIndexFile = os.path.join(directory, 'tix.qconfig')
+            TI._files, TI._lookup = None, {}
+
+            v1_file = M_qa_def.File(os.path.join(Storage.ThemeDefaultDir, f'v1.{TF.extension}'))
+            v2_file = M_qa_def.File(os.path.join(Storage.ThemeInstallDir, f'v2.{TF.extension}'))
+            os.makedirs(v1_file.path)
+            os.makedirs(v2_file.path)
+
+            ModDiagnostics._write_bytes_(v1_file.file_path, TF.generate_file_data(source, 1))
+            source.collection_name = 'Diagnostics'
+            ModDiagnostics._write_bytes_(v2_file.file_path, TF.generate_file_data(source, 2))
+
+            for i, theme in enumerate(source.themes):
+                code = theme.theme_code
+
+                for collection, file in (('Diagnostics', v2_file), (TF.read_file(v1_file).collection_name, v1_file)):
+                    found = TI.find(collection, theme.theme_name, code)
+                    assert found is not None and (found[0].file_path, found[1]) == (file.file_path, i), 'ThemeIndex.find'
+
+                    # Codes written by earlier releases: the theme code followed by a salt.
+                    found = TI.find(collection, theme.theme_name, f'{code}15')
+                    assert found is not None and found[0].file_path == file.file_path, 'ThemeIndex.find (legacy code)'
+
+                    assert TF.read_theme(file, f'{code}15', i).theme_name == theme.theme_name, 'read_theme (legacy code)'
+
+                # Full codes are compared (not only the MD5 string).
+                assert TI.find('Diagnostics', theme.theme_name, code[:32]) is None, 'ThemeIndex.find (partial code)'
+                assert TI.find('Diagnostics', theme.theme_name, f'{code[:32]}0') is None, 'ThemeIndex.find (bad code)'
+                assert TI.find('Other', theme.theme_name, code) is None, 'ThemeIndex.find (collection)'
+
+            # Version one files: the stored codes are used (the themes are not hashed again).
+            data = ModDiagnostics._read_bytes_(v1_file.file_path)
+            assert b'"Theme.Codes": {' in data.split(b'\n')[0], 'Precomputed theme codes'
+
+            name, code = source.themes[0].theme_name, source.themes[0].theme_code
+            ModDiagnostics._write_bytes_(
+                v1_file.file_path, data.replace(f'"{name}": "{code}"'.encode(), f'"{name}": "precomputed"'.encode(), 1)
+            )
+            assert TF.read_file(v1_file).themes[0].theme_code == 'precomputed', 'Precomputed theme code not used'
+
+        finally:
+            M_qa_theme_file.file_io_manager.flush()
+            Storage.ThemeDefaultDir, Storage.ThemeInstallDir, Storage.ThemeIndexFile = storage
+            TI._files, TI._lookup = None, {}
+
+    # Test 0xF001:0x0038
+    #       ThemeFile.validate_many and ThemeFile.install_many: every file is checked (in worker processes); valid files
+    #       are installed in chunks, and only count as installed once their chunk is committed
+    @staticmethod
+    def _qa_theme_file_bulk(directory: str) -> None:
+        TF, TI, Storage = M_qa_theme_file.ThemeFile, M_qa_theme_file.ThemeIndex, M_qa_app_info.Storage
+        storage = Storage.ThemeDefaultDir, Storage.ThemeInstallDir, Storage.ThemeIndexFile
+        source = TF.read_file(M_qa_def.File(Storage.DefaultThemeFile))
+
+        try:
+            Storage.ThemeDefaultDir, Storage.ThemeInstallDir = os.path.join(directory, 'd'), os.path.join(directory, 'i')
+            Storage.ThemeIndexFile = os.path.join(directory, 'tix.qconfig')
+            TI._files, TI._lookup = None, {}
+
+            # More valid files than fit in one chunk, an invalid file, and two archive members with the same file name.
+            archive_file = os.path.join(directory, 'themes.zip')
+            valid = {f'theme_{i:02}.{TF.extension}' for i in range(TF.bulk_batch_size + 8)}
+            shared, bad = {f'a/shared.{TF.extension}', f'b/shared.{TF.extension}'}, f'bad.{TF.extension}'
+
+            with zipfile.ZipFile(archive_file, 'w') as archive:
+                for i, name in enumerate(sorted(valid)):
+                    source.collection_name = f'Collection {i}'
+                    archive.writestr(name, TF.generate_file_data(source, 1 + i % 2))
+
+                archive.writestr(bad, b'not a theme file')
+                for name in sorted(shared):
+                    archive.writestr(name, TF.generate_file_data(source, 2))
+
+            results = {r.source: r for r in TF.validate_many(M_qa_def.File(archive_file), workers=2)}
+
+            assert {n for n, r in results.items() if r.valid} == valid | shared, 'validate_many (valid files)'
+            assert results[f'theme_00.{TF.extension}'].themes == [(t.theme_name, t.theme_code) for t in source.themes], \
+                'validate_many (themes)'
+
+            # The first chunk cannot be installed (a directory is in the way of one of its files).
+            blocked = min(valid)
+            os.makedirs(os.path.join(Storage.ThemeInstallDir, blocked))
+
+            report = TF.install_many(M_qa_def.File(archive_file), workers=1)
+            installed = {name for name in valid if os.path.isfile(os.path.join(Storage.ThemeInstallDir, name))}
+
+            assert (report.total, report.valid, report.invalid) == (len(valid) + 3, len(valid), 3), 'Report (counts)'
+            assert report.installed == len(installed) == len(valid) - TF.bulk_batch_size, 'Installed files'
+            assert {*report.errors} == {bad, *shared, *(valid - installed)}, 'Report (errors)'
+            assert blocked not in installed, 'Blocked file installed'
+
+            found = TI.find(f'Collection {len(valid) - 1}', source.themes[0].theme_name, source.themes[0].theme_code)
+            assert found is not None and found[0].file_name == max(valid), 'Installed files not indexed'
+
+        finally:
+            M_qa_theme_file.file_io_manager.flush()
+            Storage.ThemeDefaultDir, Storage.ThemeInstallDir, Storage.ThemeIndexFile = storage
+            TI._files, TI._lookup = None, {}
+
+    @staticmethod
+    def qa_theme_file() -> bool:
+        return (
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0035', 'QA_THEME_FILE:V2', ModDiagnostics._qa_theme_file_v2) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0036', 'QA_THEME_FILE:V1', ModDiagnostics._qa_theme_file_v1) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0037', 'QA_THEME_FILE:INDEX', ModDiagnostics._qa_theme_file_index) &
+                ModDiagnostics._qa_fio_sr1_('0xF001:0x0038', 'QA_THEME_FILE:BULK', ModDiagnostics._qa_theme_file_bulk)
+        )
+
 
 class GeneralDiagnostics:
     pass
@@ -10,7 +10,13 @@ DOC
 DEFINES
 
     (method)    public; Any         convert
+    (method)    public; int         encode_to       Streams the byte form of data to a writable (see convert)
+    (method)    public; List[Any]   convert_many    Batch conversion (see convert)
     (class)     public; data class  CFA
+    (class)     public              FrozenCFA       Immutable (hashable) CFA struct (see CFA.freeze)
+    (class)     public              Memo            Bounded (LRU) memo of small immutable conversions (see convert)
+    (class)     public; data class  MemoInfo
+    (dict)      private             _DISPATCH       (input type, output type) --> converter function
     ...         private methods
 
 DEPENDENCIES
@@ -18,14 +24,20 @@ DEPENDENCIES
     typing.*
     sys.stderr                  [alias: stderr]
     dataclasses.dataclass       [alias: dataclass]
+    dataclasses.fields          [alias: fields]
+    functools.lru_cache
     qa_std.locale               [alias: locale]
+    qa_std.qa_app_pol           [alias: AppPolicy]
 
 """
 
 from sys import stderr
+from operator import add
 from typing import *
+from functools import lru_cache
 from . import locale
-from dataclasses import dataclass
+from . import qa_app_pol as AppPolicy
+from dataclasses import dataclass, fields
 
 
 @dataclass
@@ -48,6 +60,34 @@ class CFA:
                                 d: keys --> float and values --> float then added.
     '''
 
+    def freeze(self) -> 'FrozenCFA':
+        return self if isinstance(self, FrozenCFA) else FrozenCFA(self)
+
+
+class FrozenCFA(CFA):
+    """
+    Immutable (hashable) copy of a CFA struct; conversions are only memoized (see Memo) with a frozen CFA.
+    """
+
+    values: Tuple[Any, ...]  # Field values (in order); used as the memo key
+
+    def __init__(self, cfa: CFA) -> None:
+        values = tuple(getattr(cfa, field.name) for field in fields(CFA))
+
+        for field, value in zip(fields(CFA), values):
+            object.__setattr__(self, field.name, value)
+
+        object.__setattr__(self, 'values', values)
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError('FrozenCFA objects are immutable.')
+
+    def __delattr__(self, key: str) -> None:
+        raise AttributeError('FrozenCFA objects are immutable.')
+
+    def __hash__(self) -> int:
+        return hash(self.values)
+
 
 """
 The Basics:
@@ -86,554 +126,598 @@ DNA = (str, bytes, int, float, complex, bool)   # Def non-aggregate
 DA = (list, tuple, set, dict)                   # Def aggregate
 CUSTOM = ()                                     # Custom
 
-# Default aggregate
+"""
+Converter functions
 
+Each conversion is a plain function of (data, cfa); the functions are collected in a dispatch table that maps
+(input type, output type) onto the function (see _DISPATCH and convert). The converter classes below use the same
+functions.
 
-class ConvertToDefaultType:
-    def __init__(
-            self,
-            output_type: type,
-            data_type: type,
-            supported_output_type: type,
-            supported_data_types: Tuple[Type[Any], ...],
-            *args: Any,
-            **kwargs: Any
-    ) -> None:
-        """
-        Parent class for default type convertors
+"""
 
-        :param output_type:                 Output data type
-        :param data_type:                   Input data type
-        :param supported_output_type:       Intended output type (checked whether default type)
-        :param supported_data_types:        Supported data types for input data
-        :param args:                        Other arguments
-        :param kwargs:                      Other keyword arguments
+Converter = Callable[[Any, CFA], Any]
 
-        :keyword cfa:                       Convertor function args struct.
-                                            If none is provided, then a struct with default values
-                                            will be created automatically.
 
-        """
+def _encoding_() -> str:
+    return cast(str, locale.get_locale().encoding)
 
-        assert supported_output_type in (*DNA, *DA)
-        assert data_type in supported_data_types, '0x100000'
-        assert output_type is supported_output_type, '0x100001'
 
-        self.encoding = cast(str, locale.get_locale().encoding)
+# --> LIST
 
-        self.cfa = kwargs.get('cfa')
-        if not isinstance(self.cfa, CFA):
-            self.cfa = CFA()
+def _list_from_str_(d: str, cfa: CFA) -> List[Any]: return d.split(cfa.list_delim)
 
-    def _reload_encoding_(self, *_: Any, **__: Any) -> None:
-        self.encoding = cast(str, locale.get_locale().encoding)
 
+def _list_from_bytes_(d: bytes, cfa: CFA) -> List[Any]: return d.split(cfa.list_delim.encode(_encoding_()))
 
-class LIST(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), list, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
+def _list_from_bool_(d: bool, _: CFA) -> List[Any]: return [] if d else [1]
 
-    def go(self) -> List[Any]:
-        return {
-                str: self._str,
-                bytes: self._bytes,
-                bool: self._bool,
-                int: self._int,
-                float: self._float,
-                complex: self._complex,
-                set: self._set,
-                tuple: self._tuple,
-                dict: self._dict
-            }[type(self.d)]()
 
-    def _str(self) -> List[Any]:
-        return cast(str, self.d).split(cast(CFA, self.cfa).list_delim)
+def _list_from_number_(d: Union[int, float], _: CFA) -> List[Any]: return [d]
 
-    def _bytes(self) -> List[Any]:
-        return cast(bytes, self.d).split(cast(CFA, self.cfa).list_delim.encode(self.encoding))
 
-    def _bool(self) -> List[Any]:
-        return [] if cast(bool, self.d) else [1]
+def _list_from_complex_(d: complex, _: CFA) -> List[Any]: return [d.real, d.imag]
 
-    def _int(self) -> List[Any]:
-        return [self.d]
 
-    def _float(self) -> List[Any]:
-        return [self.d]
+def _list_from_iterable_(d: Union[Set[Any], Tuple[Any, ...]], _: CFA) -> List[Any]: return [*d]
 
-    def _complex(self) -> List[Any]:
-        return [cast(complex, self.d).real, cast(complex, self.d).imag]
 
-    def _set(self) -> List[Any]:
-        return [*cast(Set[Any], self.d)]
+def _list_from_dict_(d: Dict[Any, Any], cfa: CFA) -> List[Any]:
+    return [f'{convert(str, k, cfa=cfa)}{cfa.dict_kv_delim}{convert(str, v, cfa=cfa)}' for k, v in d.items()]
 
-    def _tuple(self) -> List[Any]:
-        return [*cast(Tuple[Any], self.d)]
 
-    def _dict(self) -> List[Any]:
-        return [
-            f'{convert(str, k, cfa=self.cfa)}{cast(CFA, self.cfa).dict_kv_delim}{convert(str, v, cfa=self.cfa)}'
-            for k, v in cast(Dict[Any, Any], self.d).items()
-        ]
+_TO_LIST: Dict[type, Converter] = {
+    str: _list_from_str_,
+    bytes: _list_from_bytes_,
+    bool: _list_from_bool_,
+    int: _list_from_number_,
+    float: _list_from_number_,
+    complex: _list_from_complex_,
+    set: _list_from_iterable_,
+    tuple: _list_from_iterable_,
+    dict: _list_from_dict_
+}
 
 
-class TUPLE(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
+# --> TUPLE, SET
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), tuple, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
+def _tuple_(d: Any, cfa: CFA) -> Tuple[Any, ...]: return (*convert(list, d, cfa=cfa),)
 
-    def go(self) -> Tuple[Any, ...]:
-        return (*convert(list, self.d, cfa=self.cfa),)
 
+def _set_(d: Any, cfa: CFA) -> Set[Any]: return {*convert(list, d, cfa=cfa), }
 
-class SET(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), set, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
+# --> DICT
 
-    def go(self) -> Set[Any]:
-        return {*convert(list, self.d, cfa=self.cfa),}
+def _dict_from_str_(d: str, cfa: CFA) -> Dict[Any, Any]:
+    d = d.strip()
 
+    if d[0] == '{':
+        assert len(d) >= 2
+        d = d[1::]
 
-class DICT(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
+    if d[-1] == '}':
+        assert len(d) >= 2
+        d = d[:-1]
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), dict, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
+    o = {}
 
-    def go(self) -> Dict[Any, Any]:
-        return cast(
-            Dict[Any, Any],
-            {  # type: ignore
-                str: self._str,
-                bytes: self._bytes,
-                bool: self._bool,
-                int: self._int,
-                float: self._float,
-                complex: self._complex,
-                list: self._list,
-                tuple: self._tuple,
-                set: self._set
-            }[type(self.d)]()
-        )
+    for entry in d.split(cfa.dict_entry_delim):
+        k = entry.split(cfa.dict_kv_delim)[0].strip(cfa.dict_kv_delim).strip()
+        v = entry.replace(k, '', 1).strip(cfa.dict_kv_delim).strip()
 
-    def _str(self) -> Dict[Any, Any]:
-        self.d = cast(str, self.d).strip()
+        o[k] = v
 
-        if self.d[0] == '{':
-            assert len(self.d) >= 2
-            self.d = self.d[1::]
+    return o
 
-        if self.d[-1] == '}':
-            assert len(self.d) >= 2
-            self.d = self.d[:-1]
 
-        e = self.d.split(cast(CFA, self.cfa).dict_entry_delim)
-        o = {}
+def _dict_from_bytes_(d: bytes, cfa: CFA) -> Dict[Any, Any]:
+    encoding = _encoding_()
+    kv_delim = cfa.dict_kv_delim.encode(encoding)
+    d = d.strip()
 
-        for entry in e:
-            k = entry.split(cast(CFA, self.cfa).dict_kv_delim)[0].strip(cast(CFA, self.cfa).dict_kv_delim).strip()
-            v = entry.replace(k, '', 1).strip(cast(CFA, self.cfa).dict_kv_delim).strip()
+    if d[0] in ('{'.encode(encoding), ord('{'.encode(encoding))):
+        assert len(d) >= 2
+        d = d[1::]
 
-            o[k] = v
+    if d[-1] in ('}'.encode(encoding), ord('}'.encode(encoding))):
+        assert len(d) >= 2
+        d = d[:-1]
 
-        return o
+    o = {}
 
-    def _bytes(self) -> Dict[Any, Any]:
-        self.d = cast(bytes, self.d).strip()
+    for entry in d.split(cfa.dict_entry_delim.encode(encoding)):
+        k = entry.split(kv_delim)[0].strip(kv_delim).strip()
+        v = entry.replace(k, ''.encode(encoding), 1).strip(kv_delim).strip()
 
-        if self.d[0] in ('{'.encode(self.encoding), ord('{'.encode(self.encoding))):
-            assert len(self.d) >= 2
-            self.d = self.d[1::]
+        o[k] = v
 
-        if self.d[-1] == ('}'.encode(self.encoding), ord('}'.encode(self.encoding))):
-            assert len(self.d) >= 2
-            self.d = self.d[:-1]
+    return o
 
-        e = self.d.split(cast(CFA, self.cfa).dict_entry_delim.encode(self.encoding))
-        o = {}
 
-        for entry in e:
-            k = entry.split(cast(CFA, self.cfa).dict_kv_delim.encode(self.encoding))[0].strip(
-                cast(CFA, self.cfa).dict_kv_delim.encode(self.encoding)).strip()
-            v = entry.replace(k, ''.encode(self.encoding), 1).strip(
-                cast(CFA, self.cfa).dict_kv_delim.encode(self.encoding)).strip()
+def _dict_from_bool_(d: bool, _: CFA) -> Dict[Any, Any]: return {} if not d else {1: True}
 
-            o[k] = v
 
-        return o
+def _dict_from_number_(d: Union[int, float], _: CFA) -> Dict[Any, Any]: return {0: d}
 
-    def _bool(self) -> Dict[Any, Any]:
-        return {} if not self.d else {1: True}
 
-    def _int(self) -> Dict[Any, Any]:
-        return {0: self.d}
+def _dict_from_complex_(d: complex, _: CFA) -> Dict[Any, Any]: return {'real': d.real, 'imaginary': d.imag}
 
-    def _float(self) -> Dict[Any, Any]:
-        return {0: self.d}
 
-    def _complex(self) -> Dict[Any, Any]:
-        return {
-            'real': cast(complex, self.d).real,
-            'imaginary': cast(complex, self.d).imag
-        }
+def _dict_from_iterable_(d: Union[List[Any], Set[Any], Tuple[Any, ...]], cfa: CFA) -> Dict[Any, Any]:
+    o = {}
 
-    def _set(self) -> Dict[Any, Any]:
-        return self._list([*cast(Set[Any], self.d)])
+    for e in d:
+        tp = type(e)
+        ep = convert(str, e, cfa=cfa)
 
-    def _tuple(self) -> Dict[Any, Any]:
-        return self._list([*cast(Tuple[Any, ...], self.d)])
+        k = ep.split(cfa.dict_kv_delim)[0]
+        v = ep.replace(k, '', 1)
 
-    def _list(self, d: Optional[List[Any]]) -> Dict[Any, Any]:
-        data = d if isinstance(d, list) else cast(List[Any], self.d)
-        o = {}
+        o[k] = convert(tp, v, cfa=cfa)
 
-        for e in data:
-            tp = type(e)
-            ep = convert(str, e, cfa=self.cfa)
+    return o
 
-            k = ep.split(cast(CFA, self.cfa).dict_kv_delim)[0]
-            v = ep.replace(k, '', 1)
 
-            o[k] = convert(tp, v, cfa=self.cfa)
+_TO_DICT: Dict[type, Converter] = {
+    str: _dict_from_str_,
+    bytes: _dict_from_bytes_,
+    bool: _dict_from_bool_,
+    int: _dict_from_number_,
+    float: _dict_from_number_,
+    complex: _dict_from_complex_,
+    list: _dict_from_iterable_,
+    tuple: _dict_from_iterable_,
+    set: _dict_from_iterable_
+}
 
-        return o
 
+# --> STR, INT
 
-# Default non-aggregate
+def _str_(d: Any, cfa: CFA) -> str: return cast(bytes, convert(bytes, d, cfa=cfa)).decode(_encoding_())
 
-class STRING(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), str, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
-        self._reload_encoding_()
+def _int_(d: Any, cfa: CFA) -> int: return int(convert(float, d, cfa=cfa))
 
-    def go(self) -> str:
-        return cast(bytes, convert(bytes, self.d, cfa=self.cfa)).decode(self.encoding)
 
+# --> FLOAT
 
-class INTEGER(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
+def _float_from_str_(d: str, _: CFA) -> float: return float(d)
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), int, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
 
-    def go(self) -> int:
-        return int(convert(float, self.d, cfa=self.cfa))
+def _float_from_bytes_(d: bytes, _: CFA) -> float: return float(d.decode(_encoding_()))
 
 
-class FLOAT(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
+def _float_from_int_(d: int, _: CFA) -> float: return cast(float, d)
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), float, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
 
-    def go(self) -> float:
-        return cast(
-            float,
-            {  # type: ignore
-                str: self._str,
-                bytes: self._bytes,
-                int: self._int,
-                complex: self._complex,
-                bool: self._bool,
-                list: self._list,
-                tuple: self._tuple,
-                set: self._set,
-                dict: self._dict
-            }[type(self.d)]()
-        )
+def _float_from_complex_(d: complex, _: CFA) -> float: return float(d.real)
 
-    def _str(self) -> float:
-        return float(self.d)
 
-    def _bytes(self) -> float:
-        return float(cast(bytes, self.d).decode(self.encoding))
+def _float_from_bool_(d: bool, _: CFA) -> float: return float(d)
 
-    def _int(self) -> float:
-        return cast(float, self.d)
 
-    def _complex(self) -> float:
-        return float(cast(complex, self.d).real)
+def _float_from_iterable_(d: Union[List[Any], Set[Any], Tuple[Any, ...]], cfa: CFA) -> float:
+    match cfa.aggregate_to_numerical_conversion:
+        case 0:
+            # Length
+            return len(d)
 
-    def _list(self, d: Optional[List[Any]] = None) -> float:
-        if isinstance(d, list):
-            data = d
+        case 1 | 2 | 3:
+            return cast(float, sum(convert_many(int, d, cfa=cfa)))
 
-        else:
-            data = cast(List[Any], self.d)
+        case _:
+            stderr.write(f'[WARNING] [QA-DTC] [AGGREGATE --> NUMERICAL] Invalid value for ANC var. Default to 0\n')
+            cfa.aggregate_to_numerical_conversion = 0
+            return _float_from_iterable_(d, cfa)
 
-        match cast(CFA, self.cfa).aggregate_to_numerical_conversion:
-            case 0:
-                # Length
-                return len(data)  # type: ignore
 
-            case 1:
-                return sum([convert(int, e, cfa=cast(CFA, self.cfa)) for e in data])  # type: ignore
+def _float_from_dict_(d: Dict[Any, Any], cfa: CFA) -> float:
+    match cfa.aggregate_to_numerical_conversion:
+        case 0:
+            return len(d)
 
-            case 2:
-                return sum([convert(int, e, cfa=cast(CFA, self.cfa)) for e in data])  # type: ignore
+        case 1:
+            return cast(float, sum(convert_many(float, d.keys(), cfa=cfa)))
 
-            case 3:
-                return sum([convert(int, e, cfa=cast(CFA, self.cfa)) for e in data])  # type: ignore
+        case 2:
+            return cast(float, sum(convert_many(float, d.values(), cfa=cfa)))
 
-            case _:
-                stderr.write(f'[WARNING] [QA-DTC] [AGGREGATE --> NUMERICAL] Invalid value for ANC var. Default to 0\n')
-                cast(CFA, self.cfa).aggregate_to_numerical_conversion = 0
-                return self._list(data)
+        case 3:
+            return cast(
+                float, sum(map(add, convert_many(float, d.keys(), cfa=cfa), convert_many(float, d.values(), cfa=cfa)))
+            )
 
-    def _tuple(self) -> float:
-        return self._list(d=[*self.d])
+        case _:
+            stderr.write(f'[WARNING] [QA-DTC] [DICT --> NUMERICAL] Invalid value for ANC var. Default to 0\n')
+            cfa.aggregate_to_numerical_conversion = 0
+            return _float_from_dict_(d, cfa)
 
-    def _set(self) -> float:
-        return self._list(d=[*self.d])
 
-    def _dict(self) -> float:
-        match cast(CFA, self.cfa).aggregate_to_numerical_conversion:
-            case 0:
-                return len(self.d)  # type: ignore
+_TO_FLOAT: Dict[type, Converter] = {
+    str: _float_from_str_,
+    bytes: _float_from_bytes_,
+    int: _float_from_int_,
+    complex: _float_from_complex_,
+    bool: _float_from_bool_,
+    list: _float_from_iterable_,
+    tuple: _float_from_iterable_,
+    set: _float_from_iterable_,
+    dict: _float_from_dict_
+}
 
-            case 1:
-                return sum([convert(float, e, cfa=self.cfa) for e in self.d.keys()])  # type: ignore
 
-            case 2:
-                return sum([convert(float, e, cfa=self.cfa) for e in self.d.values()])  # type: ignore
+# --> COMPLEX
+#
+#   STRING:     if in complex format, str -> complex
+#               else len(str) -> real
+#   BYTES:      bytes.decode --> str comprehension
+#   INT:        int -> real
+#   FLOAT:      float -> real
+#   BOOLEAN:    real: 1 if True else real: 0
+#   LIST:       if list.len = 2 then real: l[0] imag: l[1]
+#               else list.len -> real
+#   TUPLE:      same as list
+#   SET:        same as list
+#   DICT:       if real or imaginary in dict: real: d.real, imag: d.imaginary
+#               else len(dict) -> real
 
-            case 3:
-                return sum(  # type: ignore
-                    [convert(float, k, cfa=self.cfa) + convert(float, v, cfa=self.cfa) for k, v in self.d.items()]
-                )
+def _complex_from_str_(d: str, _: CFA) -> complex:
+    try:
+        return complex(d)
 
-            case _:
-                stderr.write(f'[WARNING] [QA-DTC] [DICT --> NUMERICAL] Invalid value for ANC var. Default to 0\n')
-                cast(CFA, self.cfa).aggregate_to_numerical_conversion = 0
-                return self._dict()
+    except ValueError:
+        return complex(len(d), 0)
 
-    def _bool(self) -> float:
-        return float(self.d)
 
+def _complex_from_bytes_(d: bytes, cfa: CFA) -> complex: return _complex_from_str_(d.decode(_encoding_()), cfa)
 
-class COMPLEX(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), complex, self.supported_types, *args, **kwargs)
-        self.ot, self.d = output_type, data
+def _complex_from_number_(d: Union[int, float], _: CFA) -> complex: return complex(d, 0)
 
-    def go(self) -> complex:
-        """
-        DTC - To complex
-
-            STRING:     if in complex format, str -> complex
-                        else len(str) -> real
-            BYTES:      bytes.decode --> str comprehension
-            INT:        int -> real
-            FLOAT:      float -> real
-            BOOLEAN:    real: 1 if True else real: 0
-            LIST:       if list.len = 2 then real: l[0] imag: l[1]
-                        else list.len -> real
-            TUPLE:      same as list
-            SET:        same as list
-            DICT:       if real or imaginary in dict: real: d.real, imag: d.imaginary
-                        else len(dict) -> real
-
-        :return: complex
-        """
-        return complex({  # type: ignore
-            str: self._str,
-            bytes: self._bytes,
-            int: self._int,
-            float: self._float,
-            bool: self._bool,
-            list: self._list,
-            tuple: self._tuple,
-            set: self._set,
-            dict: self._dict
-        }[type(self.d)](self.d))
 
-    @staticmethod
-    def _str(d: str) -> complex:
-        try:
-            return complex(d)
+def _complex_from_bool_(d: bool, _: CFA) -> complex: return complex(1 if d else 0, 0)
 
-        except ValueError as e:
-            return complex(len(d), 0)
 
-    def _bytes(self, d: bytes) -> complex: return COMPLEX._str(d.decode(self.encoding))
+def _complex_from_iterable_(d: Union[List[Any], Set[Any], Tuple[Any, ...]], _: CFA) -> complex:
+    if 0 < len(d) <= 2:
+        return complex(*d)
 
-    @staticmethod
-    def _int(d: int) -> complex: return complex(d, 0)
+    else:
+        return complex(len(d), 0)
 
-    @staticmethod
-    def _float(d: float) -> complex: return complex(d, 0)
 
-    @staticmethod
-    def _bool(d: bool) -> complex: return complex(1 if d else 0, 0)
+def _complex_from_dict_(d: Dict[Any, Any], _: CFA) -> complex:
+    if 'real' in d or 'imag' in d:
+        return complex(d.get('real', 0), d.get('imaginary', 0))
 
-    @staticmethod
-    def _list(d: List[Any]) -> complex:
-        if 0 < len(d) <= 2:
-            return complex(*d)
+    else:
+        return complex(len(d), 0)
 
-        else:
-            return complex(len(d), 0)
 
-    @staticmethod
-    def _tuple(d: Tuple[Any, ...]) -> complex: return COMPLEX._list(cast(List[Any], d))
+_TO_COMPLEX: Dict[type, Converter] = {
+    str: _complex_from_str_,
+    bytes: _complex_from_bytes_,
+    int: _complex_from_number_,
+    float: _complex_from_number_,
+    bool: _complex_from_bool_,
+    list: _complex_from_iterable_,
+    tuple: _complex_from_iterable_,
+    set: _complex_from_iterable_,
+    dict: _complex_from_dict_
+}
 
-    @staticmethod
-    def _set(d: Set[Any]) -> complex: return COMPLEX._list(cast(List[Any], d))
 
-    @staticmethod
-    def _dict(d: Dict[Any, Any]) -> complex:
-        if 'real' in d or 'imag' in d:
-            return complex(d.get('real', 0), d.get('imaginary', 0))
+# --> BYTES
 
-        else:
-            return complex(len(d), 0)
+def _bytes_from_str_(d: str, _: CFA) -> bytes: return d.encode(_encoding_())
 
 
-class BYTES(ConvertToDefaultType):
-    supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
+def _bytes_from_number_(d: Union[int, float], _: CFA) -> bytes: return f'{d}'.encode(_encoding_())
 
-    def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), bytes, self.supported_types, *args, **kwargs)
-        self._reload_encoding_()
-        self.ot, self.d = output_type, data
 
-    def go(self) -> bytes:
-        return cast(
-            bytes,
-            {  # type: ignore
-                str: self._str,
-                int: self._int,
-                float: self._float,
-                complex: self._complex,
-                list: self._list,
-                tuple: self._tuple,
-                dict: self._dict,
-                bool: self._bool,
-                set: self._set
-            }[type(self.d)]()
-        )
+def _bytes_from_complex_(d: complex, _: CFA) -> bytes: return f'({d.real}+{d.imag}j)'.encode(_encoding_())
+
+
+def _bytes_from_bool_(d: bool, _: CFA) -> bytes: return ('True' if d else 'False').encode(_encoding_())
+
+
+_PARENS: Dict[type, Tuple[str, str]] = {list: ('[', ']'), tuple: ('(', ')'), set: ('{', '}')}
 
-    def _str(self) -> bytes: return cast(str, self.d).encode(self.encoding)
 
-    def _int(self) -> bytes: return f'{self.d}'.encode(self.encoding)
+Flush = Optional[Callable[[bytearray], None]]
 
-    def _float(self) -> bytes: return f'{self.d}'.encode(self.encoding)
 
-    def _complex(self) -> bytes:
-        return f'({cast(complex, self.d).real}+{cast(complex, self.d).imag}j)'.encode(self.encoding)
+def _write_aggregate_(sink: bytearray, d: Any, cfa: CFA, delims: Dict[str, bytes], flush: Flush = None) -> None:
+    # Writes an aggregate (and any nested aggregates) straight into one buffer. If a flush function is given, it is
+    #   called after every element (see encode_to).
+    if type(d) is dict:
+        sink += delims['{']
 
-    def _bool(self) -> bytes: return ('True' if self.d else 'False').encode(self.encoding)
+        for i, (k, v) in enumerate(d.items()):
+            if i:
+                sink += delims['entry']
 
-    def _list(self, d: Optional[List[Any]] = None, paren: str = '[]') -> bytes:
-        o: bytes = paren[0].encode(self.encoding)
-        l = self.d if not isinstance(d, list) else d
+            _write_element_(sink, k, cfa, delims, flush)
+            sink += delims['kv']
+            _write_element_(sink, v, cfa, delims, flush)
 
-        for i, el in enumerate(cast(List[Any], l)):
-            o += convert(bytes, el, cfa=self.cfa)
+            if flush is not None:
+                flush(sink)
 
-            if i != len(l) - 1:
-                o += cast(CFA, self.cfa).list_delim.encode(self.encoding)
+        sink += delims['}']
+        return
 
-        o += paren[1].encode(self.encoding)
-        return o
+    start, end = _PARENS[type(d)]
+    sink += delims[start]
 
-    def _tuple(self) -> bytes: return self._list([*self.d], '()')
+    for i, el in enumerate(d):
+        if i:
+            sink += delims['list']
 
-    def _set(self) -> bytes: return self._list([*self.d], '{}')
+        _write_element_(sink, el, cfa, delims, flush)
 
-    def _dict(self) -> bytes:
-        o: bytes = '{'.encode(self.encoding)
+        if flush is not None:
+            flush(sink)
 
-        for i, (k, v) in enumerate(cast(Dict[Any, Any], self.d).items()):
-            o += convert(bytes, k, cfa=self.cfa)
-            o += cast(CFA, self.cfa).dict_kv_delim.encode(self.encoding)
-            o += convert(bytes, v, cfa=self.cfa)
+    sink += delims[end]
 
-            if i != len(self.d) - 1:
-                o += cast(CFA, self.cfa).dict_entry_delim.encode(self.encoding)
 
-        o += '}'.encode(self.encoding)
+def _write_element_(sink: bytearray, d: Any, cfa: CFA, delims: Dict[str, bytes], flush: Flush) -> None:
+    if type(d) in _PARENS or type(d) is dict:
+        _write_aggregate_(sink, d, cfa, delims, flush)
 
-        return o
+    else:
+        sink += convert(bytes, d, cfa=cfa)
 
 
-class BOOLEAN(ConvertToDefaultType):
+def _delims_(cfa: CFA) -> Dict[str, bytes]:
+    encoding = _encoding_()
+
+    return {
+        **{p: p.encode(encoding) for p in '[](){}'},
+        'list': cfa.list_delim.encode(encoding),
+        'kv': cfa.dict_kv_delim.encode(encoding),
+        'entry': cfa.dict_entry_delim.encode(encoding),
+    }
+
+
+def _bytes_from_aggregate_(d: Union[List[Any], Tuple[Any, ...], Set[Any], Dict[Any, Any]], cfa: CFA) -> bytes:
+    sink = bytearray()
+    _write_aggregate_(sink, d, cfa, _delims_(cfa))
+
+    return bytes(sink)
+
+
+_TO_BYTES: Dict[type, Converter] = {
+    str: _bytes_from_str_,
+    int: _bytes_from_number_,
+    float: _bytes_from_number_,
+    complex: _bytes_from_complex_,
+    list: _bytes_from_aggregate_,
+    tuple: _bytes_from_aggregate_,
+    dict: _bytes_from_aggregate_,
+    bool: _bytes_from_bool_,
+    set: _bytes_from_aggregate_
+}
+
+
+# --> BOOL
+#
+#   STRING:     'Tt' in str and 'Ff' not in str
+#   BYTES:      'Tt' in bytes and 'Ff' not in bytes
+#   INT:        calls bool(int)
+#   FLOAT:      calls bool(float)
+#   COMPLEX:    calls bool(complex.real, complex.imag)
+#   LIST:       True if len(list) else False
+#   TUPLE:      True if len(tuple) else False
+#   SET:        True if len(set) else False
+#   DICT:       True if len(dict) else False
+
+def _bool_from_str_(d: str, _: CFA) -> bool: return ('t' in d.lower()) and not ('f' in d.lower())
+
+
+def _bool_from_bytes_(d: bytes, _: CFA) -> bool: return (b't' in d.lower()) and not (b'f' in d.lower())
+
+
+def _bool_from_number_(d: Union[int, float], _: CFA) -> bool: return bool(d)
+
+
+def _bool_from_complex_(d: complex, _: CFA) -> bool: return bool(d.real + d.imag)
+
+
+def _bool_from_aggregate_(d: Sized, _: CFA) -> bool: return bool(len(d))
+
+
+_TO_BOOL: Dict[type, Converter] = {
+    str: _bool_from_str_,
+    bytes: _bool_from_bytes_,
+    int: _bool_from_number_,
+    float: _bool_from_number_,
+    complex: _bool_from_complex_,
+    list: _bool_from_aggregate_,
+    tuple: _bool_from_aggregate_,
+    set: _bool_from_aggregate_,
+    dict: _bool_from_aggregate_
+}
+
+
+# Dispatch table: (input type, output type) --> converter function
+#   Pairs where the input is already an instance of the output type are handled by convert itself.
+_DISPATCH: Dict[Tuple[type, type], Converter] = {
+    **{(i, list): f for i, f in _TO_LIST.items()},
+    **{(i, tuple): _tuple_ for i in (*DNA, *DA)},
+    **{(i, set): _set_ for i in (*DNA, *DA)},
+    **{(i, dict): f for i, f in _TO_DICT.items()},
+    **{(i, str): _str_ for i in (*DNA, *DA)},
+    **{(i, int): _int_ for i in (*DNA, *DA)},
+    **{(i, float): f for i, f in _TO_FLOAT.items()},
+    **{(i, complex): f for i, f in _TO_COMPLEX.items()},
+    **{(i, bytes): f for i, f in _TO_BYTES.items()},
+    **{(i, bool): f for i, f in _TO_BOOL.items()},
+}
+
+_default_cfa = CFA()
+_frozen_default_cfa = _default_cfa.freeze()
+
+
+# Default aggregate
+
+
+class ConvertToDefaultType:
+    def __init__(
+            self,
+            output_type: type,
+            data_type: type,
+            supported_output_type: type,
+            supported_data_types: Tuple[Type[Any], ...],
+            *args: Any,
+            **kwargs: Any
+    ) -> None:
+        """
+        Parent class for default type convertors (the conversion itself is done by the converter functions; see
+        _DISPATCH).
+
+        :param output_type:                 Output data type
+        :param data_type:                   Input data type
+        :param supported_output_type:       Intended output type (checked whether default type)
+        :param supported_data_types:        Supported data types for input data
+        :param args:                        Other arguments
+        :param kwargs:                      Other keyword arguments
+
+        :keyword cfa:                       Convertor function args struct.
+                                            If none is provided, then a struct with default values
+                                            will be created automatically.
+
+        """
+
+        assert supported_output_type in (*DNA, *DA)
+        assert data_type in supported_data_types, '0x100000'
+        assert output_type is supported_output_type, '0x100001'
+
+        self.encoding = cast(str, locale.get_locale().encoding)
+
+        self.cfa = kwargs.get('cfa')
+        if not isinstance(self.cfa, CFA):
+            self.cfa = CFA()
+
+    def _reload_encoding_(self, *_: Any, **__: Any) -> None:
+        self.encoding = cast(str, locale.get_locale().encoding)
+
+
+class _DefaultTypeConverter(ConvertToDefaultType):
+    output_type: type
     supported_types: Tuple[Type[Any], ...] = (*DNA, *DA)
 
     def __init__(self, output_type: type, data: Any, *args: Any, **kwargs: Any) -> None:
-        ConvertToDefaultType.__init__(self, output_type, type(data), bool, self.supported_types, *args, **kwargs)
+        ConvertToDefaultType.__init__(self, output_type, type(data), self.output_type, self.supported_types, *args, **kwargs)
         self.ot, self.d = output_type, data
 
-    def go(self) -> bool:
-        """
-        DTC - To boolean
-
-            STRING:     'Tt' in str and 'Ff' not in str
-            BYTES:      'Tt' in bytes and 'Ff' not in bytes
-            INT:        calls bool(int)
-            FLOAT:      calls bool(float)
-            COMPLEX:    calls bool(complex.real, complex.imag)
-            LIST:       True if len(list) else False
-            TUPLE:      True if len(tuple) else False
-            SET:        True if len(set) else False
-            DICT:       True if len(dict) else False
-
-        :return: (bool)True or (bool)False
-        """
-        return bool({  # type: ignore
-            str: self._str,
-            bytes: self._bytes,
-            int: self._int,
-            float: self._float,
-            complex: self._complex,
-            list: self._list,
-            tuple: self._tuple,
-            set: self._set,
-            dict: self._dict
-        }[type(self.d)](self.d))
+    def go(self) -> Any:
+        return _DISPATCH[(type(self.d), self.ot)](self.d, cast(CFA, self.cfa))
 
-    @staticmethod
-    def _str(d: str) -> bool: return ('t' in d.lower()) and not ('f' in d.lower())
 
-    @staticmethod
-    def _bytes(d: bytes) -> bool: return (b't' in d.lower()) and not (b'f' in d.lower())
+class LIST(_DefaultTypeConverter):
+    output_type = list
 
-    @staticmethod
-    def _int(d: int) -> bool: return bool(d)
 
-    @staticmethod
-    def _float(d: float) -> bool: return bool(d)
+class TUPLE(_DefaultTypeConverter):
+    output_type = tuple
+
+
+class SET(_DefaultTypeConverter):
+    output_type = set
+
+
+class DICT(_DefaultTypeConverter):
+    output_type = dict
+
+
+# Default non-aggregate
+
+class STRING(_DefaultTypeConverter):
+    output_type = str
+
+
+class INTEGER(_DefaultTypeConverter):
+    output_type = int
+
+
+class FLOAT(_DefaultTypeConverter):
+    output_type = float
+
+
+class COMPLEX(_DefaultTypeConverter):
+    output_type = complex
+
+
+class BYTES(_DefaultTypeConverter):
+    output_type = bytes
+
+
+class BOOLEAN(_DefaultTypeConverter):
+    output_type = bool
+
+
+@dataclass
+class MemoInfo:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class Memo:
+    # Process-wide LRU memo of conversions of small immutable values (e.g., numbers and flags that are converted to
+    #   strings over and over). Only used when convert is called with memo=True and a frozen CFA (or none); see convert.
+    #
+    #   Entries are keyed by (output type, data, frozen CFA values); the key is typed, so 1 and True are kept apart.
+    #   Only immutable outputs are memoized (memoized outputs are shared between callers) and errors are never memoized.
+    #   The memo is bounded by POLICY_DTC_MEMO_SIZE; the least recently used entry is removed first. functools.lru_cache
+    #   is used (rather than a dict and a lock) since it is thread-safe and its lookups are cheaper than the conversions.
+    #
+    #   NOTE: A memo lookup costs about as much as a single str.encode call; str --> bytes is not faster when memoized.
+    pairs = frozenset((i, o) for i in (str, bytes, int, bool) for o in DNA if i is not o)  # (input type, output type)
+
+    max_item_length = 256  # Longer strings and bytes are never memoized.
+
+    _cached: Any = None  # lru_cache of Memo._convert_ (see Memo.resize); None if the memo is disabled
 
     @staticmethod
-    def _complex(d: complex) -> bool: return bool(d.real + d.imag)
+    def _convert_(output_type: type, data: Any, cfa_values: Tuple[Any, ...]) -> Any:
+        return _DISPATCH[(type(data), output_type)](data, CFA(*cfa_values))
 
     @staticmethod
-    def _list(d: List[Any]) -> bool: return BOOLEAN._int(len(d))
+    def accepts(output_type: type, data: Any) -> bool:
+        return (
+            (Memo._cached is not None) and ((type(data), output_type) in Memo.pairs) and
+            ((type(data) not in (str, bytes)) or (len(data) <= Memo.max_item_length))
+        )
 
     @staticmethod
-    def _tuple(d: Tuple[Any, ...]) -> bool: return BOOLEAN._int(len(d))
+    def resize(maxsize: int) -> None:
+        """
+        Sets the maximum number of memoized conversions (0 disables the memo); clears the memo.
+        """
+
+        Memo._cached = lru_cache(maxsize, typed=True)(Memo._convert_) if maxsize > 0 else None
 
     @staticmethod
-    def _set(d: Set[Any]) -> bool: return BOOLEAN._int(len(d))
+    def clear() -> None:
+        # Also resets the hit and miss counters.
+        if Memo._cached is not None:
+            Memo._cached.cache_clear()
 
     @staticmethod
-    def _dict(d: Dict[Any, Any]) -> bool: return BOOLEAN._int(len(d))
+    def info() -> MemoInfo:
+        if Memo._cached is None:
+            return MemoInfo(0, 0, 0, 0)
+
+        info = Memo._cached.cache_info()
+        return MemoInfo(info.hits, info.misses, info.currsize, info.maxsize)
+
+
+Memo.resize(AppPolicy.POLICY_DTC_MEMO_SIZE)
 
 
 def convert(output_type: type, data: Any, *args: Any, **kwargs: Any) -> Any:
@@ -647,6 +731,8 @@ def convert(output_type: type, data: Any, *args: Any, **kwargs: Any) -> Any:
 
     :keyword cfa:       CFA struct
                         if none is provided, a new struct containing default CFA values will be generated automatically.
+    :keyword memo:      If True, conversions of small str, bytes, int, and bool values are memoized, provided that the CFA
+                        struct is frozen (see CFA.freeze) or none is provided (see Memo)
 
     :return:            data --> <output_type>
 
@@ -663,19 +749,116 @@ def convert(output_type: type, data: Any, *args: Any, **kwargs: Any) -> Any:
     if isinstance(data, output_type):  # type: ignore
         return data
 
-    assert isinstance(data, (*DNA, *DA, *CUSTOM)),          f'0x000001 {type(data)}'
-    assert output_type in (*DNA, *DA, *CUSTOM),             f'0x000002 {output_type}'
-
-    # Call the function
-    return cast(Dict[type, Any], {
-        str: STRING,
-        int: INTEGER,
-        float: FLOAT,
-        complex: COMPLEX,
-        bytes: BYTES,
-        bool: BOOLEAN,
-        list: LIST,
-        tuple: TUPLE,
-        dict: DICT,
-        set: SET
-    })[output_type](output_type, data, *args, **kwargs).go()
+    function = _DISPATCH.get((type(data), output_type))
+
+    if function is None:
+        # Not a supported (input type, output type) pair; raise the appropriate error.
+        assert isinstance(data, (*DNA, *DA, *CUSTOM)),          f'0x000001 {type(data)}'
+        assert output_type in (*DNA, *DA, *CUSTOM),             f'0x000002 {output_type}'
+
+        raise AssertionError('0x100000')
+
+    cfa = kwargs.get('cfa')
+
+    if kwargs.get('memo') and ((cfa is None) or isinstance(cfa, FrozenCFA)) and Memo.accepts(output_type, data):
+        return Memo._cached(output_type, data, (_frozen_default_cfa if cfa is None else cfa).values)
+
+    return function(data, cfa if isinstance(cfa, CFA) else _default_cfa)
+
+
+def encode_to(sink: Union[BinaryIO, Any], data: Any, cfa: Optional[CFA] = None, chunk_size: int = 64 * 1024) -> int:
+    """
+    Quizzing App Data Type Convertor: streaming encoder (Public Fn.)
+
+    Writes the byte form of the data (identical to convert(bytes, data, cfa=cfa)) to a writable, chunk by chunk;
+    nested lists, tuples, sets, and dicts are never fully materialized in memory.
+
+    :param sink:        Any object with a write(bytes) method (file, BytesIO, socket file, ...)
+    :param data:        Data to be converted
+    :param cfa:         CFA struct (optional)
+    :param chunk_size:  Approximate size of each chunk written to the sink
+
+    :return:            Number of bytes written
+    """
+
+    cfa = cfa if isinstance(cfa, CFA) else _default_cfa
+
+    if (type(data) not in _PARENS) and (type(data) is not dict):
+        output = convert(bytes, data, cfa=cfa)
+        sink.write(output)
+
+        return len(output)
+
+    written = 0
+
+    def flush(buffer: bytearray, force: bool = False) -> None:
+        nonlocal written
+
+        if force or (len(buffer) >= chunk_size):
+            sink.write(bytes(buffer))
+            written += len(buffer)
+            buffer.clear()
+
+    buffer = bytearray()
+    _write_aggregate_(buffer, data, cfa, _delims_(cfa), flush)
+    flush(buffer, True)
+
+    return written
+
+
+# Batch conversions of homogeneous numbers and numeric strings that can be done with a single (C level) map call; the
+#   results are identical to converting each element with convert.
+#   (input type, output type) --> function applied to the list of elements
+_BATCH: Dict[Tuple[type, type], Callable[[List[Any]], List[Any]]] = {
+    (str, int): lambda d: [*map(int, map(float, d))],
+    (str, float): lambda d: [*map(float, d)],
+    (float, int): lambda d: [*map(int, d)],
+    (int, float): lambda d: d,  # int values are returned as-is (see _float_from_int_)
+    (int, str): lambda d: [*map(str, d)],
+    (float, str): lambda d: [*map(str, d)],
+}
+
+
+def convert_many(output_type: type, data: Iterable[Any], *args: Any, **kwargs: Any) -> List[Any]:
+    """
+    Quizzing App Data Type Convertor: batch conversion (Public Fn.)
+
+    Converts every element of an iterable (same result as [convert(output_type, e, ...) for e in data]). If every
+    element has the same type, the converter is looked up once; homogeneous numbers and numeric strings are converted
+    with a single map call (see _BATCH).
+
+    :param output_type: Desired output type
+    :param data:        Iterable of data to be converted
+    :param args:        Additional args to be passed onto the convertor
+    :param kwargs:      Additions keyword args to be passed onto the convertor
+
+    :keyword cfa:       CFA struct
+    :keyword memo:      See convert
+
+    :return:            List of converted elements
+    """
+
+    items = data if isinstance(data, list) else [*data]
+    types = {*map(type, items)}
+
+    if (len(types) != 1) or kwargs.get('memo'):
+        return [convert(output_type, e, *args, **kwargs) for e in items]
+
+    data_type = types.pop()
+
+    if data_type is output_type:
+        return [*items]
+
+    batch = _BATCH.get((data_type, output_type))
+    if batch is not None:
+        return [*batch(items)]
+
+    function = _DISPATCH.get((data_type, output_type))
+    if (function is None) or issubclass(data_type, output_type):
+        # Unsupported pairs raise the appropriate error; instances of the output type are returned as-is.
+        return [convert(output_type, e, *args, **kwargs) for e in items]
+
+    cfa = kwargs.get('cfa')
+    cfa = cfa if isinstance(cfa, CFA) else _default_cfa
+
+    return [function(e, cfa) for e in items]
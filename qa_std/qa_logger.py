@@ -103,7 +103,8 @@ class Logger(Thread):
         FileIO.file_io_manager.write(
             self._lfile, 
             f'This log was generated {self._stime.strftime("on %b %d %Y at %H:%M:%S")}',
-            secure_mode=False
+            secure_mode=False,
+            tag='logger'
         )
         
         self.write_to_file = lambda data_to_write: \
@@ -112,8 +113,9 @@ class Logger(Thread):
                 data_to_write,
                 secure_mode=False,
                 append_mode=True,
-                offload_to_new_thread=False,
-                append_delim='\n'
+                offload_to_new_thread=True,
+                append_delim='\n',
+                tag='logger'
             )
         
         self._ready = True
@@ -206,7 +208,7 @@ class Logger(Thread):
             LoggingLevel.L_EMPHASIS:    ConsoleWriter.Write.emphasis,
         }[ldp.logging_level]('[LOGGED]', data)
         
-        ANSI_CODES_b = [qa_dtc.convert(bytes, ac, cfa=FileIO.file_io_manager.cfa) for ac in ANSI_CODES[:3]]
+        ANSI_CODES_b = qa_dtc.convert_many(bytes, ANSI_CODES[:3], cfa=FileIO.file_io_manager.cfa)
         prepend_b = b'[%b%b%b%b]%b' % (ANSI_CODES_b[1], ANSI_CODES_b[0], logging_name_b, ANSI_CODES_b[2], spaces_b)
         
         output_b = b'%b%b %b%b' % (
@@ -10,6 +10,8 @@ DOC
 DEFINES
 
     (class)     dataclass       Theme
+    (class)                     T_Cache         Parsed theme file cache (see T_Cache.invalidate)
+    (class)                     Palette         Compiled (immutable) theme palette
 
 DEPENDENCIES
 
@@ -19,29 +21,159 @@ DEPENDENCIES
 """
 
 import os, json
-from typing import Tuple, List, Any, cast
+from threading import RLock
+from typing import Tuple, Sequence, Dict, Optional, Any, cast
 
 from . import qa_def
 from . import qa_app_pol as AppPolicy
 from . import qa_app_info as AppInfo
 from . import qa_logger as Logger
 
-from qa_file_io.qa_theme_file import Theme, ThemeFile_s, ThemeFile
+from qa_file_io.qa_theme_file import Theme, ThemeFile_s, ThemeFile, ThemeIndex
 from qa_file_io import file_io_manager as FileIOManager
 
 
 ScriptPolicy = AppPolicy.PolicyManager.Module('ThemeManager', 'qa_theme.py')
-_default_theme_code = '5a95015ab1713b6a18ebb1750d04434730358774015'[:32]
+_default_theme_code = '5a95015ab1713b6a18ebb1750d04434730358774015'
 _global_logger: Logger.Logger
 
 
+class T_Cache:
+    # Process-wide cache of parsed theme files (and of the preferred theme), keyed by file path and validated against
+    #   the file's modification time and size.
+    _lock = RLock()
+    #   Entries are (stat key, trusted, parsed file); an entry parsed with trusted=True (i.e., without verification)
+    #   is not handed out to untrusted reads.
+    _files: Dict[str, Tuple[Tuple[int, int], bool, ThemeFile_s]] = {}
+    _pref: Optional[Tuple[Tuple[int, int], str, Tuple[int, int], Theme]] = None
+    _palette: Optional['Palette'] = None
+
+    @staticmethod
+    def _stat_(file_path: str) -> Tuple[int, int]:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def read_file(file: qa_def.File, trusted: bool = False) -> ThemeFile_s:
+        key = T_Cache._stat_(file.file_path)
+        
+        with T_Cache._lock:
+            entry = T_Cache._files.get(file.file_path)
+            if (entry is not None) and (entry[0] == key) and (trusted or not entry[1]):
+                return entry[2]
+            
+        theme_file = ThemeFile.read_file(file, trusted)
+        
+        with T_Cache._lock:
+            T_Cache._files[file.file_path] = (key, trusted, theme_file)
+            
+        return theme_file
+    
+    @staticmethod
+    def get_pref_theme(config_key: Tuple[int, int]) -> Optional[Theme]:
+        with T_Cache._lock:
+            if (T_Cache._pref is None) or (T_Cache._pref[0] != config_key):
+                return None
+            
+            _, theme_file_path, theme_file_key, theme = T_Cache._pref
+            
+        if not os.path.isfile(theme_file_path) or (T_Cache._stat_(theme_file_path) != theme_file_key):
+            return None
+        
+        return theme
+        
+    @staticmethod
+    def set_pref_theme(config_key: Tuple[int, int], theme_file_path: str, theme: Theme) -> None:
+        theme_file_key = T_Cache._stat_(theme_file_path)
+        
+        with T_Cache._lock:
+            T_Cache._pref = (config_key, theme_file_path, theme_file_key, theme)
+    
+    @staticmethod
+    def invalidate(file: Optional[qa_def.File] = None) -> None:
+        """
+        Invalidates the cached preferred theme and the given theme file (or every theme file if no file is given).
+        Called whenever the user picks a new theme.
+        """
+        
+        with T_Cache._lock:
+            T_Cache._pref = None
+            
+            if file is None:
+                T_Cache._files.clear()
+            else:
+                T_Cache._files.pop(file.file_path, None)
+
+
+class Palette:
+    """
+    Compiled (immutable) theme palette. Every update variable (UpdateVariables) is resolved to a Tk-ready value once,
+    when the palette is compiled; the UI resolves variables by index (palette.values[variable.value]).
+    """
+    
+    __slots__ = ('theme', 'values', 'fonts')
+    
+    theme: Theme
+    values: Tuple[Any, ...]  # Indexed by UpdateVariables value
+    fonts: Dict[Tuple[qa_def.UpdateVariables, qa_def.UpdateVariables], Tuple[str, int]]  # {(face, size): font}
+    
+    font_keys = {
+        (face, size)
+        for face in (qa_def.UpdateVariables.FONT_FACE, qa_def.UpdateVariables.TITLE_FONT_FACE)
+        for size in (
+            qa_def.UpdateVariables.TITLE_FONT_SIZE, qa_def.UpdateVariables.LARGE_FONT_SIZE,
+            qa_def.UpdateVariables.NORML_FONT_SIZE, qa_def.UpdateVariables.SMALL_FONT_SIZE
+        )
+    }
+    
+    def __init__(self, theme: Theme) -> None:
+        UV = qa_def.UpdateVariables
+        
+        values = {
+            UV.BACKGROUND: theme.background.color,
+            UV.FOREGROUND: theme.foreground.color,
+            UV.BORDER_COLOR: theme.border_color.color,
+            UV.BORDER_WIDTH: theme.border_radius,
+            UV.ACCENT_COLOR: theme.accent.color,
+            UV.ERROR_COLOR: theme.error.color,
+            UV.WARNING_COLOR: theme.warning.color,
+            UV.GRAY_COLOR: theme.grey.color,
+            UV.OK_COLOR: theme.successful.color,
+            UV.FONT_FACE: theme.font_face,
+            UV.TITLE_FONT_FACE: theme.title_font_face,
+            UV.TITLE_FONT_SIZE: theme.font_size_title,
+            UV.LARGE_FONT_SIZE: theme.font_size_large,
+            UV.NORML_FONT_SIZE: theme.font_size_normal,
+            UV.SMALL_FONT_SIZE: theme.font_size_small,
+        }
+        
+        assert len(values) == len(UV) and all(uv.value == i for i, uv in enumerate(UV)), 'Bad UpdateVariables'
+        
+        object.__setattr__(self, 'theme', theme)
+        object.__setattr__(self, 'values', tuple(values[uv] for uv in UV))
+        object.__setattr__(self, 'fonts', {(face, size): (values[face], values[size]) for face, size in Palette.font_keys})
+        
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError('Palette objects are immutable.')
+    
+    @staticmethod
+    def compile(theme: Theme) -> 'Palette':
+        # The same theme object (see T_Cache) is only compiled once.
+        with T_Cache._lock:
+            if (T_Cache._palette is None) or (T_Cache._palette.theme is not theme):
+                T_Cache._palette = Palette(theme)
+                
+            return T_Cache._palette
+
+
 class T_Config:
     @staticmethod
     def _reset_pref_file_() -> Theme:
         default_theme_file = T_DefaultTheme._load_default_theme_file_()
-        default_themes = {theme.theme_code[:32]: (theme.theme_name, theme) for theme in T_DefaultTheme._load_default_themes_()[0]}
+        default_themes = {theme.theme_code: (theme.theme_name, theme) for theme in default_theme_file.themes}
+        matches = [theme for code, (_, theme) in default_themes.items() if ThemeFile.match_theme_code(_default_theme_code, code)]
         
-        if _default_theme_code not in default_themes:
+        if not len(matches):
             
             raise Exception(
                 f'Did not find theme {_default_theme_code} in:\n\t* %s' % (
@@ -49,8 +181,8 @@ class T_Config:
                 )
             )
             
-        T_Config._set_pref_theme_(default_theme_file, default_themes[_default_theme_code][1])
-        return default_themes[_default_theme_code][1]
+        T_Config._set_pref_theme_(default_theme_file, matches[0])
+        return matches[0]
     
     @staticmethod
     def _get_pref_theme_() -> Theme:
@@ -58,36 +190,56 @@ class T_Config:
         
         'Returns: path to theme file, theme collection name, theme name, theme code'
         
+        # Make sure that any queued writes to the configuration file have been applied.
+        FileIOManager.flush(qa_def.File(AppInfo.Storage.ThemeConfigurationFile))
+        
         if not os.path.isfile(AppInfo.Storage.ThemeConfigurationFile):
             return T_Config._reset_pref_file_()  # Resets the theme file and returns the defualt theme.
         
-        # If the file does exist
-        with open(AppInfo.Storage.ThemeConfigurationFile) as f_in:
-            r = f_in.read()
-            f_in.close()
+        # If neither the configuration file nor the theme file has changed, the cached preferred theme is returned.
+        config_key = T_Cache._stat_(AppInfo.Storage.ThemeConfigurationFile)
+        cached = T_Cache.get_pref_theme(config_key)
+        
+        if cached is not None:
+            return cached
+        
+        # If the file does exist (FileIO.read also applies any queued writes to the file first)
+        r = FileIOManager.read(qa_def.File(AppInfo.Storage.ThemeConfigurationFile), tag='theme')
         
         try:
             j = json.loads(r)
             
             collection = j['tcl']
             file = qa_def.File(j['t.f'])
-            code = j['t.c'][:32]
+            code = j['t.c']
             name = j['t.n']
             
+            # The theme index locates the theme (and its position in the theme file) without scanning the file.
+            indexed = ThemeIndex.find(collection, name, code)
+            position = -1
+            
+            if indexed is not None:
+                file, position = indexed
+            
             assert os.path.isfile(file.file_path), 'Theme file not available.'
-            loaded_file = ThemeFile.read_file(file)
+            loaded_file = T_Cache.read_file(file)
             
             assert loaded_file.collection_name == collection, 'Theme collection not available.'
             
-            for theme in loaded_file.themes:
+            themes = loaded_file.themes
+            candidates = [themes[position]] if 0 <= position < len(themes) else []
+            
+            for theme in [*candidates, *themes]:
                                 
-                if (theme.theme_name == name) and (theme.theme_code[:32] == code):
+                if (theme.theme_name == name) and ThemeFile.match_theme_code(code, theme.theme_code):
                     _global_logger.write(Logger.LogDataPacket(
                         'ThemeManager',
                         Logger.LoggingLevel.L_SUCCESS,
                         'Found preferred theme.'
                     ))
-                                        
+                    
+                    T_Cache.set_pref_theme(config_key, file.file_path, theme)
+                    
                     return theme
                 
             raise Exception('Did not found theme')
@@ -108,6 +260,9 @@ class T_Config:
         
         assert os.path.isfile(theme_file.file.file_path)
         
+        # The user picked a new theme.
+        T_Cache.invalidate()
+        
         dtw = {
             't.f': theme_file.file.file_path,
             't.n': theme.theme_name,
@@ -120,13 +275,14 @@ class T_Config:
             json.dumps(dtw, indent=4),
             secure_mode=True,
             append_mode=False,
-            offload_to_new_thread=False
+            offload_to_new_thread=True,
+            tag='theme'
         )
 
 
 class T_DefaultTheme:
     @staticmethod
-    def _load_default_themes_() -> Tuple[List[Theme], Any]:
+    def _load_default_themes_() -> Tuple[Sequence[Theme], Any]:
         theme_file = T_DefaultTheme._load_default_theme_file_()
         return theme_file.themes, (
             theme_file.header, 
@@ -137,17 +293,19 @@ class T_DefaultTheme:
     
     @staticmethod
     def _load_default_theme_file_() -> ThemeFile_s:
-        return ThemeFile.read_file(qa_def.File(AppInfo.Storage.DefaultThemeFile))
+        return T_Cache.read_file(qa_def.File(AppInfo.Storage.DefaultThemeFile), trusted=True)
 
 
 class ThemeInfo:
-    default_themes: List[Theme]
+    default_themes: Sequence[Theme]
     preferred_theme: Theme
+    palette: Palette  # Compiled palette of the preferred theme
     
     @staticmethod
     def load_all_data() -> None:       
         ThemeInfo.default_themes = T_DefaultTheme._load_default_themes_()[0]
         ThemeInfo.preferred_theme = T_Config._get_pref_theme_()
+        ThemeInfo.palette = Palette.compile(ThemeInfo.preferred_theme)
 
 
 if __name__ == "__main__":
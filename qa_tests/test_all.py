@@ -14,5 +14,13 @@ def test_locale() -> None:
     assert Diagnostics.ModDiagnostics.locale()
 
 
+def test_qa_file_io() -> None:
+    assert Diagnostics.ModDiagnostics.qa_file_io()
+
+
+def test_qa_theme_file() -> None:
+    assert Diagnostics.ModDiagnostics.qa_theme_file()
+
+
 def test_src_files() -> None:
     assert Diagnostics.ModDiagnostics.check_source_files()
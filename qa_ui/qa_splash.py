@@ -275,6 +275,9 @@ class SplashUI(UI_OBJECT):
 
             self._t_upd()
 
+        # app_name_lbl (a themed label) was configured directly; the update plans no longer know its foreground.
+        self.invalidate_update_plans()
+
         self.info_lbl.config(text=info)
 
     def _t_upd(self) -> None:
@@ -1,7 +1,8 @@
 import tkinter as tk, traceback
+from dataclasses import dataclass, field
 from typing import (
-    List, Tuple, SupportsIndex, Set,
-    Optional, Any,
+    List, Tuple, Dict,
+    Optional, Any, Callable,
     cast,
 )
 
@@ -15,6 +16,20 @@ from qa_std import (
 )
 
 
+@dataclass
+class UpdatePlanEntry:
+    element: tk.Widget
+
+    # [(command, config options, value thunk), ...]; applied with one element.config call
+    options: List[Tuple[UC, Tuple[str, ...], Callable[[], Any]]]
+
+    # Custom commands (thunks); run after the config call
+    customs: List[Callable[[], Any]]
+
+    # {config option: value last applied}; unchanged options are not re-applied
+    applied: Dict[str, Any] = field(default_factory=dict)
+
+
 class UI_OBJECT:
     def __init__(self) -> None:
         super(UI_OBJECT, self).__init__()
@@ -24,6 +39,8 @@ class UI_OBJECT:
         self.post_update_req: List[List[tk.Widget, Tuple[UC, List[Any, ...]]]] = []  # type: ignore
 
         self._theme: Optional[ThemeManager.Theme] = None
+        self._palette: Optional[ThemeManager.Palette] = None
+        self._update_plans: Dict[int, Tuple[List[Any], int, List[UpdatePlanEntry]]] = {}
 
         self.pad_x: Optional[int] = None
         self.pad_y: Optional[int] = None
@@ -47,175 +64,250 @@ class UI_OBJECT:
     def load_theme(self) -> None:
         ThemeManager.ThemeInfo.load_all_data()
         self._theme = ThemeManager.ThemeInfo.preferred_theme
+        self._palette = ThemeManager.ThemeInfo.palette
 
     @staticmethod
     def log(_: LogDataPacket) -> None:
         return  # Add a log command here in the subclass when the logger instance is available
 
-    def _ureq_manage_args(self, element: tk.Widget, args: List[Any] | Tuple[Any] | Set[Any] | SupportsIndex) -> List[Any]:
-        output = []
-
-        for arg in args:  # type: ignore
-
-            if arg in UV.__members__.values():
-                arg = {
-                    UV.BACKGROUND: cast(ThemeManager.Theme, self._theme).background.color,
-                    UV.FOREGROUND: cast(ThemeManager.Theme, self._theme).foreground.color,
-                    UV.BORDER_COLOR: cast(ThemeManager.Theme, self._theme).border_color.color,
-                    UV.BORDER_WIDTH: cast(ThemeManager.Theme, self._theme).border_radius,
-                    UV.ACCENT_COLOR: cast(ThemeManager.Theme, self._theme).accent.color,
-                    UV.ERROR_COLOR: cast(ThemeManager.Theme, self._theme).error.color,
-                    UV.WARNING_COLOR: cast(ThemeManager.Theme, self._theme).warning.color,
-                    UV.GRAY_COLOR: cast(ThemeManager.Theme, self._theme).grey.color,
-                    UV.OK_COLOR: cast(ThemeManager.Theme, self._theme).successful.color,
-                    UV.FONT_FACE: cast(ThemeManager.Theme, self._theme).font_face,
-                    UV.TITLE_FONT_FACE: cast(ThemeManager.Theme, self._theme).title_font_face,
-                    UV.TITLE_FONT_SIZE: cast(ThemeManager.Theme, self._theme).font_size_title,
-                    UV.LARGE_FONT_SIZE: cast(ThemeManager.Theme, self._theme).font_size_large,
-                    UV.NORML_FONT_SIZE: cast(ThemeManager.Theme, self._theme).font_size_normal,
-                    UV.SMALL_FONT_SIZE: cast(ThemeManager.Theme, self._theme).font_size_small,
-                }[arg]
-
-            elif isinstance(arg, (list, tuple, set)):
-                arg = [*arg]  # Convert to a list to allow for the 'pop' function to be called.
-
-                if len(arg) > 1:
-                    if arg[0] == UC.CUSTOM:  # Run a custom command
-                        arg.pop(0)
-                        if len(arg) == 1:
-                            arg = arg[0]()
-                        else:
-                            cargs = self._ureq_manage_args(element, arg[1::])
-                            arg = arg[0](*cargs)
+    # Update requests are compiled into update plans (see UpdatePlanEntry) the first time they are applied. Requests that
+    #   are appended to a request list later are compiled when the list is next applied. Only the config options whose
+    #   value changed since they were last applied are sent to Tk. Call invalidate_update_plans after modifying an
+    #   already-submitted request in place (or after configuring a themed widget directly).
 
-            else:
-                arg = {
-                    'PAD_X': self.pad_x,
-                    'PAD_Y': self.pad_y,
-                    'ELMNT': element,
-                }.get(arg, arg)
+    _ureq_options = {
+        UC.BACKGROUND: ('background', ),
+        UC.FOREGROUND: ('foreground', ),
+        UC.FONT: ('font', ),
+        UC.BORDER_COLOR: ('highlightcolor', 'highlightbackground'),
+        UC.BORDER_WIDTH: ('highlightthickness', 'borderwidth', 'bd'),
+        UC.ACTIVE_BACKGROUND: ('activebackground', ),
+        UC.ACTIVE_FOREGROUND: ('activeforeground', ),
+        UC.WRAP_LENGTH: ('wraplength', ),
+    }
 
-                try:
-                    narg = {
-                        'SCR_W': self.toplevel.winfo_screenwidth(),
-                        'SCR_H': self.toplevel.winfo_screenheight(),
-                        'WND_W': self.toplevel.winfo_width(),
-                        'WND_H': self.toplevel.winfo_height(),
-                    }.get(arg, arg)
+    _ureq_window_args = {
+        'SCR_W': lambda top: top.winfo_screenwidth(),
+        'SCR_H': lambda top: top.winfo_screenheight(),
+        'WND_W': lambda top: top.winfo_width(),
+        'WND_H': lambda top: top.winfo_height(),
+    }
 
-                except NotImplementedError:
-                    pass
+    def invalidate_update_plans(self) -> None:
+        self._update_plans.clear()
 
-                else:
-                    arg = narg
-                    del narg
+    def _ureq_compile_arg(self, element: tk.Widget, arg: Any) -> Callable[[], Any]:
+        # Returns a thunk that resolves the argument when the plan is applied:
+        #   * UV (palette entry)                    value in the compiled palette (see ThemeManager.Palette)
+        #   * [UC.CUSTOM, function, *args]          function(*args); the args are resolved as well
+        #   * 'ELMNT', 'PAD_X', 'PAD_Y'             the element, self.pad_x, self.pad_y
+        #   * 'SCR_W', 'SCR_H', 'WND_W', 'WND_H'    screen and window dimensions (of self.toplevel)
+        #   * anything else                         the argument itself
+        if isinstance(arg, UV):
+            index = arg.value
+            return lambda: cast(ThemeManager.Palette, self._palette).values[index]
 
-            output.append(arg)
+        if isinstance(arg, (list, tuple, set)):
+            arg = [*arg]
 
-        return output
+            if (len(arg) > 1) and (arg[0] == UC.CUSTOM):  # Run a custom command
+                function, *f_args = arg[1:]
+                thunks = [self._ureq_compile_arg(element, a) for a in f_args]
 
-    def apply_update_reqs(self, reqs: List[Any], *_: Any, **kwargs: Any) -> None:
-        self.toplevel.update()
-        weo = kwargs.get('_wraplength_events_only', False)
+                return lambda: function(*[thunk() for thunk in thunks])
 
-        for entry in reqs:
-            _el, *requests = entry
-            element = cast(tk.Label | tk.Widget, _el)
+            return lambda: [*arg]
 
-            for request in requests:
-                command, _a = request
-                args = self._ureq_manage_args(element, _a)
+        if isinstance(arg, str):
+            if arg == 'ELMNT':
+                return lambda: element
 
-                try:
-                    assert isinstance(command, UC), 'Invalid command.'
-                    assert isinstance(args, list), 'Invalid arguments.'
+            if arg in ('PAD_X', 'PAD_Y'):
+                return lambda: self.pad_x if arg == 'PAD_X' else self.pad_y
+
+            if arg in UI_OBJECT._ureq_window_args:
+                getter = UI_OBJECT._ureq_window_args[arg]
+
+                def window_arg() -> Any:
+                    try:
+                        return getter(self.toplevel)
 
-                    if weo & (command != UC.WRAP_LENGTH):
-                        continue
+                    except NotImplementedError:
+                        return arg
 
-                    match command:
-                        case UC.BACKGROUND:
-                            assert len(args) == 1
-                            element.config(background=args[0])  # type: ignore
+                return window_arg
 
-                        case UC.FOREGROUND:
-                            assert len(args) == 1
-                            element.config(foreground=args[0])  # type: ignore
+        return lambda: arg
 
-                        case UC.FONT:
-                            assert len(args) == 2  # Only support family and size
-                            assert isinstance(args[0], str) & isinstance(args[1], int)
+    def _ureq_compile_value(self, element: tk.Widget, command: UC, args: Any) -> Callable[[], Any]:
+        args = [*args]
 
-                            element.config(font=(*args,))  # type: ignore
+        if command == UC.FONT:
+            assert len(args) == 2  # Only support family and size
 
-                        case UC.CUSTOM:
-                            assert len(args) >= 1
+            if all(isinstance(a, UV) for a in args) and (tuple(args) in ThemeManager.Palette.font_keys):
+                key = cast(Tuple[UV, UV], tuple(args))
+                return lambda: cast(ThemeManager.Palette, self._palette).fonts[key]  # Precomputed font tuple
 
-                            if len(args) == 1:
-                                args[0]()
-                            else:
-                                cargs = self._ureq_manage_args(element, args[1::])
-                                args[0](*cargs)
+            face, size = [self._ureq_compile_arg(element, a) for a in args]
 
-                        case UC.BORDER_COLOR:
-                            assert len(args) == 1
+            def font() -> Tuple[str, int]:
+                value = (face(), size())
+                assert isinstance(value[0], str) & isinstance(value[1], int)
 
-                            element.config(  # type: ignore
-                                highlightcolor=args[0],
-                                highlightbackground=args[0]
-                            )
+                return value
 
-                        case UC.BORDER_WIDTH:
-                            assert len(args) == 1
-                            assert isinstance(args[0], (float, int))
+            return font
 
-                            element.config(  # type: ignore
-                                highlightthickness=args[0],
-                                borderwidth=args[0],
-                                bd=args[0],
-                            )
+        assert len(args) == 1
+        thunk = self._ureq_compile_arg(element, args[0])
 
-                        case UC.ACTIVE_BACKGROUND:
-                            assert len(args) == 1
+        if command in (UC.BORDER_WIDTH, UC.WRAP_LENGTH):
+            def number() -> Any:
+                value = thunk()
+                assert isinstance(value, (float, int))
 
-                            element.config(activebackground=args[0])  # type: ignore
+                return value
 
-                        case UC.ACTIVE_FOREGROUND:
-                            assert len(args) == 1
+            return number
 
-                            element.config(activeforeground=args[0])  # type: ignore
+        return thunk
 
-                        case UC.WRAP_LENGTH:
-                            assert len(args) == 1
-                            assert isinstance(args[0], (float, int))
+    def _ureq_compile(self, entry: Any) -> UpdatePlanEntry:
+        _el, *requests = entry
+        element = cast(tk.Label | tk.Widget, _el)
+        plan = UpdatePlanEntry(element, [], [])
 
-                            element.config(wraplength=args[0])  # type: ignore
+        for request in requests:
+            command, _a = request
+
+            try:
+                assert isinstance(command, UC), 'Invalid command.'
+
+                if command == UC.CUSTOM:
+                    assert len(_a) >= 1
+                    plan.customs.append(self._ureq_compile_arg(element, (UC.CUSTOM, *_a)))
+
+                elif command in UI_OBJECT._ureq_options:
+                    plan.options.append(
+                        (command, UI_OBJECT._ureq_options[command], self._ureq_compile_value(element, command, _a))
+                    )
+
+                else:
+                    raise NotImplementedError('Update command.')
+
+            except Exception as E:
+                self._ureq_log_failure(command, element, E)
+
+        return plan
+
+    def _ureq_plan(self, reqs: List[Any]) -> List[UpdatePlanEntry]:
+        # Requests for the same element are merged into one plan entry (one config call per element).
+        _, compiled, plan = self._update_plans.get(id(reqs), (reqs, 0, []))
+
+        if compiled != len(reqs):
+            if compiled > len(reqs):  # Requests were removed; recompile.
+                compiled, plan = 0, []
+
+            entries = {id(entry.element): entry for entry in plan}
+
+            for request in reqs[compiled:]:
+                new = self._ureq_compile(request)
+
+                if id(new.element) in entries:
+                    entries[id(new.element)].options.extend(new.options)
+                    entries[id(new.element)].customs.extend(new.customs)
+
+                else:
+                    entries[id(new.element)] = new
+                    plan.append(new)
 
-                        case _:
-                            raise NotImplementedError('Update command.')
+            self._update_plans[id(reqs)] = (reqs, len(reqs), plan)  # Holds a reference to reqs (ids are not reused).
+
+        return plan
+
+    def _ureq_log_failure(self, command: Any, element: tk.Widget, E: Exception) -> None:
+        if AppInfo.ConfigurationFile.config.VLE & self.VLE_ENABLED:  # Verbose logging enabled
+            self.log(LogDataPacket(
+                'UIObject',
+                LoggingLevel.L_ERROR,
+                f'[VERBOSE LOGGING ENABLED] Failed to apply command {command} to {element}: {traceback.format_exc()}.'
+            ))
+
+        else:
+            self.log(LogDataPacket(
+                'UIObject',
+                LoggingLevel.L_ERROR,
+                f'Failed to apply command {command} to {element}: {E}.'
+            ))
+
+    def apply_update_reqs(self, reqs: List[Any], *_: Any, **kwargs: Any) -> None:
+        self.toplevel.update()
+        weo = kwargs.get('_wraplength_events_only', False)
+        vle = AppInfo.ConfigurationFile.config.VLE & self.VLE_ENABLED
+
+        for plan in self._ureq_plan(reqs):
+            element, config, applied = plan.element, {}, []
+
+            for command, options, value in plan.options:
+                if weo & (command != UC.WRAP_LENGTH):
+                    continue
+
+                try:
+                    v = value()
 
                 except Exception as E:
-                    if AppInfo.ConfigurationFile.config.VLE & self.VLE_ENABLED:  # Verbose logging enabled
-                        self.log(LogDataPacket(
-                            'UIObject',
-                            LoggingLevel.L_ERROR,
-                            f'[VERBOSE LOGGING ENABLED] Failed to apply command {command} to {element}: {traceback.format_exc()}.'
-                        ))
+                    self._ureq_log_failure(command, element, E)
 
-                    else:
-                        self.log(LogDataPacket(
-                            'UIObject',
-                            LoggingLevel.L_ERROR,
-                            f'Failed to apply command {command} to {element}: {E}.'
-                        ))
+                else:
+                    changed = {option: v for option in options if plan.applied.get(option, plan) != v}
+
+                    if len(changed):
+                        config.update(changed)
+                        applied.append(command)
+
+            if len(config):
+                try:
+                    element.config(**config)  # type: ignore  # One call (one Tcl round trip) per widget.
+
+                except Exception:
+                    # Apply the commands one at a time so that one failure does not affect the others.
+                    for command, options, _value in plan.options:
+                        if command not in applied:
+                            continue
+
+                        changed = {option: config[option] for option in options if option in config}
+
+                        try:
+                            element.config(**changed)  # type: ignore
+
+                        except Exception as E:
+                            applied.remove(command)
+                            self._ureq_log_failure(command, element, E)
+
+                        else:
+                            plan.applied.update(changed)
 
                 else:
-                    if AppInfo.ConfigurationFile.config.VLE & self.VLE_ENABLED:  # Verbose logging enabled
-                        self.log(LogDataPacket(
-                            'UIObject',
-                            LoggingLevel.L_GENERAL,
-                            f'[VERBOSE LOGGING ENABLED] Applied command {command} to {element}'
-                        ))
+                    plan.applied.update(config)
+
+            if not weo:
+                for custom in plan.customs:
+                    try:
+                        custom()
+
+                    except Exception as E:
+                        self._ureq_log_failure(UC.CUSTOM, element, E)
+
+                    else:
+                        applied.append(UC.CUSTOM)
+
+            if vle and len(applied):
+                self.log(LogDataPacket(
+                    'UIObject',
+                    LoggingLevel.L_GENERAL,
+                    f'[VERBOSE LOGGING ENABLED] Applied commands {applied} to {element}'
+                ))
 
     def _update_ui_plugin(self, *_: Any, **__: Any) -> None:
         return  # Add your own code here.
@@ -260,6 +352,9 @@ class UI_OBJECT:
             font_size: int | UV = UV.NORML_FONT_SIZE,
             font_face: str | UV = UV.FONT_FACE,
     ) -> None:
+        # WARNING: update plans only re-apply options whose value changed (see UpdatePlanEntry.applied). If the label's
+        #   background, foreground, or font is later set directly (label.config), call invalidate_update_plans;
+        #   otherwise, the next update_ui call will not restore the themed value.
         self.update_requests.append(
             [
                 label,